@@ -0,0 +1,43 @@
+"""Creation of dynamic spaces and evaluation in them"""
+
+import modelx as mx
+
+
+def spaceparams(i):
+    return None
+
+
+def value():
+    return 2 * i
+
+
+class DynamicSpaceSuite:
+
+    params = [1000, 10000]
+    param_names = ["spaces"]
+    number = 1
+    warmup_time = 0
+    timeout = 600
+
+    def setup(self, spaces):
+        self.model = mx.new_model()
+        self.space = self.model.new_space(formula=spaceparams)
+        self.space.new_cells(formula=value)
+
+    def teardown(self, spaces):
+        self.model.close()
+
+    def time_create(self, spaces):
+        space = self.space
+        for i in range(spaces):
+            space[i]
+
+    def time_create_and_evaluate(self, spaces):
+        space = self.space
+        for i in range(spaces):
+            space[i].value()
+
+    def peakmem_create_and_evaluate(self, spaces):
+        space = self.space
+        for i in range(spaces):
+            space[i].value()
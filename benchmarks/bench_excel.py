@@ -0,0 +1,63 @@
+"""Creating cells from large ranges in Excel files"""
+
+import os
+
+import modelx as mx
+
+COLUMNS = 10
+
+
+class ExcelSuite:
+
+    params = [1000, 10000]
+    param_names = ["rows"]
+    number = 1
+    warmup_time = 0
+    timeout = 600
+
+    def setup_cache(self):
+        """Write Excel files and return a dict of rows to their paths"""
+        try:
+            import openpyxl
+        except ImportError:
+            return None
+
+        paths = {}
+        for rows in self.params:
+            book = openpyxl.Workbook()
+            sheet = book.active
+            sheet.title = "Data"
+            sheet.append(["t"] + ["Cells%d" % i for i in range(1, COLUMNS)])
+            for t in range(rows):
+                sheet.append([t] + [t * i for i in range(1, COLUMNS)])
+
+            # Written in the directory the benchmarks run in
+            paths[rows] = os.path.abspath("bench_excel_%d.xlsx" % rows)
+            book.save(paths[rows])
+
+        return paths
+
+    def setup(self, paths, rows):
+        if paths is None:
+            raise NotImplementedError("openpyxl not installed")
+
+        self.model = mx.new_model()
+        self.space = self.model.new_space()
+
+    def teardown(self, paths, rows):
+        self.model.close()
+
+    def new_cells(self, paths, rows):
+        self.space.new_cells_from_excel(
+            book=paths[rows],
+            range_="A1:%s%d" % (chr(ord("A") + COLUMNS - 1), rows + 1),
+            sheet="Data",
+            names_row=0,
+            param_cols=[0]
+        )
+
+    def time_new_cells_from_excel(self, paths, rows):
+        self.new_cells(paths, rows)
+
+    def peakmem_new_cells_from_excel(self, paths, rows):
+        self.new_cells(paths, rows)
@@ -0,0 +1,40 @@
+"""Space.frame over many cells"""
+
+import modelx as mx
+
+ROWS = 200
+
+
+def value(t):
+    return t
+
+
+class FrameSuite:
+
+    params = [10, 100]
+    param_names = ["cells"]
+    number = 1
+    warmup_time = 0
+    timeout = 600
+
+    def setup(self, cells):
+        try:
+            import pandas
+        except ImportError:
+            raise NotImplementedError("pandas not installed")
+
+        self.model = mx.new_model()
+        self.space = self.model.new_space()
+        for i in range(cells):
+            item = self.space.new_cells("Cells%d" % i, formula=value)
+            for t in range(ROWS):
+                item(t)
+
+    def teardown(self, cells):
+        self.model.close()
+
+    def time_frame(self, cells):
+        self.space.frame
+
+    def peakmem_frame(self, cells):
+        self.space.frame
@@ -0,0 +1,13 @@
+"""Time to import modelx in a fresh interpreter"""
+
+
+class ImportSuite:
+
+    def timeraw_import_modelx(self):
+        return "import modelx"
+
+    def timeraw_import_and_new_model(self):
+        return """
+        import modelx
+        modelx.new_model()
+        """
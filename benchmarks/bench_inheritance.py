@@ -0,0 +1,106 @@
+"""Building and editing spaces in deep and diamond inheritance"""
+
+import modelx as mx
+
+
+def foo(x):
+    return x
+
+
+def bar(x):
+    return foo(x) + 1
+
+
+def baz(x):
+    return 2 * x
+
+
+class DeepInheritance:
+    """A chain of spaces each derived from the previous one"""
+
+    params = [50, 200]
+    param_names = ["depth"]
+    number = 1
+    warmup_time = 0
+    timeout = 600
+
+    def setup(self, depth):
+        self.model = mx.new_model()
+        self.base = self.model.new_space("Base")
+        self.base.new_cells(formula=foo)
+        self.base.new_cells(formula=bar)
+
+    def teardown(self, depth):
+        self.model.close()
+
+    def build(self, depth):
+        space = self.base
+        for i in range(depth):
+            space = self.model.new_space("Sub%d" % i, bases=space)
+        return space
+
+
+class DeepInheritanceSuite(DeepInheritance):
+
+    def time_build(self, depth):
+        self.build(depth)
+
+    def peakmem_build(self, depth):
+        self.build(depth)
+
+
+class DeepInheritanceEditSuite(DeepInheritance):
+    """Changes in the base space propagated down the chain"""
+
+    def setup(self, depth):
+        DeepInheritance.setup(self, depth)
+        self.sub = self.build(depth)
+        self.sub.bar(1)
+
+    def time_set_formula(self, depth):
+        self.base.foo.set_formula(baz)
+        self.sub.bar(1)
+
+    def time_new_cells(self, depth):
+        self.base.new_cells(formula=baz)
+        self.sub.baz(1)
+
+
+class DiamondInheritanceSuite:
+    """Layers of two spaces each derived from both spaces of the layer below
+
+    Each layer and the layer below form a diamond, so the number of
+    paths from the top space to the base doubles with each layer.
+    """
+
+    params = [4, 8, 12]
+    param_names = ["layers"]
+    number = 1
+    warmup_time = 0
+    timeout = 600
+
+    def setup(self, layers):
+        self.model = mx.new_model()
+        self.base = self.model.new_space("Base")
+        self.base.new_cells(formula=foo)
+        self.base.new_cells(formula=bar)
+
+    def teardown(self, layers):
+        self.model.close()
+
+    def build(self, layers):
+        bases = [self.base]
+        for i in range(layers):
+            bases = [
+                self.model.new_space("Left%d" % i, bases=bases),
+                self.model.new_space("Right%d" % i, bases=bases)
+            ]
+        top = self.model.new_space("Top", bases=bases)
+        top.bar(1)
+        return top
+
+    def time_build(self, layers):
+        self.build(layers)
+
+    def peakmem_build(self, layers):
+        self.build(layers)
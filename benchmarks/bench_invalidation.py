@@ -0,0 +1,53 @@
+"""Clearing and recalculating values after inputs are edited"""
+
+import modelx as mx
+from modelx.core import mxsys
+
+
+def rate(t):
+    return 0.01
+
+
+def balance(t):
+    return balance(t - 1) * (1 + rate(t)) + inflow if t > 0 else 0
+
+
+class InvalidationSuite:
+    """A chain of values depending on an input cells and a reference"""
+
+    params = [10000, 50000]
+    param_names = ["length"]
+    number = 1
+    warmup_time = 0
+    timeout = 600
+
+    def setup(self, length):
+        self.maxdepth = mxsys.callstack.maxdepth
+        mx.set_recursion(length + 10)
+        self.model = mx.new_model()
+        self.space = self.model.new_space()
+        self.space.new_cells(formula=rate)
+        self.space.new_cells(formula=balance)
+        self.space.inflow = 100
+        self.space.balance(length)
+
+    def teardown(self, length):
+        self.model.close()
+        mx.set_recursion(self.maxdepth)
+
+    def time_edit_first(self, length):
+        self.space.rate[1] = 0.02
+
+    def time_edit_last(self, length):
+        self.space.rate[length] = 0.02
+
+    def time_edit_ref(self, length):
+        self.space.inflow = 200
+
+    def time_edit_first_and_recalc(self, length):
+        self.space.rate[1] = 0.02
+        self.space.balance(length)
+
+    def peakmem_edit_first_and_recalc(self, length):
+        self.space.rate[1] = 0.02
+        self.space.balance(length)
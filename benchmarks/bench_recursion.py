@@ -0,0 +1,80 @@
+"""Evaluation of deep chains of formulas and of cells with many keys"""
+
+import modelx as mx
+from modelx.core import mxsys
+
+
+def chain(i):
+    return chain(i - 1) + 1 if i > 0 else 0
+
+
+def double(i):
+    return 2 * i
+
+
+def total(n):
+    return sum(double(i) for i in range(n))
+
+
+class RecursionSuite:
+    """Chains of formulas up to the default recursion limit of 65000
+
+    Deeper chains overflow the stack of the evaluation thread.
+    """
+
+    params = [10000, 50000]
+    param_names = ["depth"]
+    number = 1
+    warmup_time = 0
+    timeout = 600
+
+    def setup(self, depth):
+        self.maxdepth = mxsys.callstack.maxdepth
+        mx.set_recursion(depth + 10)
+        self.model = mx.new_model()
+        self.space = self.model.new_space()
+        self.space.new_cells(formula=chain)
+
+    def teardown(self, depth):
+        self.model.close()
+        mx.set_recursion(self.maxdepth)
+
+    def time_chain(self, depth):
+        self.space.chain(depth)
+
+    def peakmem_chain(self, depth):
+        self.space.chain(depth)
+
+
+class WideSuite:
+    """Cells evaluated for many keys
+
+    Keys are evaluated from a formula, as top-level calls
+    cost more than calls from formulas.
+    """
+
+    params = [100000, 1000000]
+    param_names = ["keys"]
+    number = 1
+    warmup_time = 0
+    timeout = 600
+
+    def setup(self, keys):
+        self.model = mx.new_model()
+        self.space = self.model.new_space()
+        self.space.new_cells(formula=double)
+        self.space.new_cells(formula=total)
+
+    def teardown(self, keys):
+        self.model.close()
+
+    def time_evaluate(self, keys):
+        self.space.total(keys)
+
+    def peakmem_evaluate(self, keys):
+        self.space.total(keys)
+
+    def time_call(self, keys):
+        cells = self.space.double
+        for i in range(keys // 100):
+            cells(i)
@@ -0,0 +1,62 @@
+"""Saving models and opening saved models"""
+
+import os
+import shutil
+import tempfile
+
+import modelx as mx
+
+
+def spaceparams(i):
+    return None
+
+
+def double(t):
+    return 2 * t
+
+
+def total(t):
+    return double(t) + total(t - 1) if t > 0 else 0
+
+
+class SaveOpenSuite:
+
+    params = [10000, 100000]
+    param_names = ["values"]
+    number = 1
+    warmup_time = 0
+    timeout = 600
+
+    def setup(self, values):
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, "model.mx")
+        self.opened = None
+
+        self.model = mx.new_model("SaveOpen")
+        space = self.model.new_space(formula=spaceparams)
+        space.new_cells(formula=double)
+        space.new_cells(formula=total)
+        for i in range(10):
+            space[i].total(values // 20)    # values // 10 values in space[i]
+        self.model.save(self.path)
+
+    def teardown(self, values):
+        self.model.close()
+        if self.opened is not None:
+            self.opened.close()
+        shutil.rmtree(self.tempdir)
+
+    def time_save(self, values):
+        self.model.save(self.path)
+
+    def peakmem_save(self, values):
+        self.model.save(self.path)
+
+    def time_save_zlib(self, values):
+        self.model.save(self.path, compression="zlib")
+
+    def time_open(self, values):
+        self.opened = mx.open_model(self.path, name="Opened")
+
+    def peakmem_open(self, values):
+        self.opened = mx.open_model(self.path, name="Opened")
@@ -0,0 +1,79 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Awaitable evaluation of cells
+
+Cells are evaluated in the worker threads of the system's executor,
+each of which has its own execution context, so the event loop
+is not blocked while formulas are evaluated.
+When an awaiting task is cancelled, the evaluation stops
+when the next formula is called.
+"""
+
+import asyncio
+import sys
+
+# get_running_loop is new in Python 3.7.
+if sys.version_info < (3, 7, 0):
+    _get_running_loop = asyncio.get_event_loop
+else:
+    _get_running_loop = asyncio.get_running_loop
+
+
+class Job:
+    """Evaluation run in a worker thread"""
+
+    def __init__(self):
+        self.cancelled = False
+
+    def check(self):
+        """Raise CancelledError if the awaiting task is cancelled"""
+        if self.cancelled:
+            raise asyncio.CancelledError()
+
+
+def _evaluate(cells, args, kwargs, job):
+
+    execution = cells.system.execution
+    execution.job = job
+    try:
+        job.check()
+        return cells.get_value(args, kwargs)
+    finally:
+        execution.job = None
+
+
+async def evaluate(cells, args, kwargs=None):
+    """Evaluate `cells` in a worker thread and return the value"""
+
+    if cells.system.callstack:
+        raise RuntimeError("Cells cannot be awaited in formulas")
+
+    loop = _get_running_loop()
+    job = Job()
+    future = loop.run_in_executor(
+        cells.system.executor, _evaluate, cells, args, kwargs, job)
+    try:
+        return await future
+    except asyncio.CancelledError:
+        job.cancelled = True
+        raise
+
+
+async def evaluate_batch(batch):
+    """Evaluate pairs of cells and arguments concurrently"""
+
+    return await asyncio.gather(*(
+        evaluate(cells, args if isinstance(args, tuple) else (args,))
+        for cells, args in batch))
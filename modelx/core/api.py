@@ -74,7 +74,53 @@ def set_recursion(maxdepth=1000):
     Args:
         maxdepth: The maximum depth of the modelx interpreter stack.
     """
-    _system.callstack.maxdepth = maxdepth
+    _system.maxdepth = maxdepth
+
+
+def start_trace(tracer=None):
+    """Start tracing events of evaluation.
+
+    While tracing, begin and end events of cells evaluations,
+    formula calls, clearing values and dynamic space creations
+    are sent to ``tracer``. Tracing adds no cost to evaluation
+    while it is not active.
+
+    By default, events are collected by a
+    :class:`~modelx.core.trace.ChromeTracer` object, which can save
+    the events in the Chrome trace format to view them in
+    ``chrome://tracing`` or Perfetto UI::
+
+        >>> tracer = mx.start_trace()
+        >>> model.Space1.foo(100)
+        >>> mx.stop_trace().save("trace.json")
+
+    Args:
+        tracer(optional): A :class:`~modelx.core.trace.Tracer` object
+            to receive the events.
+
+    Returns:
+        The tracer receiving the events.
+
+    See Also:
+        :func:`stop_trace`
+    """
+    import modelx.core.trace as trace
+
+    if tracer is None:
+        tracer = trace.ChromeTracer()
+    trace.start_trace(_system, tracer)
+    return tracer
+
+
+def stop_trace():
+    """Stop tracing events of evaluation and return the tracer.
+
+    See Also:
+        :func:`start_trace`
+    """
+    import modelx.core.trace as trace
+
+    return trace.stop_trace(_system)
 
 
 def new_model(name=None):
@@ -265,14 +311,23 @@ def cur_space(space=None):
         return cur_space()
 
 
-def open_model(path, name=None):
+def open_model(path, name=None, spaces=None):
     """Load a model saved from a file and return it.
 
+    By default, all the values saved in the file are loaded.
+    If ``spaces`` is given, only the values of the cells in the
+    spaces and their descendant spaces are loaded. The values that were
+    calculated from the values in the other spaces are not loaded,
+    and all the cells in the other spaces are left empty.
+    Formulas and references are loaded for the entire model in any case.
+
     Args:
         path (:obj:`str`): Path to the file to load the model from.
         name (optional): If specified, the model is renamed to this name.
+        spaces (optional): Names of the top-level spaces to load
+            the values of.
 
     Returns:
         A new model created from the file.
     """
-    return _system.open_model(path, name)
+    return _system.open_model(path, name, spaces)
@@ -256,7 +256,7 @@ class Derivable(Impl):
 
 class ReferenceImpl(Derivable):
 
-    state_attrs = Derivable.state_attrs
+    state_attrs = ["name", "model"] + Derivable.state_attrs
 
     def __init__(self, parent, name, value, base=None):
         Derivable.__init__(self, parent.system, interface=value)
@@ -299,10 +299,14 @@ class ReferenceImpl(Derivable):
         else:
             clear_value = True
 
-        if self.bases:
+        if self.is_derived and self.bases:
             if clear_value:
-                self.model.clear_obj(self)
-            self.interface = self.bases[0].interface
+                self.model.clear_lexdescendants([(self,)])
+            if self.interface is not self.bases[0].interface:
+                self.interface = self.bases[0].interface
+                self.parent.self_refs.set_update()
+                if self.model.cache is not None:
+                    self.model.cache.invalidate([self])
 
 
 class NullImpl(Impl):
@@ -508,7 +512,7 @@ class LazyEval:
         raise NotImplementedError  # To be overwritten in derived classes
 
     def append_observer(self, observer):
-        if all(observer is not other for other in self.observers):
+        if all(self is not other for other in observer.observing):
             self.observers.append(observer)
             observer.observing.append(self)
             observer.set_update()
@@ -665,17 +669,91 @@ class InterfaceMixin:
         self.needs_update = True
 
 
-class ImplDict(OwnerMixin, InterfaceMixin, OrderMixin, LazyEvalDict):
+class IncrementalMixin:
+    """Mixin to LazyEval to update order and interfaces incrementally
+
+    Names of items set or deleted are recorded in ``changed`` and passed
+    on to observers that are also IncrementalMixin, so that
+    ``_update_views`` updates order and interfaces only for the names.
+    ``set_update`` called without names requests a full update.
+    """
+
+    def __init__(self):
+        self.changed = None     # None requests a full update
+
+    def set_update(self, skip_self=False, names=None):
+
+        if not skip_self:
+            if names is None:
+                self.changed = None
+            elif self.changed is not None:
+                self.changed.update(names)
+            self.needs_update = True
+
+        for observer in self.observers:
+            if isinstance(observer, IncrementalMixin):
+                if (names is not None
+                        or observer.changed is not None
+                        or not observer.needs_update):
+                    observer.set_update(names=names)
+            elif not observer.needs_update:
+                observer.set_update()
+
+    def _update_views(self):
+
+        changed, self.changed = self.changed, set()
+        if changed is None:
+            self._update_order()
+            self._update_interfaces()
+            return
+
+        deleted = {
+            name for name in changed
+            if name in self._interfaces and name not in self
+        }
+        if deleted:
+            self.order[:] = [key for key in self.order if key not in deleted]
+            for name in deleted:
+                del self._interfaces[name]
+
+        added = []
+        for name in changed:
+            if name in self:
+                if name in self._interfaces:
+                    self._interfaces[name] = self[name].interface
+                else:
+                    added.append(name)
+
+        for name in sorted(added):
+            self.order.append(name)
+            self._interfaces[name] = self[name].interface
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.changed = None
+
+
+class ImplDict(
+    OwnerMixin, InterfaceMixin, OrderMixin, IncrementalMixin, LazyEvalDict
+):
     def __init__(self, owner, ifclass, data=None, observers=None):
         InterfaceMixin.__init__(self, ifclass)
         OrderMixin.__init__(self)
         OwnerMixin.__init__(self, owner)
+        IncrementalMixin.__init__(self)
         LazyEvalDict.__init__(self, data, observers)
 
     def _update_data(self):
         LazyEvalDict._update_data(self)
-        self._update_order()
-        self._update_interfaces()
+        self._update_views()
+
+    def set_item(self, name, value, skip_self=False):
+        UserDict.__setitem__(self, name, value)
+        self.set_update(skip_self, names=(name,))
+
+    def del_item(self, name, skip_self=False):
+        UserDict.__delitem__(self, name)
+        self.set_update(skip_self, names=(name,))
 
     def __repr__(self):
         if hasattr(self, "debug_name"):
@@ -687,19 +765,21 @@ class ImplDict(OwnerMixin, InterfaceMixin, OrderMixin, LazyEvalDict):
         )
 
 
-class ImplChainMap(OwnerMixin, InterfaceMixin, OrderMixin, LazyEvalChainMap):
+class ImplChainMap(
+    OwnerMixin, InterfaceMixin, OrderMixin, IncrementalMixin, LazyEvalChainMap
+):
     def __init__(
         self, owner, ifclass, maps=None, observers=None, observe_maps=True
     ):
         InterfaceMixin.__init__(self, ifclass)
         OrderMixin.__init__(self)
         OwnerMixin.__init__(self, owner)
+        IncrementalMixin.__init__(self)
         LazyEvalChainMap.__init__(self, maps, observers, observe_maps)
 
     def _update_data(self):
         LazyEvalChainMap._update_data(self)
-        self._update_order()
-        self._update_interfaces()
+        self._update_views()
 
     def __repr__(self):
         if hasattr(self, "debug_name"):
@@ -834,7 +914,15 @@ class SelectedView(BaseView):
 
 
 class BoundFunction(LazyEval):
-    """Hold function with updated namespace"""
+    """Hold function with updated namespace
+
+    ``altfunc`` is a function sharing its code object with the owner's
+    formula and having the owner's namespace as its globals.
+    The namespace is updated in place, so ``altfunc`` is recreated
+    only when the formula or the namespace object is replaced.
+    Owners sharing the same formula, such as dynamic spaces
+    derived from the same base, share the same code object.
+    """
 
     def __init__(self, owner):
         """Create altered function from owner's formula.
@@ -855,29 +943,38 @@ class BoundFunction(LazyEval):
         """Update altfunc"""
 
         func = self.owner.formula.func
-        codeobj = func.__code__
-        name = func.__name__  # self.cells.name   # func.__name__
         namespace_impl = self.owner._namespace_impl.get_updated()
         namespace = namespace_impl.interfaces
         selfnode = get_node(self.owner, None, None)
+        lexdep = self.owner.model.lexdep
 
         for name in self.owner.formula.srcnames:
-            if name in namespace_impl and isinstance(
-                namespace_impl[name], ReferenceImpl
-            ):
-                refnode = get_node(namespace_impl[name], None, None)
-                self.owner.model.lexdep.add_path([selfnode, refnode])
-
-        closure = func.__closure__  # None normally.
-        if closure is not None:  # pytest fails without this.
-            closure = create_closure(self.owner.interface)
-
-        self.altfunc = FunctionType(
-            codeobj, namespace, name=name, closure=closure
-        )
+            impl = namespace_impl.get(name)
+            if isinstance(impl, ReferenceImpl):
+                refnode = get_node(impl, None, None)
+                if not lexdep.has_edge(selfnode, refnode):
+                    lexdep.add_path([selfnode, refnode])
+
+        if (
+            self.altfunc is None
+            or self.altfunc.__code__ is not func.__code__
+            or self.altfunc.__globals__ is not namespace
+            or self.altfunc.__name__ != func.__name__
+        ):
+            closure = func.__closure__  # None normally.
+            if closure is not None:  # pytest fails without this.
+                closure = create_closure(self.owner.interface)
+
+            self.altfunc = FunctionType(
+                func.__code__, namespace, name=func.__name__, closure=closure
+            )
 
     def __getstate__(self):
         state = self.__dict__.copy()
         del state["altfunc"]
         state["needs_update"] = True  # Reconstruct altfunc after unpickling
         return state
+
+    def __setstate__(self, state):
+        LazyEval.__setstate__(self, state)
+        self.altfunc = None
@@ -0,0 +1,348 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Persistent cache of cells values
+
+Values of cells are stored in an SQLite database file
+keyed by fingerprints of the cells and their arguments.
+The fingerprint of a cells is a hash of
+its formula source, the input values set in the cells,
+and the fingerprints of the objects its formula refers to by name,
+such as other cells, spaces and references.
+Values calculated in a previous session are reused
+only if all their precedents have the same fingerprints.
+
+Objects referring to each other form strongly connected components,
+and all the members of a component share the same dependencies.
+When an object changes, only the fingerprints of its component
+and of the components depending on it are reset.
+"""
+
+import hashlib
+import marshal
+import pickle
+import sqlite3
+from types import ModuleType
+
+from modelx.core.base import Interface, ReferenceImpl
+from modelx.core.cells import CellsImpl
+from modelx.core.node import OBJ, KEY
+from modelx.core.space import BaseSpaceImpl
+
+_CREATE_TABLE = (
+    "CREATE TABLE IF NOT EXISTS cellsvalues "
+    "(id TEXT PRIMARY KEY, value BLOB)"
+)
+
+
+_CONTAINERS = (tuple, list, dict, set, frozenset)
+
+
+def _get_name(impl):
+    """Return the evaluable name of ``impl`` without its model name"""
+    return impl.evalrepr.split(".", 1)[-1]
+
+
+def _digest_value(value):
+    """Return bytes identifying ``value``
+
+    Sets are digested from the sorted digests of their elements,
+    as their order depends on the hash seed of the process.
+    Containers holding other containers are digested item by item
+    to find sets in them.
+    """
+    if isinstance(value, ModuleType):
+        return ("module:" + value.__name__).encode()
+    elif isinstance(value, Interface):
+        return ("interface:" + _get_name(value._impl)).encode()
+    elif isinstance(value, (set, frozenset)):
+        return _hash(
+            type(value).__name__, *sorted(_digest_value(v) for v in value)
+        ).encode()
+    elif type(value) in (tuple, list) and any(
+            isinstance(v, _CONTAINERS) for v in value):
+        return _hash(
+            type(value).__name__, *(_digest_value(v) for v in value)
+        ).encode()
+    elif type(value) is dict and any(
+            isinstance(k, _CONTAINERS) or isinstance(v, _CONTAINERS)
+            for k, v in value.items()):
+        return _hash(
+            "dict", *(_digest_value(item) for item in value.items())
+        ).encode()
+    else:
+        try:
+            return pickle.dumps(value, protocol=4)
+        except Exception:
+            return ("repr:" + repr(value)).encode()
+
+
+def _hash(*parts):
+    hasher = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        hasher.update(len(part).to_bytes(8, "little"))
+        hasher.update(part)
+    return hasher.hexdigest()
+
+
+class PersistentCache:
+    """Store and load values of cells in a model
+
+    Args:
+        model: ModelImpl object
+        path(str): Path to the SQLite database file
+        batchsize(int): Number of values written to the file at once
+    """
+
+    def __init__(self, model, path, batchsize=1000):
+
+        self.model = model
+        self.path = path
+        self.batchsize = batchsize
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(_CREATE_TABLE)
+        self.connection.commit()
+
+        self.pending = {}
+        self.fingerprints = {}
+        self.dependents = {}    # Objects to those whose fingerprints use them
+        self.loaded = {}        # Cells to keys of values loaded
+        self.outdated = set()   # Cells whose loaded values are to be cleared
+
+        # Values existing before the cache is enabled are treated
+        # as input values unless they are known to be calculated.
+        self.inputs = {}
+        graph = model.cellgraph
+        for cells in self._iter_cells(model.spaces):
+            for key in cells.data:
+                node = (cells, key)
+                if not graph.has_node(node) or not graph.in_degree(node):
+                    self.inputs.setdefault(cells, set()).add(key)
+
+    def _iter_cells(self, spaces):
+        for space in spaces.values():
+            yield from space.cells.values()
+            yield from self._iter_cells(space.spaces)
+
+    # ----------------------------------------------------------------------
+    # Storing and loading values
+
+    def get_id(self, cells, key):
+        return _hash(
+            self.get_fingerprint(cells), *(_digest_value(arg) for arg in key)
+        )
+
+    def load(self, cells, key):
+        """Return a tuple of a flag if found and the value"""
+        valueid = self.get_id(cells, key)
+        if valueid in self.pending:
+            blob = self.pending[valueid]
+        else:
+            row = self.connection.execute(
+                "SELECT value FROM cellsvalues WHERE id = ?", (valueid,)
+            ).fetchone()
+            if row is None:
+                return False, None
+            blob = row[0]
+
+        self.loaded.setdefault(cells, set()).add(key)
+        return True, pickle.loads(blob)
+
+    def store(self, cells, key, value):
+        try:
+            blob = pickle.dumps(value, protocol=4)
+        except Exception:
+            return  # Unpicklable values are not cached
+
+        self.pending[self.get_id(cells, key)] = blob
+        if len(self.pending) >= self.batchsize:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO cellsvalues VALUES (?, ?)",
+                self.pending.items(),
+            )
+            self.connection.commit()
+            self.pending.clear()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    # ----------------------------------------------------------------------
+    # Invalidation
+
+    def add_input(self, cells, key):
+        self.inputs.setdefault(cells, set()).add(key)
+        self.invalidate([cells])
+
+    def remove_values(self, removed):
+        """Update the cache after values of `removed` nodes are cleared"""
+        changed = []
+        for obj, key in removed:
+            if obj in self.loaded:
+                self.loaded[obj].discard(key)
+            if key in self.inputs.get(obj, ()):
+                self.inputs[obj].discard(key)
+                changed.append(obj)
+        self.invalidate(changed)
+
+    def invalidate(self, objs=None):
+        """Reset fingerprints after changes in the model
+
+        The fingerprints of `objs` and the objects depending on them,
+        i.e. their components and the components downstream, are reset.
+        All the fingerprints are reset if `objs` is None.
+
+        Values loaded from the cache have no edges from their precedents
+        in the cell graph, so they are cleared with their descendants
+        if the fingerprints of their cells are reset.
+        While a formula is being evaluated, clearing them is deferred
+        to the next invalidation outside formulas.
+        """
+        if objs is None:
+            self.outdated.update(self.loaded)
+            self.fingerprints.clear()
+            self.dependents.clear()
+        else:
+            reset = set()
+            stack = list(objs)
+            while stack:
+                obj = stack.pop()
+                if obj not in reset:
+                    reset.add(obj)
+                    self.fingerprints.pop(obj, None)
+                    stack.extend(self.dependents.pop(obj, ()))
+            self.outdated.update(reset)
+
+        if self.model.system.callstack:
+            return
+
+        outdated, self.outdated = self.outdated, set()
+        for obj in outdated:
+            for key in self.loaded.pop(obj, ()):
+                node = (obj, key)
+                if self.model.cellgraph.has_node(node):
+                    self.model.clear_descendants(node)
+
+    # ----------------------------------------------------------------------
+    # Fingerprints
+
+    def get_fingerprint(self, obj):
+        if obj not in self.fingerprints:
+            self._update_fingerprints(obj)
+        return self.fingerprints[obj]
+
+    def _update_fingerprints(self, root):
+        """Calculate fingerprints of components by Tarjan's algorithm"""
+
+        index = {}
+        lowlink = {}
+        stack = []
+        onstack = set()
+
+        def visit(obj):
+            index[obj] = lowlink[obj] = len(index)
+            stack.append(obj)
+            onstack.add(obj)
+
+            for dep in self._get_deps(obj):
+                if dep in self.fingerprints:
+                    continue
+                elif dep not in index:
+                    visit(dep)
+                    lowlink[obj] = min(lowlink[obj], lowlink[dep])
+                elif dep in onstack:
+                    lowlink[obj] = min(lowlink[obj], index[dep])
+
+            if lowlink[obj] == index[obj]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    onstack.discard(member)
+                    component.append(member)
+                    if member is obj:
+                        break
+                self._set_fingerprints(component)
+
+        visit(root)
+
+    def _set_fingerprints(self, component):
+
+        members = set(component)
+        locals_ = {obj: self._get_local(obj) for obj in component}
+        descs = []
+        for obj in component:
+            deps = self._get_deps(obj)
+            for dep in deps:
+                self.dependents.setdefault(dep, set()).add(obj)
+            external = sorted(
+                self.fingerprints[dep] for dep in deps if dep not in members
+            )
+            descs.append(_hash(locals_[obj], *external))
+
+        digest = _hash(*sorted(descs))
+        for obj in component:
+            self.fingerprints[obj] = _hash(digest, locals_[obj])
+
+    def _get_deps(self, obj):
+
+        if isinstance(obj, ReferenceImpl):
+            value = obj.interface
+            if isinstance(value, Interface) and isinstance(
+                    value._impl, (CellsImpl, BaseSpaceImpl)):
+                return [value._impl]
+            else:
+                return []
+
+        elif isinstance(obj, CellsImpl):
+            namespace = obj.parent.namespace_impl
+            srcnames = obj.formula.srcnames or []
+            return [namespace[name] for name in srcnames if name in namespace]
+
+        else:
+            deps = list(obj.cells.values())
+            deps.extend(obj.refs.values())
+            deps.extend(obj.static_spaces.values())
+            return deps
+
+    def _get_local(self, obj):
+
+        if isinstance(obj, ReferenceImpl):
+            return _hash("ref", obj.name, _digest_value(obj.interface))
+
+        elif isinstance(obj, CellsImpl):
+            formula = obj.formula
+            if formula.source is not None:
+                source = formula.source
+            else:
+                source = marshal.dumps(formula.func.__code__)
+
+            keys = self.inputs.get(obj, ())
+            inputs = sorted(
+                _hash(_digest_value(key), _digest_value(obj.data[key]))
+                for key in keys
+                if key in obj.data
+            )
+            return _hash(
+                "cells", _get_name(obj), source,
+                ",".join(formula.srcnames or []), *inputs
+            )
+        else:
+            source = obj.formula.source if obj.formula else ""
+            return _hash("space", _get_name(obj), source)
@@ -12,6 +12,7 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
+import importlib
 from textwrap import dedent
 import warnings
 from collections import namedtuple
@@ -19,9 +20,9 @@ from collections.abc import Mapping, Callable, Sized, Sequence
 from itertools import combinations
 
 from modelx.core.base import Impl, Derivable, Interface, BoundFunction
-from modelx.core.node import OBJ, KEY, get_node, tuplize_key
-from modelx.core.formula import Formula, NULL_FORMULA
-from modelx.core.util import is_valid_name
+from modelx.core.node import OBJ, KEY, get_node, tuplize_key, ArrayNode
+from modelx.core.formula import Formula, ModuleSource, NULL_FORMULA
+from modelx.core.util import is_valid_name, get_module
 from modelx.core.errors import NoneReturnedError, RewindStackError
 
 
@@ -65,6 +66,16 @@ class Cells(Interface, Mapping, Callable):
     Cells are created by ``new_cells`` method or its variant methods of
     the containing space, or by function definitions with ``defcells``
     decorator.
+
+    If a cells is called with NumPy arrays as its arguments,
+    its formula is evaluated only once with the arrays
+    (broadcast to 1-dimensional arrays of the same length)
+    bound to the parameters, and an array of the values is returned.
+    The element values are stored as the values of the element arguments,
+    so calling the cells with scalar arguments afterwards
+    returns the stored values without evaluating the formula again.
+    Formulas evaluated this way must be element-wise operations
+    on their arguments, such as ``qx(x) * (1 + i) ** -t``.
     """
 
     __slots__ = ()
@@ -78,6 +89,28 @@ class Cells(Interface, Mapping, Callable):
     def __call__(self, *args, **kwargs):
         return self._impl.get_value(args, kwargs)
 
+    async def aeval(self, *args, **kwargs):
+        """Evaluate the cells without blocking the event loop.
+
+        A coroutine to get the value for the arguments
+        in a :mod:`asyncio` event loop.
+        The formula is evaluated in a worker thread,
+        and the value is returned when the evaluation completes.
+        If the awaiting task is cancelled, the evaluation stops
+        when the next formula is called.
+
+        Example:
+            .. code-block:: python
+
+                value = await space.foo.aeval(1)
+
+        See Also:
+            :meth:`Model.aevaluate <modelx.core.model.Model.aevaluate>`
+        """
+        from modelx.core.aeval import evaluate
+
+        return await evaluate(self._impl, args, kwargs)
+
     def match(self, *args, **kwargs):
         """Returns the best matching args and their value.
 
@@ -377,6 +410,10 @@ class CellsImpl(Derivable):
 
     if_class = Cells
 
+    frozenfunc = None  # Set while the model is frozen. Not pickled.
+    match_patterns = None  # Built by find_match. Not pickled.
+    match_counts = None  # Numbers of keys per pattern. Not pickled.
+
     def __init__(
         self, *, space, name=None, formula=None, data=None, base=None
     ):
@@ -487,8 +524,14 @@ class CellsImpl(Derivable):
             if clear_value:
                 self._model.clear_obj(self)
             self.formula = self.bases[0].formula
+            self.match_patterns = self.match_counts = None
             self.altfunc.set_update()
 
+    def del_self(self):
+        """Clear values and stop observing the namespace on deletion"""
+        self._model.clear_obj(self)
+        self.altfunc.unobserve(self._namespace_impl)
+
     @property
     def module(self):
         return self.formula.module
@@ -505,21 +548,42 @@ class CellsImpl(Derivable):
     # Formula operations
 
     def reload(self, module=None):
-        oldsrc = self.formula.source
-        newsrc = self.formula._reload(module).source
-        if oldsrc != newsrc:
+        """Update the formula if its definition in the module is changed
+
+        Values are kept if only comments or formatting are changed.
+        """
+        self._model.check_editable()
+        if module is None:
+            module = ModuleSource(
+                importlib.reload(get_module(self.formula.module)))
+
+        if module.is_changed(self.formula):
             self._model.clear_obj(self)
+            self.formula._reload(module)
+            self.match_patterns = self.match_counts = None
+            self.altfunc.set_update()
+            self._model.spacegraph.update_subspaces_upward(
+                self.parent, from_parent=False, event="cells_set_formula"
+            )
 
     def clear_formula(self):
         self.set_formula(NULL_FORMULA)
 
+    def freeze(self):
+        self.frozenfunc = self.altfunc.get_updated().altfunc
+
+    def unfreeze(self):
+        self.frozenfunc = None
+
     def set_formula(self, func):
 
         if self.parent.is_dynamic():
             raise ValueError("cannot set formula in dynamic space")
+        self._model.check_editable()
         self._model.clear_obj(self)
         formula = Formula(func, name=self.name)
         self.formula = formula
+        self.match_patterns = self.match_counts = None
         self.altfunc.set_update()
         self._model.spacegraph.update_subspaces_upward(
             self.parent, from_parent=False, event="cells_set_formula"
@@ -530,36 +594,161 @@ class CellsImpl(Derivable):
 
     def on_eval_formula(self, key):
 
-        value = self.altfunc.get_updated().altfunc(*key)
+        cache = self._model.cache
+        if cache is not None:
+            with self._model.lock:
+                found, value = cache.load(self, key)
+                if found:
+                    return self._store_value(key, value, False)
 
-        if self.has_cell(key):
-            # Assignment took place inside the cell.
-            if value is not None:
-                raise ValueError("Duplicate assignment for %s" % key)
+        func = self.frozenfunc or self.altfunc.get_updated().altfunc
+        value = func(*key)
+
+        assigned = self.system.execution.assigned
+        with self._model.lock:
+            if (self, key) in assigned:
+                # Assignment took place inside the cell.
+                if value is not None:
+                    raise ValueError("Duplicate assignment for %s" % key)
+                else:
+                    value = self.data[key]
+                    del self.data[key]
+                    value = self._store_value(key, value, False)
+            elif self.has_cell(key):
+                # Calculated by another thread in the meantime
+                return self.data[key]
             else:
-                value = self.data[key]
-                del self.data[key]
                 value = self._store_value(key, value, False)
-        else:
-            value = self._store_value(key, value, False)
+
+            if cache is not None:
+                cache.store(self, key, value)
 
         return value
 
+    def on_eval_array(self, node):
+
+        import numpy as np
+
+        keys = node.keys
+        graph = self._model.cellgraph
+
+        try:
+            func = self.frozenfunc or self.altfunc.get_updated().altfunc
+            values = func(*node[KEY])
+            values = np.broadcast_to(values, (len(keys),)).tolist()
+        finally:
+            # Edges to the ArrayNode are moved to the element nodes below.
+            with self._model.lock:
+                if graph.has_node(node):
+                    preds = list(graph.predecessors(node))
+                    graph.remove_node(node)
+                else:
+                    preds = []
+
+        if None in values and not self.get_property("allow_none"):
+            tracemsg = self.system.callstack.tracemessage()
+            raise NoneReturnedError(node, tracemsg)
+
+        with self._model.lock:
+            self.data.update(zip(keys, values))
+            if self.match_patterns is not None:
+                for key, value in zip(keys, values):
+                    if value is not None:
+                        self._add_match_pattern(key)
+
+            elements = node.elements()
+            graph.add_nodes_from(elements)
+            graph.add_edges_from(
+                (pred, elm) for pred in preds for elm in elements)
+
+        return values
+
+    def get_array_value(self, node):
+        """Get values for NumPy array arguments at once.
+
+        The formula is evaluated once only for the elements whose values
+        are not calculated yet. Values are stored by element keys.
+        Outdated values in the incremental mode are refreshed first.
+        """
+        import numpy as np
+
+        key = node[KEY]
+        if not any(isinstance(arg, np.ndarray) for arg in key):
+            raise TypeError("unhashable arguments: %s" % repr(key))
+
+        arrays = np.broadcast_arrays(*key)
+        if arrays[0].ndim != 1:
+            raise ValueError("array arguments must be 1-dimensional")
+
+        keys = list(zip(*[arr.tolist() for arr in arrays]))
+        dirty = self._model.dirty
+        if dirty:
+            for k in keys:
+                if (self, k) in dirty:
+                    self._model.refresh((self, k))
+
+        data = self.data
+        missing = [i for i, k in enumerate(keys) if k not in data]
+
+        if len(missing) == len(keys):
+            arrnode = ArrayNode(self, tuple(arrays), keys)
+            values = self.system.execution.eval_array(arrnode)
+        elif missing:
+            arrnode = ArrayNode(
+                self,
+                tuple(arr[missing] for arr in arrays),
+                [keys[i] for i in missing]
+            )
+            self.system.execution.eval_array(arrnode)
+            values = [data[k] for k in keys]
+        else:
+            values = [data[k] for k in keys]
+
+        nodes = [(self, k) for k in keys]
+        graph = self._model.cellgraph
+        if self.system.callstack:
+            caller = self.system.callstack.last()
+            if isinstance(caller, ArrayNode):
+                if len(caller.keys) != len(keys):
+                    raise ValueError(
+                        "length of arrays passed to %s does not match"
+                        " the length of the caller's arrays"
+                        % self.get_repr(fullname=True, add_params=False)
+                    )
+                with self._model.lock:
+                    graph.add_edges_from(zip(nodes, caller.elements()))
+            else:
+                with self._model.lock:
+                    graph.add_edges_from((n, caller) for n in nodes)
+        else:
+            with self._model.lock:
+                graph.add_nodes_from(nodes)
+
+        return np.array(values)
+
     def get_value(self, args, kwargs=None):
 
         node = get_node(self, *convert_args(args, kwargs))
         key = node[KEY]
 
-        if self.has_cell(key):
+        try:
+            has_cell = self.has_cell(key)
+        except TypeError:   # Unhashable args such as NumPy arrays
+            return self.get_array_value(node)
+
+        if has_cell:
+            if self._model.dirty and node in self._model.dirty:
+                self._model.refresh(node)
             value = self.data[key]
         else:
             value = self.system.execution.eval_cell(node)
 
         graph = self._model.cellgraph
-        if self.system.callstack:
-            graph.add_path([node, self.system.callstack.last()])
-        else:
-            graph.add_node(node)
+        with self._model.lock:
+            if self.system.callstack:
+                graph.add_path([node, self.system.callstack.last()])
+            else:
+                graph.add_node(node)
 
         return value
 
@@ -574,6 +763,9 @@ class CellsImpl(Derivable):
             tracemsg = self.system.callstack.tracemessage()
             raise NoneReturnedError(node, tracemsg)
 
+        if self.formula.is_null() and all(arg is not None for arg in key):
+            return self._find_match_indexed(key)
+
         for match_len in range(keylen, -1, -1):
             for idxs in combinations(range(keylen), match_len):
                 masked = [None] * keylen
@@ -585,6 +777,105 @@ class CellsImpl(Derivable):
 
         return ArgsValuePair(None, None)
 
+    def _find_match_indexed(self, key):
+        """Find the best match from the stored values
+
+        Only masks of keys stored in ``data`` are looked up,
+        most specific first.
+        The formula must return None for any arguments,
+        so that masked arguments not stored have no value.
+        In a formula, edges are added from the nodes of the looked up
+        masks, stored or not, and of the mask of all None
+        to the caller, so that the caller is cleared by
+        :meth:`_add_match_key` and by clearing the stored values.
+        """
+        if self.match_patterns is None:
+            self._build_match_index()
+
+        data = self.data
+        probed = [(None,) * len(key)]
+        result = ArgsValuePair(None, None)
+        for idxs in self.match_patterns:
+            masked = tuple(
+                key[i] if i in idxs else None for i in range(len(key)))
+            probed.append(masked)
+            value = data.get(masked)
+            if value is not None:
+                result = ArgsValuePair(masked, value)
+                break
+
+        if self.system.callstack:
+            caller = self.system.callstack.last()
+            with self._model.lock:
+                self._model.cellgraph.add_edges_from(
+                    ((self, masked), caller) for masked in probed)
+
+        return result
+
+    def _build_match_index(self):
+        self.match_patterns = []
+        self.match_counts = {}
+        for args, value in self.data.items():
+            if value is not None:
+                self._add_match_pattern(args)
+
+    def _has_match_lookups(self, key):
+        """True if find_match looked up values in a formula
+
+        The index is not pickled, so lookups are found by the edges
+        from the mask of all None.
+        """
+        if not self.formula.is_null():
+            return False
+        graph = self._model.cellgraph
+        node = (self, (None,) * len(key))
+        return graph.has_node(node) and graph.out_degree(node) > 0
+
+    def _add_match_pattern(self, key):
+        """Count key in the index of the positions of non-None arguments
+
+        Patterns are sorted in the order ``find_match`` looks them up.
+        Return True if the pattern is new.
+        """
+        idxs = frozenset(i for i, arg in enumerate(key) if arg is not None)
+        count = self.match_counts.get(idxs, 0)
+        self.match_counts[idxs] = count + 1
+        if not count:
+            self.match_patterns.append(idxs)
+            self.match_patterns.sort(
+                key=lambda idxs: (-len(idxs), sorted(idxs)))
+        return not count
+
+    def _remove_match_pattern(self, key):
+        """Uncount key and remove its pattern if no keys are left"""
+        idxs = frozenset(i for i, arg in enumerate(key) if arg is not None)
+        count = self.match_counts.get(idxs, 0)
+        if count > 1:
+            self.match_counts[idxs] = count - 1
+        elif count:
+            del self.match_counts[idxs]
+            self.match_patterns.remove(idxs)
+
+    def _add_match_key(self, key):
+        """Add key to the index and clear lookups it may change
+
+        Lookups that probed key are cleared. If the pattern of key
+        is new, all lookups are cleared, as they have not probed it.
+        """
+        graph = self._model.cellgraph
+        if self._add_match_pattern(key):
+            node = (self, (None,) * len(key))
+        else:
+            node = (self, key)
+        if graph.has_node(node) and graph.out_degree(node):
+            self._model.clear_descendants(node, clear_source=False)
+
+    def _del_value(self, key):
+        """Remove the value of key if any and update the match index"""
+        value = self.data.pop(key, None)    # Probed masks have no values
+        if self.match_patterns is not None and value is not None:
+            self._remove_match_pattern(key)
+
     def set_value(self, args, value):
 
         node = get_node(self, *convert_args(args, {}))
@@ -592,12 +883,40 @@ class CellsImpl(Derivable):
 
         if self.system.callstack:
             if node == self.system.callstack.last():
-                self._store_value(key, value, False)
+                assigned = self.system.execution.assigned
+                with self._model.lock:
+                    # Skip if already calculated by another thread
+                    if node in assigned or not self.has_cell(key):
+                        self._store_value(key, value, False)
+                assigned.add(node)
             else:
                 raise KeyError("Assignment in cells other than %s" % key)
+        elif self._model.incremental and self.has_cell(key):
+            with self._model.lock:
+                if self._model.active_fork is not None:
+                    self._model.active_fork.record_input(node)
+                old = self.data.pop(key)
+                counted = self.match_patterns is not None and old is not None
+                if counted:
+                    self._remove_match_pattern(key)
+                try:
+                    self._store_value(key, value, False)
+                except:
+                    self.data[key] = old
+                    if counted:
+                        self._add_match_pattern(key)
+                    raise
+                self._model.set_changed(node, old, self.data[key])
+                if self._model.cache is not None:
+                    self._model.cache.add_input(self, key)
         else:
-            self._store_value(key, value, True)
-            self._model.cellgraph.add_node(node)
+            with self._model.lock:
+                if self._model.active_fork is not None:
+                    self._model.active_fork.record_input(node)
+                self._store_value(key, value, True)
+                self._model.cellgraph.add_node(node)
+                if self._model.cache is not None:
+                    self._model.cache.add_input(self, key)
 
     def _store_value(self, key, value, overwrite=False):
 
@@ -611,7 +930,12 @@ class CellsImpl(Derivable):
                 self.clear_value(*key)
 
             if value is not None:
+                if (self.match_patterns is None
+                        and self._has_match_lookups(key)):
+                    self._build_match_index()
                 self.data[key] = value
+                if self.match_patterns is not None:
+                    self._add_match_key(key)
             elif self.get_property("allow_none"):
                 self.data[key] = value
             else:
@@ -632,8 +956,7 @@ class CellsImpl(Derivable):
                 self._model.clear_descendants(node)
 
     def clear_all_values(self):
-        for args in list(self.data):
-            self.clear_value(*args)
+        self._model.clear_many([(self, key) for key in self.data])
 
     # ----------------------------------------------------------------------
     # Pandas I/O
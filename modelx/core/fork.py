@@ -0,0 +1,112 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Scenarios on top of computed models
+
+A fork records the differences made to a model while it is active,
+so that the model can be put back to the state before the fork.
+Values assigned to cells and changes to references are applied to
+the model itself, and values cleared by the changes are recorded
+together with their edges in the cell graph.
+"""
+
+from modelx.core.node import OBJ, KEY
+
+
+class ModelFork:
+    """Record of changes made to a model while it is forked
+
+    Created by :meth:`Model.fork <modelx.core.model.Model.fork>`.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.values = {}    # Cleared nodes and their values
+        self.edges = set()  # Edges of the cleared nodes
+        self.inputs = set()  # Nodes assigned values
+        self.refs = {}  # (owner, name) to (existed, value)
+
+    # ----------------------------------------------------------------------
+    # Recording
+
+    def record_values(self, nodes):
+        """Record values and edges of nodes before they are cleared"""
+        graph = self.model.cellgraph
+        for node in nodes:
+            if node in self.values or node[KEY] not in node[OBJ].data:
+                continue
+            self.values[node] = node[OBJ].data[node[KEY]]
+            if graph.has_node(node):
+                self.edges.update(graph.in_edges(node))
+                self.edges.update(graph.out_edges(node))
+
+    def record_input(self, node):
+        self.inputs.add(node)
+        self.record_values([node])
+
+    def record_ref(self, owner, name):
+        if (owner, name) in self.refs:
+            return
+        refs = owner.global_refs if owner is self.model else owner.self_refs
+        if name in refs:
+            self.refs[(owner, name)] = (True, refs[name].interface)
+        else:
+            self.refs[(owner, name)] = (False, None)
+
+    # ----------------------------------------------------------------------
+    # Discarding
+
+    @property
+    def is_active(self):
+        return self.model.active_fork is self
+
+    def discard(self):
+        """Put back the values and references as they were before the fork
+
+        Values calculated during the fork are cleared if they depend
+        on the changes, and kept otherwise.
+        """
+        if not self.is_active:
+            raise RuntimeError("Fork is not active")
+
+        model = self.model
+        model.active_fork = None
+
+        for (owner, name), (existed, value) in self.refs.items():
+            if existed:
+                owner.set_attr(name, value)
+            else:
+                owner.del_ref(name)
+
+        model.clear_many(self.inputs)
+
+        graph = model.cellgraph
+        for node, value in self.values.items():
+            node[OBJ].data[node[KEY]] = value
+            node[OBJ].match_patterns = None     # Rebuilt by find_match
+            graph.add_node(node)
+
+        for edge in self.edges:
+            if graph.has_node(edge[0]) and graph.has_node(edge[1]):
+                graph.add_edge(*edge)
+
+        self.values.clear()
+        self.edges.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.is_active:
+            self.discard()
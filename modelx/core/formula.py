@@ -14,9 +14,13 @@
 
 import token
 import ast
+import hashlib
+import dis
+import linecache
 import warnings
+from functools import lru_cache
 from types import FunctionType
-from inspect import signature, getsource, getsourcefile
+from inspect import signature, getblock
 from textwrap import dedent
 import tokenize
 import io
@@ -171,6 +175,24 @@ def create_closure(new_value):
     return closure
 
 
+def get_digest(node):
+    """Return a digest of a FunctionDef or Lambda ast node
+
+    Decorators, comments and formatting do not affect the digest.
+    """
+    if isinstance(node, ast.FunctionDef):
+        decorators = node.decorator_list
+        node.decorator_list = []
+        try:
+            dump = ast.dump(node)
+        finally:
+            node.decorator_list = decorators
+    else:
+        dump = ast.dump(node)
+
+    return hashlib.sha1(dump.encode()).hexdigest()
+
+
 class ModuleSource:
     """A class to hold function objects defined in a module.
 
@@ -180,10 +202,11 @@ class ModuleSource:
     the module's global namespace, unless the names are rebound
     to renewed formula objects.
 
-    This class checks function objects in the global namespace of a module
-    against function definitions in the module by looking at the module's
-    source code, and filter out old functions and only hold new functions
-    in its ``funcs`` attribute.
+    This class parses the source code of the module, and
+    filters out old functions and only holds new functions
+    in its ``funcs`` attribute. Functions are those defined by
+    top-level function definitions or lambda assignments.
+    ``digests`` maps their names to digests of their definitions.
     """
 
     def __init__(self, module):
@@ -193,28 +216,35 @@ class ModuleSource:
         with open(file, "r") as srcfile:
             self.source = srcfile.read()
 
-        codeobj = compile(self.source, file, mode="exec")
-        namespace = {}
-        eval(codeobj, namespace)
-
-        srcfuncs = {}
-        for name in namespace:
-            obj = namespace[name]
-            if isinstance(obj, FunctionType) and getsourcefile(obj) == file:
-                srcfuncs[name] = obj
+        self.digests = {}
+        for node in ast.parse(self.source, file).body:
+            if isinstance(node, ast.FunctionDef):
+                self.digests[node.name] = get_digest(node)
+            elif (
+                isinstance(node, ast.Assign)
+                and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and isinstance(node.value, ast.Lambda)
+            ):
+                self.digests[node.targets[0].id] = get_digest(node.value)
 
         self.funcs = {}
-        for name in module.__dict__:
-            obj = getattr(module, name)
+        for name, obj in module.__dict__.items():
             if (
                 isinstance(obj, FunctionType)
                 and obj.__module__ == self.name
-                and name in srcfuncs
-                and getsource(obj) == getsource(srcfuncs[name])
+                and name in self.digests
             ):
-
                 self.funcs[name] = obj
 
+    def is_changed(self, formula):
+        """Check if the definition of ``formula`` is changed in the module"""
+        if formula.name not in self.funcs or formula.source is None:
+            return True
+        else:
+            return self.digests[formula.name] != get_digest(
+                find_funcdef(dedent(formula.source)))
+
 
 def is_funcdef(src):
     """True if src is a function definition"""
@@ -298,88 +328,182 @@ def extract_lambda(source: str):
     return source[node.first_token.startpos:node.last_token.endpos]
 
 
+@lru_cache(maxsize=None)
+def parse_source(src: str, name: str):
+    """Analyze the source of a formula
+
+    The result is cached by the source text and the name,
+    so identical formulas are analyzed only once in the process.
+
+    Returns:
+        A tuple of the formula source without decorators,
+        the name of the function defined by it
+        and a flag whether it is a lambda expression.
+    """
+    if is_funcdef(src):
+        module_node = ast.parse(dedent(src))
+        funcname = name or module_node.body[0].name
+        src = remove_decorator(dedent(src))
+        if name:
+            src = replace_funcname(src, name)
+        return src, funcname, False
+
+    elif has_lambda(src):
+        return extract_lambda(dedent(src)), "_lambdafunc", True
+
+    else:
+        raise ValueError("invalid function or lambda definition")
+
+
+@lru_cache(maxsize=None)
+def compile_source(source: str, is_lambda: bool):
+    """Compile the source of a formula into a module code object"""
+    if is_lambda:
+        # Assign the lambda to a temporary name to extract its object.
+        source = "_lambdafunc = " + source
+
+    return compile(source, "<string>", mode="exec")
+
+
+@lru_cache(maxsize=None)
+def get_srcnames(source: str):
+    """Return a tuple of names extracted from the source by extract_names"""
+    return tuple(extract_names(source))
+
+
+def get_srclines(func):
+    """Return the lines of the source file of func and its line index
+
+    The source of func is extracted from the lines when it is needed.
+    The lines are retrieved the same way as ``inspect.getsource`` does,
+    and the list kept by ``linecache`` is not modified even after
+    the file is updated, so the source is the one the function
+    is defined by.
+    None is returned if the source file is not available.
+    """
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return None
+
+    linecache.checkcache(code.co_filename)
+    lines = linecache.getlines(code.co_filename, func.__globals__)
+    if not lines or len(lines) < code.co_firstlineno:
+        return None
+
+    return lines, code.co_firstlineno - 1
+
+
 class Formula:
+    """Function used as a formula of cells or spaces
 
-    __slots__ = ("func", "signature", "source", "module", "srcnames")
+    Analysis of the source code is deferred until
+    ``source`` or ``srcnames`` is accessed.
+    A function passed to the constructor is used as ``func`` as it is,
+    unless it is a closure, in which case ``func`` is compiled
+    from the source when it is accessed for the first time.
+    """
+
+    __slots__ = (
+        "_func",
+        "_signature",
+        "_source",
+        "_srclines",
+        "_srcnames",
+        "_name",
+        "_null",
+        "module",
+    )
 
     def __init__(self, func, name=None, module=None):
 
         if isinstance(func, Formula):
             self._copy_other(func)
+            return
+
+        self._func = None
+        self._signature = None
+        self._source = None
+        self._srclines = None
+        self._srcnames = None
+        self._name = name
+        self._null = None
 
-        elif callable(func):
+        if callable(func):
             if module is not None:
                 self.module = module
             else:
                 self.module = func.__module__
 
-            try:
-                source = getsource(func)
-                found_source = True
-            except OSError:
+            self._srclines = get_srclines(func)
+
+            if self._srclines is None:
                 warnings.warn(
                     "Cannot retrieve source code for function '%s'. "
                     "%s.source set to None." % (func.__name__, func.__name__)
                 )
-                found_source = False
+                self._func = func
+                self._srcnames = []
+
+            elif func.__code__.co_freevars:
+                pass    # Compiled from the source without the closure
+
+            elif name is None or name == func.__name__:
+                self._func = func
 
-            if found_source:
-                self._init_from_source(source, name)
-                self.srcnames = extract_names(self.source)
             else:
-                self.func = func
-                self.signature = signature(func)
-                self.source = None
-                self.srcnames = []
+                self._func = FunctionType(
+                    func.__code__, func.__globals__, name, func.__defaults__)
+                self._func.__kwdefaults__ = func.__kwdefaults__
 
         elif isinstance(func, str):
             self.module = module
-            self._init_from_source(func, name)
-            self.srcnames = extract_names(self.source)
+            self._source = parse_source(func, name)[0]
         else:
             raise ValueError("Invalid argument func: %s" % func)
 
-    def _init_from_source(self, src: str, name: str):
-
-        if is_funcdef(src):
-            self._init_from_funcdef(src, name)
-        elif has_lambda(src):
-            self._init_from_lambda(src, name)
-        else:
-            raise ValueError("invalid function or lambda definition")
+    @property
+    def source(self):
+        srclines = self._srclines
+        if srclines is not None:
+            lines, lnum = srclines
+            self._source = parse_source(
+                "".join(getblock(lines[lnum:])), self._name)[0]
+            self._srclines = None   # After _source for other threads
 
-    def _init_from_funcdef(self, src: str, name: str):
+        return self._source
 
-        module_node = ast.parse(dedent(src))
-        funcname = name or module_node.body[0].name
-        src = remove_decorator(dedent(src))
-        if name:
-            src = replace_funcname(src, name)
+    @property
+    def srcnames(self):
+        if self._srcnames is None:
+            if self.source is None:
+                self._srcnames = []
+            else:
+                self._srcnames = list(get_srcnames(self.source))
 
-        namespace = {}
-        code = compile(src, "<string>", mode="exec")
-        exec(code, namespace)
+        return self._srcnames
 
-        self.func = namespace[funcname]
-        self.signature = signature(self.func)
-        self.source = src
+    @property
+    def func(self):
+        if self._func is None:
+            _, funcname, is_lambda = parse_source(self.source, self._name)
 
-    def _init_from_lambda(self, src: str, name: str):
+            namespace = {}
+            exec(compile_source(self.source, is_lambda), namespace)
+            func = namespace[funcname]
 
-        src = extract_lambda(dedent(src))
+            if is_lambda and self._name:
+                func.__name__ = self._name
 
-        namespace = {}
-        # Assign the lambda to a temporary name to extract its object.
-        lambda_assignment = "_lambdafunc = " + src
+            self._func = func
 
-        exec(lambda_assignment, namespace)
-        self.func = namespace["_lambdafunc"]
+        return self._func
 
-        if name:
-            self.func.__name__ = name
+    @property
+    def signature(self):
+        if self._signature is None:
+            self._signature = signature(self.func)
 
-        self.signature = signature(self.func)
-        self.source = src
+        return self._signature
 
     def _copy_other(self, other):
         for attr in self.__slots__:
@@ -393,12 +517,33 @@ class Formula:
     def parameters(self):
         return tuple(self.signature.parameters)
 
+    def is_null(self):
+        """True if the formula does nothing but return None"""
+        if self._null is None:
+            instrs = [
+                (instr.opname, instr.argval)
+                for instr in dis.get_instructions(self.func)
+                if instr.opname not in ("NOP", "RESUME")
+            ]
+            self._null = instrs in (
+                [("LOAD_CONST", None), ("RETURN_VALUE", None)],
+                [("RETURN_CONST", None)],
+            )
+        return self._null
+
     def __getstate__(self):
         """Specify members to pickle."""
         return {"source": self.source, "module": self.module}
 
     def __setstate__(self, state):
-        self.__init__(func=state["source"], module=state["module"])
+        self._func = None
+        self._signature = None
+        self._source = state["source"]
+        self._srclines = None
+        self._srcnames = None
+        self._name = None
+        self._null = None
+        self.module = state["module"]
 
     def __repr__(self):
         return self.source
@@ -429,8 +574,9 @@ class Formula:
             raise RuntimeError
         elif module is None:
             import importlib
+            from modelx.core.util import get_module
 
-            module = ModuleSource(importlib.reload(module))
+            module = ModuleSource(importlib.reload(get_module(self.module)))
         elif module.name != self.module:
             raise RuntimeError
 
@@ -0,0 +1,303 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Graphs of dependencies between nodes and of inheritance between spaces
+
+This module is imported when the first model is created,
+so that importing modelx does not import networkx.
+"""
+
+import networkx as nx
+
+from modelx.core.base import ReferenceImpl
+from modelx.core.node import OBJ
+from modelx.core.space import DynamicSpaceImpl
+
+
+class DependencyGraph(nx.DiGraph):
+    """Directed Graph of ObjectArgs"""
+
+    def clear_descendants(self, source, clear_source=True):
+        """Remove all descendants of(reachable from) `source`.
+
+        Args:
+            source: Node descendants
+            clear_source(bool): Remove origin too if True.
+        Returns:
+            set: The removed nodes.
+        """
+        return self.clear_many([source], clear_source)
+
+    def clear_many(self, sources, clear_source=True):
+        """Remove all descendants of `sources` in one traversal.
+
+        Nodes reachable from more than one source are visited only once.
+        Sources not in the graph are ignored.
+
+        Args:
+            sources: Iterable of nodes
+            clear_source(bool): Remove the sources too if True.
+                Sources reachable from other sources are removed anyway.
+        Returns:
+            set: The removed nodes.
+        """
+        removed = self.descendants_many(sources, clear_source)
+        self.remove_nodes_from(removed)
+        return removed
+
+    def descendants_many(self, sources, include_sources=True):
+        """Return all descendants of `sources` found in one traversal
+
+        Sources reachable from other sources are included
+        even if `include_sources` is False.
+        """
+        stack = [node for node in sources if self.has_node(node)]
+        visited = set(stack)
+        result = set(stack) if include_sources else set()
+
+        while stack:
+            for succ in self.successors(stack.pop()):
+                result.add(succ)
+                if succ not in visited:
+                    visited.add(succ)
+                    stack.append(succ)
+
+        return result
+
+    def clear_obj(self, obj):
+        """"Remove all nodes with `obj` and their descendants."""
+        return self.clear_many(self.get_nodes_with(obj))
+
+    def get_nodes_with(self, obj):
+        """Return nodes with `obj`."""
+        result = set()
+
+        if nx.__version__[0] == "1":
+            nodes = self.nodes_iter()
+        else:
+            nodes = self.nodes
+
+        for node in nodes:
+            if node[OBJ] == obj:
+                result.add(node)
+        return result
+
+    def fresh_copy(self):
+        """Overriding Graph.fresh_copy"""
+        return DependencyGraph()
+
+    def add_path(self, nodes, **attr):
+        """In replacement for Deprecated add_path method"""
+        if nx.__version__[0] == "1":
+            return super().add_path(nodes, **attr)
+        else:
+            return nx.add_path(self, nodes, **attr)
+
+
+class LexicalGraph(DependencyGraph):
+    """Graph of edges from objects with formulas to refs they refer to
+
+    Nodes of refs are indexed by the names of the refs in ``refnodes``.
+    """
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self.refnodes = {}
+        DependencyGraph.__init__(self, incoming_graph_data, **attr)
+
+    def _add_index(self, node):
+        if isinstance(node, tuple) and isinstance(node[OBJ], ReferenceImpl):
+            self.refnodes.setdefault(node[OBJ].name, set()).add(node)
+
+    def _remove_index(self, node):
+        if isinstance(node, tuple) and isinstance(node[OBJ], ReferenceImpl):
+            nodes = self.refnodes.get(node[OBJ].name)
+            if nodes is not None:
+                nodes.discard(node)
+                if not nodes:
+                    del self.refnodes[node[OBJ].name]
+
+    def add_node(self, node_for_adding, **attr):
+        DependencyGraph.add_node(self, node_for_adding, **attr)
+        self._add_index(node_for_adding)
+
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        nodes = list(nodes_for_adding)
+        DependencyGraph.add_nodes_from(self, nodes, **attr)
+        for node in nodes:
+            self._add_index(node)
+
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        DependencyGraph.add_edge(self, u_of_edge, v_of_edge, **attr)
+        self._add_index(u_of_edge)
+        self._add_index(v_of_edge)
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        edges = list(ebunch_to_add)
+        DependencyGraph.add_edges_from(self, edges, **attr)
+        for edge in edges:
+            self._add_index(edge[0])
+            self._add_index(edge[1])
+
+    def remove_node(self, n):
+        DependencyGraph.remove_node(self, n)
+        self._remove_index(n)
+
+    def remove_nodes_from(self, nodes):
+        nodes = list(nodes)
+        DependencyGraph.remove_nodes_from(self, nodes)
+        for node in nodes:
+            self._remove_index(node)
+
+    def fresh_copy(self):
+        """Overriding Graph.fresh_copy"""
+        return LexicalGraph()
+
+
+class SpaceGraph(nx.DiGraph):
+    def add_space(self, space):
+        self.add_node(space)
+        self.update_subspaces(space)
+
+    def add_edge(self, basespace, subspace):
+
+        if basespace.has_linealrel(subspace):
+            if not isinstance(subspace, DynamicSpaceImpl):
+                raise ValueError(
+                    "%s and %s have parent-child relationship"
+                    % (basespace, subspace)
+                )
+
+        nx.DiGraph.add_edge(self, basespace, subspace)
+
+        if not nx.is_directed_acyclic_graph(self):
+            self.remove_edge(basespace, subspace)
+            raise ValueError("Loop detected in inheritance")
+
+        try:
+            self._start_space = subspace
+            self.update_subspaces(subspace, check_only=True)
+        finally:
+            self._start_space = None
+
+        # Flag update MRO cache
+        for desc in nx.descendants(self, basespace):
+            desc.update_mro = True
+
+    def remove_edge(self, basespace, subspace):
+        nx.DiGraph.remove_edge(self, basespace, subspace)
+
+        basespace.update_mro = True
+        subspace.update_mro = True
+
+        for desc in nx.descendants(self, subspace):
+            desc.update_mro = True
+
+    def get_bases(self, node):
+        """Direct Bases iterator"""
+        return self.predecessors(node)
+
+    def check_mro(self, bases):
+        """Check if C3 MRO is possible with given bases"""
+
+        try:
+            self.add_node("temp")
+            for base in bases:
+                nx.DiGraph.add_edge(self, base, "temp")
+            result = self.get_mro("temp")[1:]
+
+        finally:
+            self.remove_node("temp")
+
+        return result
+
+    def get_mro(self, space):
+        """Calculate the Method Resolution Order of bases using the C3 algorithm.
+
+        Code modified from
+        http://code.activestate.com/recipes/577748-calculate-the-mro-of-a-class/
+
+        Args:
+            bases: sequence of direct base spaces.
+
+        Returns:
+            mro as a list of bases including node itself
+        """
+        seqs = [self.get_mro(base) for base in self.get_bases(space)] + [
+            list(self.get_bases(space))
+        ]
+        res = []
+        while True:
+            non_empty = list(filter(None, seqs))
+
+            if not non_empty:
+                # Nothing left to process, we're done.
+                res.insert(0, space)
+                return res
+
+            for seq in non_empty:  # Find merge candidates among seq heads.
+                candidate = seq[0]
+                not_head = [s for s in non_empty if candidate in s[1:]]
+                if not_head:
+                    # Reject the candidate.
+                    candidate = None
+                else:
+                    break
+
+            if not candidate:  # Better to return None instead of error?
+                raise TypeError(
+                    "inconsistent hierarchy, no C3 MRO is possible"
+                )
+
+            res.append(candidate)
+
+            for seq in non_empty:
+                # Remove candidate.
+                if seq[0] == candidate:
+                    del seq[0]
+
+    def update_subspaces(self, space, skip=True, check_only=False, **kwargs):
+        self.update_subspaces_downward(space, skip, check_only, **kwargs)
+        self.update_subspaces_upward(space, **kwargs)
+
+    def update_subspaces_upward(self, space, from_parent=True, **kwargs):
+
+        if from_parent:
+            target = space.parent
+        else:
+            target = space
+
+        if target.is_model():
+            return
+        else:
+            succ = self.successors(target)
+            for subspace in succ:
+                if subspace is self._start_space:
+                    raise ValueError("Cyclic inheritance")
+                self.update_subspaces(subspace, False, **kwargs)
+            self.update_subspaces_upward(
+                space.parent, from_parent=from_parent, **kwargs
+            )
+
+    def update_subspaces_downward(
+        self, space, skip=True, check_only=False, **kwargs
+    ):
+        for child in space.static_spaces.values():
+            self.update_subspaces_downward(child, False, check_only, **kwargs)
+        if not skip and not check_only:
+            space.inherit(**kwargs)
+        succ = self.successors(space)
+        for subspace in succ:
+            if subspace is self._start_space:
+                raise ValueError("Cyclic inheritance")
+            self.update_subspaces(subspace, False, **kwargs)
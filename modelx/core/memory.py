@@ -0,0 +1,289 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Estimating memory held by models
+
+Sizes are estimated by walking the objects of a model
+from the model down to its cells, instead of scanning all the objects
+tracked by the garbage collector. Sizes are those returned by
+:func:`sys.getsizeof`. Dicts, lists, tuples and sets are followed
+into their items, while other objects, such as NumPy arrays,
+are counted as :func:`sys.getsizeof` returns. An object referred to
+from more than one place is counted once, in the first row
+that refers to it.
+"""
+
+import sys
+from types import CodeType, FunctionType, ModuleType
+
+from modelx.core.base import Impl, Interface, LazyEval
+from modelx.core.node import OBJ, KEY
+
+COLUMNS = [
+    "type", "data", "nodes", "edges", "formula",
+    "containers", "observers", "refs", "total"
+]
+
+_ITEMS = ("data", "order", "_interfaces", "maps", "changed")
+_EMPTY_DICT = sys.getsizeof({})
+_LEAVES = {int, float, complex, bool, str, bytes, type(None)}
+_SKIPPED = (Impl, Interface, LazyEval, ModuleType, type)
+
+
+def get_size(obj, seen):
+    """Return the size of `obj` and its items not in `seen`
+
+    Objects of the model and other objects that are not values,
+    such as modules and classes, are not counted.
+    """
+    getsizeof = sys.getsizeof
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        cls = type(obj)
+        if cls in _LEAVES:
+            seen.add(id(obj))
+            size += getsizeof(obj)
+            continue
+        elif isinstance(obj, _SKIPPED):
+            continue
+
+        seen.add(id(obj))
+        size += getsizeof(obj)
+        if cls is tuple or cls is list:
+            stack.extend(obj)
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (tuple, list, set, frozenset)):
+            stack.extend(obj)
+        elif cls is FunctionType:
+            stack.append(obj.__code__)
+        elif cls is CodeType:
+            stack.extend((obj.co_code, obj.co_consts))
+
+    return size
+
+
+def _get_attrs(obj):
+    if hasattr(obj, "__dict__"):
+        return vars(obj)
+    else:   # Interfaces and formulas have slots
+        return {name: getattr(obj, name, None) for name in obj.__slots__}
+
+
+def _get_object_size(obj, seen):
+    """Return the size of `obj` itself and its attribute dict"""
+    if obj is None or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def _get_formula_size(obj, seen):
+    """Return the size of Formula or BoundFunction `obj`"""
+    if obj is None or id(obj) in seen:
+        return 0
+    size = _get_object_size(obj, seen)
+    for name, value in _get_attrs(obj).items():
+        if name not in ("observers", "observing"):
+            size += get_size(value, seen)
+    return size
+
+
+def _get_container_size(container, seen):
+    """Return the size of a LazyEval container or a plain container"""
+    if not isinstance(container, LazyEval):
+        return get_size(container, seen)
+    if id(container) in seen:
+        return 0
+    size = _get_object_size(container, seen)
+    for name in _ITEMS:
+        if name in vars(container):
+            size += get_size(getattr(container, name), seen)
+    return size
+
+
+def _get_observers_size(lazyevals, seen):
+    size = 0
+    for obj in lazyevals:
+        if obj is not None:
+            size += get_size(obj.observers, seen)
+            size += get_size(obj.observing, seen)
+    return size
+
+
+def _get_refs_size(refs, seen):
+    size = 0
+    for ref in refs:
+        size += _get_object_size(ref, seen)
+        size += get_size(ref.interface, seen)
+    return size
+
+
+def _get_graph_sizes(graph, seen):
+    """Return dicts of objects to the sizes of their nodes and edges
+
+    The sizes of nodes include their attribute dicts and
+    empty adjacency dicts. The sizes of edges are the rest of
+    the adjacency dicts and the attribute dicts of the edges.
+    The sizes are attributed to the objects of the nodes.
+    """
+    getsizeof = sys.getsizeof
+    nodes, edges = {}, {}
+
+    # The internal dicts are read, as their views cost more to create.
+    for node, attrs in graph._node.items():
+        obj = node[OBJ]
+        size = getsizeof(node) + getsizeof(attrs) + 2 * _EMPTY_DICT
+        if attrs:
+            size += get_size(attrs, seen)
+        if len(node) > 1 and id(node[KEY]) not in seen:
+            size += get_size(node[KEY], seen)
+        nodes[obj] = nodes.get(obj, 0) + size
+
+    for node, succ in graph._succ.items():
+        obj = node[OBJ]
+        edges[obj] = edges.get(obj, 0) + getsizeof(succ) - _EMPTY_DICT
+
+    for node, pred in graph._pred.items():
+        obj = node[OBJ]
+        size = getsizeof(pred) - _EMPTY_DICT
+        for attrs in pred.values():     # Shared with the successors
+            size += getsizeof(attrs)
+        edges[obj] = edges.get(obj, 0) + size
+
+    return nodes, edges
+
+
+def iter_spaces(space):
+    """Yield `space` and its static and dynamic descendants"""
+    yield space
+    for child in space._static_spaces.data.values():
+        yield from iter_spaces(child)
+    for child in space._dynamic_spaces.data.values():
+        yield from iter_spaces(child)
+
+
+def _get_space_row(space, seen):
+
+    containers = [
+        space._cells,
+        space._static_spaces,
+        space._dynamic_spaces,
+        space._self_refs,
+        space._local_refs,
+        space._refs,
+        space._spaces,
+        space._namespace_impl,
+        space._dynamic_subs,
+        space._mro_cache,
+        space.param_spaces
+    ]
+    refs = list(space._self_refs.data.values())
+    for name in ("_parentargs", "_arguments"):
+        if name in vars(space):
+            containers.append(getattr(space, name))
+    if "_arguments" in vars(space):
+        refs.extend(space._arguments.data.values())
+
+    altfunc = getattr(space, "altfunc", None)
+    refsize = _get_refs_size(refs, seen)  # Before the interfaces of refs
+    return {
+        "formula": (_get_formula_size(space.formula, seen)
+                    + _get_formula_size(altfunc, seen)),
+        "containers": (
+            _get_object_size(space, seen)
+            + _get_object_size(space.interface, seen)
+            + sum(_get_container_size(c, seen) for c in containers)),
+        "observers": _get_observers_size(
+            [c for c in containers if isinstance(c, LazyEval)] + [altfunc],
+            seen),
+        "refs": refsize
+    }
+
+
+def _get_cells_row(cells, seen):
+    return {
+        "data": get_size(cells.data, seen),
+        "formula": (_get_formula_size(cells.formula, seen)
+                    + _get_formula_size(cells.altfunc, seen)),
+        "containers": (_get_object_size(cells, seen)
+                       + _get_object_size(cells.interface, seen)),
+        "observers": _get_observers_size([cells.altfunc], seen)
+    }
+
+
+def _get_model_row(model, seen):
+    containers = [
+        model._spaces,
+        model._global_refs,
+        model._namespace,
+        model._dynamic_bases,
+        model._dynamic_bases_inverse
+    ]
+    refsize = _get_refs_size(model._global_refs.data.values(), seen)
+    return {
+        "containers": (
+            _get_object_size(model, seen)
+            + _get_object_size(model.interface, seen)
+            + sum(_get_container_size(c, seen) for c in containers)),
+        "observers": _get_observers_size(containers[:3], seen),
+        "refs": refsize
+    }
+
+
+def get_memory_report(model):
+    """Return the rows of the memory report of ModelImpl `model`
+
+    Each row is a tuple of the full name of an object
+    followed by the values of :data:`COLUMNS`.
+    Graph nodes of objects not found in the model, such as
+    the lexical dependency graph, are counted in the model's row.
+    """
+    seen = set()
+    objs = [(model, _get_model_row(model, seen))]
+    spaces = list(model._spaces.data.values())
+    spaces.extend(model._dynamic_bases.values())
+    for top in spaces:
+        for space in iter_spaces(top):
+            objs.append((space, _get_space_row(space, seen)))
+            for cells in space._cells.data.values():
+                objs.append((cells, _get_cells_row(cells, seen)))
+
+    nodes, edges = _get_graph_sizes(model.cellgraph, seen)
+    lexnodes, lexedges = _get_graph_sizes(model.lexdep, seen)
+
+    for obj, sizes in objs:
+        sizes["nodes"] = nodes.pop(obj, 0)
+        sizes["edges"] = edges.pop(obj, 0)
+
+    sizes = objs[0][1]  # Nodes of the other objects go to the model
+    sizes["nodes"] += sum(nodes.values()) + sum(lexnodes.values())
+    sizes["edges"] += sum(edges.values()) + sum(lexedges.values())
+
+    rows = []
+    for obj, sizes in objs:
+        values = [sizes.get(col, 0) for col in COLUMNS[1:-1]]
+        rows.append(
+            (obj.get_fullname(), type(obj.interface).__name__)
+            + tuple(values) + (sum(values),))
+
+    return rows
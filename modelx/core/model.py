@@ -15,9 +15,7 @@
 import builtins
 import itertools
 from textwrap import dedent
-import pickle
-
-import networkx as nx
+import threading
 
 from modelx.core.base import (
     Impl,
@@ -33,61 +31,18 @@ from modelx.core.spacecontainer import (
     EditableSpaceContainerImpl,
     EditableSpaceContainer,
 )
-from modelx.core.space import DynamicSpaceImpl, SpaceView, RefDict
+from modelx.core.space import SpaceView, RefDict
 from modelx.core.util import is_valid_name, AutoNamer
 
 
-class DependencyGraph(nx.DiGraph):
-    """Directed Graph of ObjectArgs"""
-
-    def clear_descendants(self, source, clear_source=True):
-        """Remove all descendants of(reachable from) `source`.
-
-        Args:
-            source: Node descendants
-            clear_source(bool): Remove origin too if True.
-        Returns:
-            set: The removed nodes.
-        """
-        desc = nx.descendants(self, source)
-        if clear_source:
-            desc.add(source)
-        self.remove_nodes_from(desc)
-        return desc
-
-    def clear_obj(self, obj):
-        """"Remove all nodes with `obj` and their descendants."""
-        obj_nodes = self.get_nodes_with(obj)
-        removed = set()
-        for node in obj_nodes:
-            if self.has_node(node):
-                removed.update(self.clear_descendants(node))
-        return removed
-
-    def get_nodes_with(self, obj):
-        """Return nodes with `obj`."""
-        result = set()
-
-        if nx.__version__[0] == "1":
-            nodes = self.nodes_iter()
-        else:
-            nodes = self.nodes
-
-        for node in nodes:
-            if node[OBJ] == obj:
-                result.add(node)
-        return result
-
-    def fresh_copy(self):
-        """Overriding Graph.fresh_copy"""
-        return DependencyGraph()
-
-    def add_path(self, nodes, **attr):
-        """In replacement for Deprecated add_path method"""
-        if nx.__version__[0] == "1":
-            return super().add_path(nodes, **attr)
-        else:
-            return nx.add_path(self, nodes, **attr)
+def is_same_value(old, new):
+    """Check if a recalculated value is the same as the old value"""
+    if old is new:
+        return True
+    try:
+        return bool(type(old) is type(new) and old == new)
+    except Exception:   # Such as comparing NumPy arrays
+        return False
 
 
 class Model(EditableSpaceContainer):
@@ -108,14 +63,303 @@ class Model(EditableSpaceContainer):
         """Rename the model itself"""
         self._impl.system.rename_model(new_name=name, old_name=self.name)
 
-    def save(self, filepath):
-        """Save the model to a file."""
-        self._impl.save(filepath)
+    def save(self, filepath, compression=None):
+        """Save the model to a file.
+
+        Values are written to the file as they are pickled,
+        and compressed on the way if ``compression`` is given.
+
+        Args:
+            filepath(str): Path to the file to save the model to.
+            compression(str, optional): Compression method, one of
+                ``"zlib"``, ``"bz2"`` and ``"lzma"``.
+                Not compressed by default. The method is detected
+                automatically on opening.
+        """
+        self._impl.save(filepath, compression)
 
     def close(self):
         """Close the model."""
         self._impl.close()
 
+    def enable_cache(self, path):
+        """Enable the persistent cache of cells values.
+
+        Values of cells calculated after this method is called are
+        stored in an SQLite database file at ``path``.
+        When the same model is evaluated in another session with
+        the cache enabled with the same file, values are read from
+        the file instead of being calculated, as long as
+        the formulas of the cells, the values of the references
+        and the input values of the cells they depend on are unchanged.
+
+        Values assigned to cells before calling this method are
+        regarded as input values, unless they are calculated by formulas.
+        Values of Python objects referenced by formulas,
+        such as functions in other modules, are identified by pickling,
+        so changes in their source code are not detected.
+
+        Args:
+            path(str): Path to the database file.
+                The file is created if it does not exist.
+        """
+        self._impl.enable_cache(path)
+
+    def disable_cache(self):
+        """Write pending values to the cache file and disable the cache."""
+        self._impl.disable_cache()
+
+    def clear_many(self, nodes):
+        """Clear values of many cells and their dependents at once.
+
+        Clearing values one by one traverses the descendants
+        of each value separately. This method finds all the values
+        depending on any of ``nodes`` in a single traversal
+        and clears them in one sweep.
+
+        Args:
+            nodes: Iterable of :class:`~modelx.core.cells.CellNode` objects,
+                such as those returned by
+                :meth:`Cells.node <modelx.core.cells.Cells.node>`.
+        """
+        self._impl.clear_many(node._impl for node in nodes)
+
+    def enable_incremental(self):
+        """Recalculate values incrementally after input values change.
+
+        Normally, assigning a new value to a cell clears
+        all the values calculated from it.
+        In the incremental mode, the values are kept and
+        marked outdated instead, together with their dependencies.
+        An outdated value is recalculated when it is requested,
+        only if any of the values it depends on has actually changed.
+        If the recalculated value equals the old value,
+        values depending on it are not recalculated on its account.
+
+        Changes other than assigning values to cells,
+        such as changing formulas or references,
+        clear dependent values as usual.
+        """
+        self._impl.enable_incremental()
+
+    def disable_incremental(self):
+        """Clear outdated values and stop the incremental mode."""
+        self._impl.disable_incremental()
+
+    def fork(self):
+        """Start a scenario on top of the current state of the model.
+
+        While the returned fork is active, values assigned to cells
+        and changes to references are applied to the model as usual,
+        so only values depending on the changes are recalculated.
+        Values cleared by the changes are kept in the fork,
+        and :meth:`~modelx.core.fork.ModelFork.discard` puts back
+        the values and references as they were before the fork,
+        keeping values calculated during the fork that do not depend
+        on the changes. The memory used by the fork is proportional to
+        the cleared values.
+
+        The fork can be used as a context manager, which discards
+        the fork on exit::
+
+            >>> with model.fork():
+            ...     model.Space1.rate = 0.03
+            ...     pv = model.Space1.pv(0)
+
+        Only one fork can be active at a time, and other changes
+        to the model, such as creating cells or changing formulas,
+        raise an error while the fork is active.
+
+        Returns:
+            :class:`~modelx.core.fork.ModelFork`
+        """
+        return self._impl.new_fork()
+
+    def sensitivities(self, inputs, targets, bumps, processes=None):
+        """Calculate sensitivities of targets to inputs by finite differences.
+
+        Each input is bumped in turn in a :meth:`fork` of the model,
+        and the differences of the targets from their base values
+        divided by the bump size are returned.
+        Only the values depending on the bumped input are recalculated,
+        and the base values are restored after each bump.
+
+        Args:
+            inputs: A list of inputs. Each input is either a
+                :class:`~modelx.core.cells.CellNode` object,
+                such as ``space.foo.node(1)``, or a tuple of
+                the model or a space and the name of its reference,
+                such as ``(space, "rate")``.
+            targets: A list of :class:`~modelx.core.cells.CellNode` objects.
+            bumps: A number or a list of numbers, by which the inputs
+                are increased.
+            processes(int, optional): If given, the inputs are split
+                among this number of worker processes,
+                each of which loads a copy of the model saved
+                in a temporary file.
+
+        Returns:
+            A list of lists, whose *i*-th list holds the sensitivities
+            of the targets to the *i*-th input.
+        """
+        from modelx.core.sensitivity import get_sensitivities
+
+        return get_sensitivities(
+            self._impl, inputs, targets, bumps, processes)
+
+    async def aevaluate(self, batch):
+        """Evaluate cells concurrently without blocking the event loop.
+
+        A coroutine to get the values of cells in a :mod:`asyncio`
+        event loop. The cells are evaluated concurrently in worker
+        threads, and the values are returned when all of them complete.
+        If the awaiting task is cancelled, the evaluations stop
+        when the next formulas are called.
+
+        Example:
+            .. code-block:: python
+
+                values = await model.aevaluate(
+                    [(model.Space1.foo, (i,)) for i in range(100)])
+
+        Args:
+            batch: A list of pairs of cells and arguments.
+                Arguments are tuples, or single arguments.
+
+        Returns:
+            A list of the values in the order of ``batch``.
+
+        See Also:
+            :meth:`Cells.aeval <modelx.core.cells.Cells.aeval>`
+        """
+        from modelx.core.aeval import evaluate_batch
+
+        return await evaluate_batch(
+            (cells._impl, args) for cells, args in batch)
+
+    def new_pool(self, processes=None):
+        """Create a pool of worker processes sharing the model.
+
+        The workers are forked from the current process, so they have
+        the model as it is when the pool is created,
+        without building or loading it again.
+        Memory pages of the model are shared between the processes
+        until they are written to.
+        Values calculated in the workers are not sent back to the model
+        except those returned by
+        :meth:`~modelx.core.pool.WorkerPool.evaluate`.
+
+        Worker pools are available only on platforms where processes
+        can be forked, such as Linux and macOS.
+
+        Example:
+            .. code-block:: python
+
+                with model.new_pool(4) as pool:
+                    values = pool.evaluate(
+                        [(model.Space1.foo, i) for i in range(100)])
+
+        Args:
+            processes(int, optional): Number of worker processes.
+                Defaults to the number of CPUs.
+
+        Returns:
+            A :class:`~modelx.core.pool.WorkerPool` object.
+        """
+        from modelx.core.pool import WorkerPool
+
+        return WorkerPool(self._impl, processes)
+
+    def memory_report(self):
+        """Return estimated memory used by the objects in the model.
+
+        The estimates are returned as a DataFrame indexed by
+        the full names of the model, its spaces including dynamic spaces,
+        and their cells. The columns are the following, in bytes.
+
+        ==============  ==================================================
+        Column          Memory used by
+        ==============  ==================================================
+        ``data``        Values of the cells and their keys
+        ``nodes``       Nodes of the cells in the dependency graph
+        ``edges``       Edges into and from the nodes
+        ``formula``     Formulas and the functions bound to namespaces
+        ``containers``  Objects themselves and their member containers
+        ``observers``   Links between the containers updated lazily
+        ``refs``        References and their values
+        ``total``       All the above
+        ==============  ==================================================
+
+        The ``type`` column has the type of the objects.
+        Sizes are estimated by :func:`sys.getsizeof`,
+        following dicts, lists, tuples and sets into their items.
+        Objects shared by more than one object, such as a formula
+        of cells inherited by other cells, are counted once.
+
+        Example:
+            .. code-block:: python
+
+                >>> model.memory_report().sort_values("total").tail()
+
+        Returns:
+            pandas.DataFrame
+        """
+        import pandas as pd
+        from modelx.core.memory import COLUMNS, get_memory_report
+
+        with self._impl.lock:
+            rows = get_memory_report(self._impl)
+
+        return pd.DataFrame.from_records(
+            rows, columns=["name"] + COLUMNS, index="name")
+
+    def freeze(self):
+        """Freeze the model for fast evaluation.
+
+        Formulas and namespaces of all the spaces and cells in the model
+        are resolved once, and cells and spaces use them directly
+        in subsequent evaluations.
+        While the model is frozen, structural changes to the model,
+        such as creating or deleting spaces, cells and references,
+        changing formulas or bases, raise an error.
+        Values of cells can still be set and cleared,
+        and dynamic spaces are created as usual.
+
+        Frozen state is not saved in model files.
+        Call :meth:`unfreeze` to make the model editable again.
+        """
+        self._impl.freeze()
+
+    def unfreeze(self):
+        """Make the frozen model editable again."""
+        self._impl.unfreeze()
+
+    @property
+    def frozen(self):
+        """True if the model is frozen."""
+        return self._impl.frozen
+
+    def export(self, path):
+        """Export the model as a standalone Python package.
+
+        The model is written as a package in the directory ``path``,
+        which must not exist. The name of the directory becomes
+        the package name.
+        The exported package does not depend on modelx.
+        Each space becomes a sub-package of the package,
+        and each cells becomes a plain function caching its values.
+        Calling the functions gives the same results as the cells
+        with much less overhead.
+
+        See :func:`modelx.io.export.export_model` for limitations.
+
+        Args:
+            path(str): Path to the package directory
+        """
+        from modelx.io.export import export_model
+
+        export_model(self._impl, path)
+
     # ----------------------------------------------------------------------
     # Getting and setting attributes
 
@@ -149,14 +393,23 @@ class ModelImpl(EditableSpaceContainerImpl, Impl):
 
     if_class = Model
 
+    frozen = False  # Not pickled
+    cache = None  # Not pickled
+    incremental = False  # Not pickled
+    active_fork = None  # Not pickled
+    dirty = frozenset()  # Nodes whose values may be outdated
+
     def __init__(self, *, system, name):
         Impl.__init__(self, system=system)
         EditableSpaceContainerImpl.__init__(self)
 
+        from modelx.core.graph import DependencyGraph, LexicalGraph, SpaceGraph
+
         self.cellgraph = DependencyGraph()
-        self.lexdep = DependencyGraph()  # Lexical dependency
+        self.lexdep = LexicalGraph()  # Lexical dependency
         self.spacegraph = SpaceGraph()
         self.currentspace = None
+        self.lock = threading.RLock()   # Guards values and the cell graph
 
         if not name:
             self.name = system._modelnamer.get_next(system.models)
@@ -188,21 +441,182 @@ class ModelImpl(EditableSpaceContainerImpl, Impl):
         else:
             raise ValueError("Invalid name '%s'." % name)
 
+    def enable_cache(self, path):
+        from modelx.core.cache import PersistentCache
+
+        self.disable_cache()
+        self.cache = PersistentCache(self, path)
+
+    def disable_cache(self):
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    def enable_incremental(self):
+        if not self.incremental:
+            self.incremental = True
+            self.dirty = set()
+            self.changed = set()
+
+    def disable_incremental(self):
+        if self.incremental:
+            self.clear_many(list(self.dirty))
+            self.incremental = False
+            del self.dirty
+            del self.changed
+
+    def set_changed(self, node, old, new):
+        """Mark descendants of an input node dirty after its value changed
+
+        Descendants keep their values and edges, and are recalculated
+        on demand by :meth:`refresh`.
+        """
+        graph = self.cellgraph
+        graph.remove_edges_from(list(graph.in_edges(node)))
+        graph.add_node(node)
+        self.dirty.discard(node)
+        if is_same_value(old, new):
+            return
+
+        self.changed.add(node)
+        stack = [node]
+        while stack:
+            for succ in graph.successors(stack.pop()):
+                if succ not in self.dirty:
+                    self.dirty.add(succ)
+                    stack.append(succ)
+
+    def refresh(self, node):
+        """Bring the value of a dirty node up to date
+
+        Predecessors are refreshed first, and the node is recalculated
+        only if any of them changed its value.
+        If the recalculated value equals the old value,
+        the node is not regarded as changed, so its dependents
+        are not recalculated unless other predecessors changed.
+        """
+        graph = self.cellgraph
+        dirty = self.dirty
+        stack = [node]
+
+        while stack:
+            top = stack[-1]
+            preds = [pred for pred in graph.predecessors(top) if pred in dirty]
+            if preds:
+                stack.extend(preds)
+                continue
+
+            stack.pop()
+            if top not in dirty:
+                continue    # Refreshed already
+            dirty.discard(top)
+
+            if top[KEY] not in top[OBJ].data:
+                continue
+            elif any(pred in self.changed for pred in graph.predecessors(top)):
+                self._recalc(top)
+
+        if not dirty and not self.system.callstack:
+            self.changed.clear()
+
+    def _recalc(self, node):
+
+        graph = self.cellgraph
+        if self.active_fork is not None:
+            self.active_fork.record_values([node])
+        old = node[OBJ].data.pop(node[KEY])
+        graph.remove_edges_from(list(graph.in_edges(node)))
+
+        # Regarded as changed if the formula raises an error
+        self.changed.add(node)
+        value = self.system.execution.eval_cell(node)
+        if is_same_value(old, value):
+            self.changed.discard(node)
+
+    def freeze(self):
+        self.update_lazyevals()
+        for space in self._iter_frozen_spaces():
+            space.freeze()
+        self.frozen = True
+
+    def unfreeze(self):
+        self.frozen = False
+        for space in self._iter_frozen_spaces():
+            space.unfreeze()
+
+    def _iter_frozen_spaces(self):
+        yield from self.spaces.values()
+        yield from self._dynamic_bases.values()
+
+    def check_editable(self, ref=False):
+        """Raise an error if the model is frozen or forked
+
+        While the model is forked, only references can be changed,
+        which is indicated by ``ref``.
+        """
+        if self.frozen:
+            raise RuntimeError("Model '%s' is frozen" % self.name)
+        elif self.active_fork is not None and not ref:
+            raise RuntimeError("Model '%s' is forked" % self.name)
+
+    def new_fork(self):
+        from modelx.core.fork import ModelFork
+
+        if self.active_fork is not None:
+            raise RuntimeError("Model '%s' is already forked" % self.name)
+        if self.dirty:
+            self.clear_many(list(self.dirty))
+
+        self.active_fork = ModelFork(self)
+        return self.active_fork
+
     def clear_descendants(self, source, clear_source=True):
         """Clear values and nodes calculated from `source`."""
-        removed = self.cellgraph.clear_descendants(source, clear_source)
-        for node in removed:
-            del node[OBJ].data[node[KEY]]
-
-    # TODO
-    # def clear_lexdescendants(self, refnode):
-    #     """Clear values of cells that refer to `ref`."""
+        self.clear_many([source], clear_source)
+
+    def clear_many(self, sources, clear_source=True):
+        """Clear values and nodes calculated from any of `sources`."""
+        sources = list(sources)
+        with self.lock:
+            removed = self.cellgraph.descendants_many(sources, clear_source)
+            if clear_source:
+                # Input values may have no nodes in the graph
+                removed.update(
+                    node for node in sources
+                    if node not in removed and node[KEY] in node[OBJ].data
+                )
+            if self.active_fork is not None:
+                self.active_fork.record_values(removed)
+
+            self.cellgraph.remove_nodes_from(removed)
+            if self.dirty:
+                self.dirty.difference_update(removed)
+            for node in removed:
+                node[OBJ]._del_value(node[KEY])
+            if self.cache is not None:
+                self.cache.remove_values(removed)
+
+    def clear_lexdescendants(self, refnodes):
+        """Clear values of cells that refer to any of `refnodes`."""
+        objs = set()
+        for refnode in refnodes:
+            if self.lexdep.has_node(refnode):
+                objs.update(node[OBJ] for node in
+                            self.lexdep.predecessors(refnode))
+        self.clear_objs(objs)
 
     def clear_obj(self, obj):
         """Clear values and nodes of `obj` and their dependants."""
-        removed = self.cellgraph.clear_obj(obj)
-        for node in removed:
-            del node[OBJ].data[node[KEY]]
+        self.clear_objs([obj])
+
+    def clear_objs(self, objs):
+        """Clear values and nodes of `objs` and their dependants."""
+        objs = set(objs)
+        if objs:
+            self.clear_many(
+                [node for node in self.cellgraph if node[OBJ] in objs])
+            if self.cache is not None:
+                self.cache.invalidate(objs)
 
     def __repr__(self):
         return self.name
@@ -226,17 +640,25 @@ class ModelImpl(EditableSpaceContainerImpl, Impl):
         return self._namespace.get_updated()
 
     def close(self):
+        self.disable_cache()
         self.system.close_model(self)
 
-    def save(self, filepath):
+    def save(self, filepath, compression=None):
+        from modelx.core.serializer import write_model
+
+        if self.dirty:
+            self.clear_many(list(self.dirty))   # Outdated values not saved
         self.update_lazyevals()
-        with open(filepath, "wb") as file:
-            pickle.dump(self.interface, file, protocol=4)
+        write_model(self, filepath, compression)
 
     def get_object(self, name):
         """Retrieve an object by a dotted name relative to the model."""
         parts = name.split(".")
-        space = self.spaces[parts.pop(0)]
+        child = parts.pop(0)
+        if not parts and child in self.global_refs:
+            return self.global_refs[child]
+
+        space = self.spaces[child]
         if parts:
             return space.get_object(".".join(parts))
         else:
@@ -263,12 +685,14 @@ class ModelImpl(EditableSpaceContainerImpl, Impl):
 
     assert len(state_attrs) == len(set(state_attrs))
 
-    def __getstate__(self):
+    def __getstate__(self, exclude=()):
+        import networkx as nx
+        from modelx.core.graph import DependencyGraph
 
         state = {
             key: value
             for key, value in self.__dict__.items()
-            if key in self.state_attrs
+            if key in self.state_attrs and key not in exclude
         }
 
         graphs = {
@@ -291,23 +715,39 @@ class ModelImpl(EditableSpaceContainerImpl, Impl):
 
     def __setstate__(self, state):
         self.__dict__.update(state)
+        self.lock = threading.RLock()
 
     def restore_state(self, system):
         """Called after unpickling to restore some attributes manually."""
+        import networkx as nx
+        from modelx.core.graph import DependencyGraph, LexicalGraph
+
         Impl.restore_state(self, system)
         BaseSpaceContainerImpl.restore_state(self, system)
-        mapping = {}
-        for node in self.cellgraph:
-            if isinstance(node, tuple):
-                name, key = node
-            else:
-                name, key = node, None
-            cells = self.get_object(name)
-            mapping[node] = get_node(cells, key, None)
 
-        self.cellgraph = nx.relabel_nodes(self.cellgraph, mapping)
+        if "cellgraph" not in self.__dict__:    # Restored by read_model
+            self.cellgraph = DependencyGraph()
+            self.lexdep = LexicalGraph()
+            return
+
+        for gname in ("cellgraph", "lexdep"):
+            graph = getattr(self, gname)
+            mapping = {}
+            for node in graph:
+                if isinstance(node, tuple):
+                    name, key = node
+                else:
+                    name, key = node, None
+                obj = self.get_object(name)
+                mapping[node] = get_node(obj, key, None)
+
+            graph = nx.relabel_nodes(graph, mapping)
+            if gname == "lexdep" and not isinstance(graph, LexicalGraph):
+                graph = LexicalGraph(graph)     # Saved by older versions
+            setattr(self, gname, graph)
 
     def del_space(self, name):
+        self.check_editable()
         space = self.spaces[name]
         self.spaces.del_item(name)
 
@@ -321,6 +761,9 @@ class ModelImpl(EditableSpaceContainerImpl, Impl):
         self.spaces.set_item(space.name, space)
 
     def del_ref(self, name):
+        self.check_editable(ref=True)
+        if self.active_fork is not None:
+            self.active_fork.record_ref(self, name)
         self.global_refs.del_item(name)
 
     def get_attr(self, name):
@@ -337,6 +780,9 @@ class ModelImpl(EditableSpaceContainerImpl, Impl):
         if name in self.spaces:
             raise KeyError("Space named '%s' already exist" % self.name)
 
+        self.check_editable(ref=True)
+        if self.active_fork is not None:
+            self.active_fork.record_ref(self, name)
         self.global_refs.set_item(name, ReferenceImpl(self, name, value))
 
     def del_attr(self, name):
@@ -359,144 +805,5 @@ class ModelImpl(EditableSpaceContainerImpl, Impl):
             self.spacegraph.add_space(base)
             self._dynamic_bases[name] = base
             self._dynamic_bases_inverse[bases] = base
-            base.add_bases(bases)
+            base._add_bases(bases)
             return base
-
-
-class SpaceGraph(nx.DiGraph):
-    def add_space(self, space):
-        self.add_node(space)
-        self.update_subspaces(space)
-
-    def add_edge(self, basespace, subspace):
-
-        if basespace.has_linealrel(subspace):
-            if not isinstance(subspace, DynamicSpaceImpl):
-                raise ValueError(
-                    "%s and %s have parent-child relationship"
-                    % (basespace, subspace)
-                )
-
-        nx.DiGraph.add_edge(self, basespace, subspace)
-
-        if not nx.is_directed_acyclic_graph(self):
-            self.remove_edge(basespace, subspace)
-            raise ValueError("Loop detected in inheritance")
-
-        try:
-            self._start_space = subspace
-            self.update_subspaces(subspace, check_only=True)
-        finally:
-            self._start_space = None
-
-        # Flag update MRO cache
-        for desc in nx.descendants(self, basespace):
-            desc.update_mro = True
-
-    def remove_edge(self, basespace, subspace):
-        nx.DiGraph.remove_edge(self, basespace, subspace)
-
-        basespace.update_mro = True
-        subspace.update_mro = True
-
-        for desc in nx.descendants(self, subspace):
-            desc.update_mro = True
-
-    def get_bases(self, node):
-        """Direct Bases iterator"""
-        return self.predecessors(node)
-
-    def check_mro(self, bases):
-        """Check if C3 MRO is possible with given bases"""
-
-        try:
-            self.add_node("temp")
-            for base in bases:
-                nx.DiGraph.add_edge(self, base, "temp")
-            result = self.get_mro("temp")[1:]
-
-        finally:
-            self.remove_node("temp")
-
-        return result
-
-    def get_mro(self, space):
-        """Calculate the Method Resolution Order of bases using the C3 algorithm.
-
-        Code modified from
-        http://code.activestate.com/recipes/577748-calculate-the-mro-of-a-class/
-
-        Args:
-            bases: sequence of direct base spaces.
-
-        Returns:
-            mro as a list of bases including node itself
-        """
-        seqs = [self.get_mro(base) for base in self.get_bases(space)] + [
-            list(self.get_bases(space))
-        ]
-        res = []
-        while True:
-            non_empty = list(filter(None, seqs))
-
-            if not non_empty:
-                # Nothing left to process, we're done.
-                res.insert(0, space)
-                return res
-
-            for seq in non_empty:  # Find merge candidates among seq heads.
-                candidate = seq[0]
-                not_head = [s for s in non_empty if candidate in s[1:]]
-                if not_head:
-                    # Reject the candidate.
-                    candidate = None
-                else:
-                    break
-
-            if not candidate:  # Better to return None instead of error?
-                raise TypeError(
-                    "inconsistent hierarchy, no C3 MRO is possible"
-                )
-
-            res.append(candidate)
-
-            for seq in non_empty:
-                # Remove candidate.
-                if seq[0] == candidate:
-                    del seq[0]
-
-    def update_subspaces(self, space, skip=True, check_only=False, **kwargs):
-        self.update_subspaces_downward(space, skip, check_only, **kwargs)
-        self.update_subspaces_upward(space, **kwargs)
-
-    def update_subspaces_upward(self, space, from_parent=True, **kwargs):
-
-        if from_parent:
-            target = space.parent
-        else:
-            target = space
-
-        if target.is_model():
-            return
-        else:
-            succ = self.successors(target)
-            for subspace in succ:
-                if subspace is self._start_space:
-                    raise ValueError("Cyclic inheritance")
-                self.update_subspaces(subspace, False, **kwargs)
-            self.update_subspaces_upward(
-                space.parent, from_parent=from_parent, **kwargs
-            )
-
-    def update_subspaces_downward(
-        self, space, skip=True, check_only=False, **kwargs
-    ):
-        for child in space.static_spaces.values():
-            self.update_subspaces_downward(child, False, check_only, **kwargs)
-        if not skip and not check_only:
-            space.inherit(**kwargs)
-        succ = self.successors(space)
-        for subspace in succ:
-            if subspace is self._start_space:
-                raise ValueError("Cyclic inheritance")
-            self.update_subspaces(subspace, False, **kwargs)
@@ -36,6 +36,35 @@ KEY = 1
 #
 
 
+class ArrayNode(tuple):
+    """Node of a cells evaluated over arrays of arguments.
+
+    An ArrayNode is pushed on the call stack in place of the element nodes
+    while the formula of a cells is evaluated once for many keys.
+    Its ``KEY`` is a tuple of the (broadcast) argument arrays,
+    and ``keys`` holds the element keys in the same order.
+    ArrayNodes are hashed by identity as their arrays are not hashable.
+    """
+
+    __hash__ = object.__hash__
+
+    def __new__(cls, obj, key, keys):
+        self = tuple.__new__(cls, (obj, key))
+        self.keys = keys
+        return self
+
+    def __eq__(self, other):
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
+
+    def elements(self):
+        """Return a list of the element nodes"""
+        obj = self[OBJ]
+        return [(obj, key) for key in self.keys]
+
+
 def node_has_key(node):
     return len(node) > 1
 
@@ -98,7 +127,9 @@ def get_node_repr(node):
         "%s=%s" % (param, arg) for param, arg in zip(params, key)
     )
 
-    if key in obj.data:
+    if isinstance(node, ArrayNode):
+        return name + "(" + arglist + ")"
+    elif key in obj.data:
         return name + "(" + arglist + ")" + "=" + str(obj.data[key])
     else:
         return name + "(" + arglist + ")"
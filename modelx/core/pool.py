@@ -0,0 +1,99 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Worker processes sharing a model built in the parent process
+
+Workers are forked from the process that has the model,
+so they start with the model without building or loading it again.
+The memory of the model is shared between the processes
+until it is written to. Objects existing at the fork are moved to
+the permanent generation of the garbage collector beforehand,
+so that collections in the workers do not write to their pages.
+"""
+
+import gc
+import multiprocessing
+
+from modelx.core.cells import Cells
+
+
+def _evaluate(request):
+    from modelx.core import mxsys
+
+    fullname, args = request
+    return mxsys.get_object(fullname).get_value(args)
+
+
+class WorkerPool:
+    """Pool of worker processes forked from the process of a model
+
+    Created by :meth:`Model.new_pool <modelx.core.model.Model.new_pool>`.
+    """
+
+    def __init__(self, model, processes=None):
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("Worker pools need fork start method")
+
+        if model.system.callstack:
+            raise RuntimeError("Worker pools cannot be created in formulas")
+
+        self.model = model
+        model.update_lazyevals()   # Not to update namespaces in workers
+
+        context = multiprocessing.get_context("fork")
+        gc.collect()
+        if hasattr(gc, "freeze"):   # From Python 3.7
+            gc.freeze()
+        try:
+            self._pool = context.Pool(processes)
+        finally:
+            if hasattr(gc, "freeze"):
+                gc.unfreeze()
+
+    def _get_request(self, request):
+        cells, args = request
+        if isinstance(cells, Cells):
+            cells = cells._impl.get_fullname()
+        if not isinstance(args, tuple):
+            args = (args,)
+        return cells, args
+
+    def evaluate(self, requests, chunksize=None):
+        """Evaluate cells in the workers and return their values
+
+        Args:
+            requests: A list of pairs of cells and arguments. Cells are
+                :class:`~modelx.core.cells.Cells` objects or their full names
+                such as ``"Model1.Space1.foo"``.
+                Arguments are tuples, or single arguments.
+            chunksize(int, optional): Number of requests
+                sent to a worker at a time.
+
+        Returns:
+            A list of the values in the order of the requests.
+        """
+        requests = [self._get_request(request) for request in requests]
+        return self._pool.map(_evaluate, requests, chunksize)
+
+    def close(self):
+        """Terminate the workers"""
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
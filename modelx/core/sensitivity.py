@@ -0,0 +1,148 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Finite-difference sensitivities by bumping inputs
+
+Each input is bumped in a fork of the model, so only the values
+depending on the input are cleared, and only those the targets need
+are recalculated. Values are put back when the fork is discarded.
+
+Inputs and targets are passed between processes as specs,
+which are tuples of the full names of objects and keys or ref names.
+"""
+
+import os
+import tempfile
+from collections.abc import Sequence
+
+from modelx.core.base import Interface
+from modelx.core.cells import CellNode
+from modelx.core.node import OBJ, KEY
+
+
+def _get_spec(model, item, is_target=False):
+    """Convert an input or a target to a spec"""
+
+    if isinstance(item, CellNode):
+        obj = item._impl[OBJ]
+        if obj.model is not model:
+            raise ValueError("%s not in model %s" % (obj.name, model.name))
+        return ("cells", obj.get_fullname(omit_model=True), item._impl[KEY])
+
+    elif not is_target and isinstance(item, tuple) and len(item) == 2:
+        owner, name = item
+        if isinstance(owner, Interface) and owner._impl.model is model:
+            if owner._impl is model:
+                return ("ref", "", name)
+            else:
+                return ("ref", owner._impl.get_fullname(omit_model=True), name)
+
+    raise ValueError("Invalid %s: %s" % (
+        "target" if is_target else "input", item))
+
+
+def _get_value(model, spec):
+    kind, name, key = spec
+    if kind == "cells":
+        return model.get_object(name).get_value(key)
+    elif name:
+        return model.get_object(name).refs[key].interface
+    else:
+        return model.global_refs[key].interface
+
+
+def _set_value(model, spec, value):
+    kind, name, key = spec
+    if kind == "cells":
+        model.get_object(name).set_value(key, value)
+    elif name:
+        model.get_object(name).set_attr(key, value)
+    else:
+        model.set_attr(key, value)
+
+
+def bump_and_revalue(model, inputs, bumps, targets):
+    """Return finite differences of targets for bumped inputs
+
+    Args:
+        model: ModelImpl object
+        inputs: Specs of inputs
+        bumps: Bump sizes for the inputs
+        targets: Specs of targets
+    """
+    base = [_get_value(model, target) for target in targets]
+    result = []
+    for spec, bump in zip(inputs, bumps):
+        with model.new_fork():
+            _set_value(model, spec, _get_value(model, spec) + bump)
+            result.append([
+                (_get_value(model, target) - value) / bump
+                for target, value in zip(targets, base)
+            ])
+
+    return result
+
+
+def _revalue_in_process(path, inputs, bumps, targets):
+    from modelx.core import mxsys
+
+    model = mxsys.open_model(path, "Sensitivity%d" % os.getpid())._impl
+    try:
+        return bump_and_revalue(model, inputs, bumps, targets)
+    finally:
+        model.close()
+
+
+def get_sensitivities(model, inputs, targets, bumps, processes=None):
+    """Implementation of :meth:`Model.sensitivities`"""
+
+    if model.system.callstack:
+        raise RuntimeError("Sensitivities cannot be calculated in formulas")
+
+    inputs = [_get_spec(model, item) for item in inputs]
+    targets = [_get_spec(model, item, is_target=True) for item in targets]
+
+    if isinstance(bumps, Sequence):
+        if len(bumps) != len(inputs):
+            raise ValueError("Lengths of inputs and bumps differ")
+    else:
+        bumps = [bumps] * len(inputs)
+
+    if not processes or processes == 1 or len(inputs) < 2:
+        return bump_and_revalue(model, inputs, bumps, targets)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    processes = min(processes, len(inputs))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, model.name + ".mx")
+        model.save(path)
+
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [
+                executor.submit(
+                    _revalue_in_process,
+                    path,
+                    inputs[i::processes],
+                    bumps[i::processes],
+                    targets,
+                )
+                for i in range(processes)
+            ]
+            chunks = [future.result() for future in futures]
+
+    result = [None] * len(inputs)
+    for i, chunk in enumerate(chunks):
+        result[i::processes] = chunk
+    return result
@@ -0,0 +1,355 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Saving models in sections
+
+A saved model is a zip file with the following entries.
+
+``model``
+    The pickled model without the values of the cells and the cell graph,
+    followed by the lists of the cells in each space
+    and the table of modelx objects in the model.
+
+``values/<space>``
+    Values of all the cells in the space and its descendant spaces.
+
+``graph/<space>``
+    Nodes of the cells in the space and its descendant spaces,
+    and edges into the nodes, encoded by :func:`encode_graph`.
+
+``lexdep``
+    The lexical dependency graph as arrays of indexes
+    in the object table.
+
+``values/<space>/<n>``, ``graph/<space>/<n>``
+    Out-of-band buffers of the values or keys, with pickle protocol 5.
+
+All the entries are compressed by the same method chosen on saving.
+
+Values and graphs are stored for each space in the model,
+so that a model can be opened with the values of some spaces only.
+Model objects in values and keys are pickled as indexes
+in the object table.
+"""
+
+import copyreg
+import pickle
+import zipfile
+from array import array
+
+from modelx.core.base import Impl, Interface
+from modelx.core.node import OBJ, KEY
+
+PROTOCOL = 4
+
+# Protocol 5 is available from Python 3.8. With protocol 5, buffers
+# of large values such as NumPy arrays are saved out-of-band,
+# directly from the memory of the values into their own entries.
+VALUE_PROTOCOL = min(pickle.HIGHEST_PROTOCOL, 5)
+OUT_OF_BAND_SIZE = 1 << 16  # Minimum size of out-of-band buffers
+
+COMPRESSIONS = {
+    None: zipfile.ZIP_STORED,
+    "zlib": zipfile.ZIP_DEFLATED,
+    "bz2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+
+def iter_cells(space):
+    """Yield cells in `space` and its static and dynamic descendants"""
+    yield from space.cells.values()
+    for child in space.spaces.values():
+        yield from iter_cells(child)
+
+
+def get_sections(model):
+    """Return a dict of top space names to cells in the spaces"""
+    sections = {}
+    for spaces in (model.spaces, model._dynamic_bases):
+        for name, space in spaces.items():
+            sections[name] = list(iter_cells(space))
+    return sections
+
+
+class _ModelPickler(pickle.Pickler):
+    """Pickle a model without values, collecting modelx objects"""
+
+    def __init__(self, file, model, datamap):
+        super().__init__(file, protocol=PROTOCOL)
+        self.datamap = datamap
+        self.objects = []
+        self.objids = {}
+        self.dispatch_table = copyreg.dispatch_table.copy()
+        self.dispatch_table[type(model)] = self.reduce_model
+
+    @staticmethod
+    def reduce_model(model):
+        # The graphs are saved separately
+        state = model.__getstate__(exclude=("cellgraph", "lexdep"))
+        return copyreg.__newobj__, (type(model),), state
+
+    def persistent_id(self, obj):
+        if isinstance(obj, (Impl, Interface)):
+            if id(obj) not in self.objids:
+                self.objids[id(obj)] = len(self.objects)
+                self.objects.append(obj)
+        elif type(obj) is dict and id(obj) in self.datamap:
+            return self.datamap[id(obj)]
+        return None
+
+
+class _ModelUnpickler(pickle.Unpickler):
+
+    def __init__(self, file):
+        super().__init__(file)
+        self.datamap = {}
+
+    def persistent_load(self, pid):
+        data = self.datamap[pid] = {}
+        return data
+
+
+class _ValuePickler(pickle.Pickler):
+    """Pickle values referring to modelx objects by their indexes
+
+    Large buffers are collected in ``buffers`` with protocol 5.
+    """
+
+    def __init__(self, file, objids):
+        if VALUE_PROTOCOL < 5:
+            super().__init__(file, protocol=VALUE_PROTOCOL)
+        else:
+            super().__init__(file, protocol=VALUE_PROTOCOL,
+                             buffer_callback=self.add_buffer)
+        self.objids = objids
+        self.buffers = []
+
+    def add_buffer(self, buffer):
+        if buffer.raw().nbytes < OUT_OF_BAND_SIZE:
+            return True     # Pickled in-band
+        self.buffers.append(buffer)
+        return False
+
+    def persistent_id(self, obj):
+        if isinstance(obj, (Impl, Interface)):
+            return self.objids[id(obj)]
+        return None
+
+
+class _ValueUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, objects, buffers=None):
+        if buffers is None:
+            super().__init__(file)
+        else:
+            super().__init__(file, buffers=buffers)
+        self.objects = objects
+
+    def persistent_load(self, pid):
+        return self.objects[pid]
+
+
+def write_values(zf, name, values, objids):
+    """Write `values` in the entry `name` and buffers in `name`/<n>"""
+    with zf.open(name, "w", force_zip64=True) as file:
+        pickler = _ValuePickler(file, objids)
+        pickler.dump(values)
+
+    for i, buffer in enumerate(pickler.buffers):
+        with zf.open("%s/%d" % (name, i), "w", force_zip64=True) as file:
+            file.write(buffer.raw())
+        buffer.release()
+
+
+def read_values(zf, name, objects):
+    """Read values written by :func:`write_values`"""
+    buffers = []
+    while True:
+        try:
+            info = zf.getinfo("%s/%d" % (name, len(buffers)))
+        except KeyError:
+            break
+        buffer = bytearray(info.file_size)
+        with zf.open(info, "r") as file:
+            file.readinto(buffer)
+        buffers.append(buffer)
+
+    with zf.open(name, "r") as file:
+        if buffers:
+            return _ValueUnpickler(file, objects, buffers).load()
+        else:
+            return _ValueUnpickler(file, objects).load()
+
+
+def encode_graph(graph, sections):
+    """Encode the cell graph as node tables and edge arrays per section
+
+    The node table of a section has the indexes of the cells of the nodes
+    in the section and the keys of the nodes. Edges into the nodes
+    in the section are stored as three arrays, the section numbers
+    and the node numbers of the predecessors, and the node numbers
+    of the successors.
+    Nodes of cells no longer in the sections, such as deleted cells,
+    are left out together with their edges.
+    """
+    names = list(sections)
+    cellsids = {}   # id of cells to (section number, cells index)
+    for secno, name in enumerate(names):
+        for i, cells in enumerate(sections[name]):
+            cellsids[id(cells)] = (secno, i)
+
+    tables = [(array("q"), []) for _ in names]
+    nodeids = {}
+    for node in graph.nodes:
+        if id(node[OBJ]) not in cellsids:
+            continue
+        secno, i = cellsids[id(node[OBJ])]
+        cellsidx, keys = tables[secno]
+        nodeids[node] = (secno, len(keys))
+        cellsidx.append(i)
+        keys.append(node[KEY])
+
+    edges = [(array("q"), array("q"), array("q")) for _ in names]
+    for pred, node in graph.edges:
+        if pred not in nodeids or node not in nodeids:
+            continue
+        predsec, prednum = nodeids[pred]
+        secno, num = nodeids[node]
+        predsecs, prednums, nums = edges[secno]
+        predsecs.append(predsec)
+        prednums.append(prednum)
+        nums.append(num)
+
+    return {name: tables[i] + edges[i] for i, name in enumerate(names)}
+
+
+def encode_lexdep(graph, objids):
+    """Encode the lexical dependency graph as arrays of object indexes
+
+    Nodes of objects no longer in the model are left out.
+    """
+    nodes = array("q")
+    for node in graph.nodes:
+        if id(node[OBJ]) in objids:
+            nodes.append(objids[id(node[OBJ])])
+
+    preds, succs = array("q"), array("q")
+    for pred, succ in graph.edges:
+        if id(pred[OBJ]) in objids and id(succ[OBJ]) in objids:
+            preds.append(objids[id(pred[OBJ])])
+            succs.append(objids[id(succ[OBJ])])
+
+    return nodes, preds, succs
+
+
+def write_model(model, path, compression=None):
+    """Save `model` in sections. Called from ModelImpl.save"""
+
+    if compression not in COMPRESSIONS:
+        raise ValueError("Invalid compression: %s" % compression)
+
+    sections = get_sections(model)
+    datamap = {}    # id of data to (section, index)
+    for name, cellslist in sections.items():
+        for i, cells in enumerate(cellslist):
+            datamap[id(cells.data)] = (name, i)
+
+    graphs = encode_graph(model.cellgraph, sections)
+
+    with zipfile.ZipFile(path, "w", COMPRESSIONS[compression]) as zf:
+        with zf.open("model", "w", force_zip64=True) as file:
+            pickler = _ModelPickler(file, model, datamap)
+            pickler.dump(model.interface)
+            pickler.dump(sections)
+            pickler.dump(pickler.objects)
+
+        with zf.open("lexdep", "w", force_zip64=True) as file:
+            pickle.dump(encode_lexdep(model.lexdep, pickler.objids), file,
+                        protocol=PROTOCOL)
+
+        for name, cellslist in sections.items():
+            write_values(zf, "values/" + name,
+                         [cells.data for cells in cellslist], pickler.objids)
+            write_values(zf, "graph/" + name, graphs[name], pickler.objids)
+
+
+def read_model(system, path, spaces=None):
+    """Open a model saved by write_model
+
+    If `spaces` is given, only the values in the spaces are read.
+    Values calculated from the values in the other spaces are not read.
+    """
+    with zipfile.ZipFile(path, "r") as zf:
+        with zf.open("model", "r") as file:
+            unpickler = _ModelUnpickler(file)
+            model = unpickler.load()
+            sections = unpickler.load()
+            objects = unpickler.load()
+
+        impl = model._impl
+        impl.restore_state(system)
+
+        if spaces is None:
+            loaded = set(sections)
+        else:
+            loaded = set(impl._dynamic_bases)
+            for name in spaces:
+                if name not in impl.spaces:
+                    raise ValueError("Space '%s' not found" % name)
+                loaded.add(name)
+
+        with zf.open("lexdep", "r") as file:
+            nodes, preds, succs = pickle.load(file)
+        impl.lexdep.add_nodes_from((objects[i],) for i in nodes)
+        impl.lexdep.add_edges_from(
+            ((objects[i],), (objects[j],)) for i, j in zip(preds, succs))
+
+        names = list(sections)
+        nodes = [None] * len(names)     # Node lists of loaded sections
+        edges = []
+        for secno, name in enumerate(names):
+            if name not in loaded:
+                continue
+            values = read_values(zf, "values/" + name, objects)
+            for i, data in enumerate(values):
+                unpickler.datamap[(name, i)].update(data)
+
+            cellsidx, keys, predsecs, prednums, nums = read_values(
+                zf, "graph/" + name, objects)
+            cellslist = sections[name]
+            nodes[secno] = [
+                (cellslist[i], key) for i, key in zip(cellsidx, keys)]
+            edges.append((secno, predsecs, prednums, nums))
+
+    graph = impl.cellgraph
+    excluded = set()    # Nodes depending on nodes not loaded
+    for secno, predsecs, prednums, nums in edges:
+        secnodes = nodes[secno]
+        graph.add_nodes_from(secnodes)
+        graph.add_edges_from(
+            (nodes[predsec][prednum], secnodes[num])
+            for predsec, prednum, num in zip(predsecs, prednums, nums)
+            if nodes[predsec] is not None
+        )
+        excluded.update(
+            secnodes[num]
+            for predsec, num in zip(predsecs, nums)
+            if nodes[predsec] is None
+        )
+
+    if excluded:
+        impl.clear_many(excluded)
+
+    return model
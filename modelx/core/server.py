@@ -0,0 +1,305 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Serving values of cells over local sockets
+
+A server holds a model in memory and evaluates cells for clients
+connected to a Unix domain socket or a TCP port on localhost.
+A request is a batch of pairs of the full name of a cells and arguments,
+and the response is the list of the values.
+
+Messages are framed by their lengths. Requests are encoded by
+:mod:`marshal`, so that the server does not unpickle data
+from clients. Responses are pickled. A request that cannot be decoded
+is answered with an error and its connection is closed.
+The server is meant for local use by trusted clients
+and does not authenticate them.
+
+Example:
+    In the server process::
+
+        model = mx.open_model("model.mx")
+        ModelServer(model, "/tmp/model.sock").serve_forever()
+
+    In client processes::
+
+        client = ModelClient("/tmp/model.sock")
+        client.evaluate([("Model1.Space1.foo", (1,)),
+                         ("Model1.Space1.bar", (2, 3))])
+"""
+
+import marshal
+import os
+import pickle
+import queue
+import socket
+import socketserver
+import struct
+import threading
+from concurrent.futures import Future
+
+from modelx.core.cells import CellsImpl
+
+HEADER = struct.Struct("!Q")
+
+
+def _send(sock, data):
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    while size:
+        received = sock.recv_into(view, size)
+        if not received:
+            raise ConnectionError("Connection closed")
+        view = view[received:]
+        size -= received
+    return buffer
+
+
+def _recv(sock):
+    size, = HEADER.unpack(_recv_exactly(sock, HEADER.size))
+    return _recv_exactly(sock, size)
+
+
+def _get_portable_error(exc):
+    """Return `exc` if it can be unpickled, or a RuntimeError otherwise"""
+    try:
+        pickle.loads(pickle.dumps(exc))
+        return exc
+    except Exception:
+        return RuntimeError("%s: %s" % (type(exc).__name__, exc))
+
+
+def _check_requests(requests):
+    if isinstance(requests, list) and all(
+            isinstance(pair, tuple) and len(pair) == 2
+            and isinstance(pair[0], str) and isinstance(pair[1], tuple)
+            for pair in requests):
+        return
+    raise TypeError(
+        "requests must be a list of pairs of a name and a tuple of arguments")
+
+
+def _is_unix_address(address):
+    return isinstance(address, str)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        while True:
+            try:
+                request = marshal.loads(_recv(self.request))
+            except ConnectionError:
+                return
+            except (ValueError, EOFError, TypeError) as exc:
+                # Framing may be lost, so the connection is closed.
+                data = pickle.dumps(
+                    (False, ValueError("malformed request: %s" % exc)))
+                try:
+                    _send(self.request, data)
+                except ConnectionError:
+                    pass
+                return
+            try:
+                data = pickle.dumps(
+                    (True, self.server.evaluate(request)),
+                    protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as exc:
+                data = pickle.dumps((False, _get_portable_error(exc)))
+            _send(self.request, data)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ModelServer:
+    """Server evaluating cells of a model for clients
+
+    Each connection is served in its own thread.
+    Requests for the same value arriving at the same time
+    are evaluated once, and the value is returned to all of them.
+
+    Args:
+        model: :class:`~modelx.core.model.Model` object to serve
+        address: Path to a Unix domain socket,
+            or a tuple of a host and a port.
+    """
+
+    def __init__(self, model, address):
+        self.model = model
+        self.system = model._impl.system
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+        if _is_unix_address(address):
+            self._server = _UnixServer(address, _Handler)
+        else:
+            self._server = _TCPServer(address, _Handler)
+        self._server.evaluate = self.evaluate
+
+    @property
+    def address(self):
+        """Address the server is bound to"""
+        return self._server.server_address
+
+    def evaluate(self, requests):
+        """Return values for pairs of full names of cells and arguments"""
+        _check_requests(requests)
+        return [self._get_value(name, args) for name, args in requests]
+
+    def _get_value(self, name, args):
+
+        cells = self.system.get_object(name)
+        if not isinstance(cells, CellsImpl):
+            raise TypeError("%s is not a cells" % name)
+
+        key = (name, args)
+        with self._lock:
+            future = self._pending.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._pending[key] = Future()
+
+        if is_owner:
+            try:
+                future.set_result(cells.get_value(args))
+            except Exception as exc:
+                future.set_exception(exc)
+            finally:
+                with self._lock:
+                    del self._pending[key]
+
+        return future.result()
+
+    def serve_forever(self):
+        """Serve requests until :meth:`shutdown` is called"""
+        self._server.serve_forever()
+
+    def start(self):
+        """Serve requests in a background thread"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self):
+        """Stop serving requests and close the socket"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        if _is_unix_address(self.address) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+
+class ModelClient:
+    """Client of :class:`ModelServer` keeping connections for reuse
+
+    The client can be used from multiple threads.
+    Each call takes an idle connection, or opens a new one if none is idle,
+    and keeps up to ``maxconn`` idle connections for later calls.
+
+    Args:
+        address: Address of the server
+        maxconn(int, optional): Maximum number of idle connections to keep
+    """
+
+    def __init__(self, address, maxconn=4):
+        self.address = address
+        self._idle = queue.LifoQueue(maxconn)
+
+    def _connect(self):
+        if _is_unix_address(self.address):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.connect(self.address)
+        return sock
+
+    def evaluate(self, requests):
+        """Return the values of cells from the server
+
+        Args:
+            requests: A list of pairs of the full name of a cells,
+                such as ``"Model1.Space1.foo"``, and a tuple of arguments.
+                Arguments must be of types :mod:`marshal` supports,
+                such as numbers, strings and tuples of them.
+        """
+        data = marshal.dumps([(name, tuple(args)) for name, args in requests])
+        try:
+            sock = self._idle.get_nowait()
+        except queue.Empty:
+            sock = self._connect()
+
+        try:
+            _send(sock, data)
+            is_ok, result = pickle.loads(_recv(sock))
+        except BaseException:
+            sock.close()
+            raise
+
+        try:
+            self._idle.put_nowait(sock)
+        except queue.Full:
+            sock.close()
+
+        if is_ok:
+            return result
+        else:
+            raise result
+
+    def close(self):
+        """Close idle connections"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+if __name__ == "__main__":
+
+    import sys
+    import modelx as mx
+
+    if len(sys.argv) != 3:
+        print("Usage: python -m modelx.core.server MODELFILE SOCKETPATH")
+        sys.exit(1)
+
+    ModelServer(mx.open_model(sys.argv[1]), sys.argv[2]).serve_forever()
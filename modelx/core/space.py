@@ -78,7 +78,67 @@ class RefDict(ImplDict):
         ImplDict.__init__(self, space, RefView, data, observers)
 
     def set_item(self, name, ref, skip_self=False):
+        self.clear_referrers(name)
+        old = self.get(name)
         ImplDict.set_item(self, name, ref, skip_self)
+        self._invalidate_cache(name, old)
+
+    def del_item(self, name, skip_self=False):
+        self.clear_referrers(name)
+        old = self.get(name)
+        ImplDict.del_item(self, name, skip_self)
+        self._invalidate_cache(name, old)
+
+    def clear_referrers(self, name):
+        """Clear values of cells referring to ``name`` in the namespace
+
+        Cells are found by their edges to refs named ``name``
+        in the lexical dependency graph. Only the refs visible from
+        the owner are looked up, so new refs without referrers cost
+        nothing. Cells in spaces other than the owner are not cleared,
+        unless the owner is the model.
+        The ref to be replaced is removed from the graph.
+        """
+        model = self.owner.model
+        lexdep = model.lexdep
+        if self.owner is model:
+            if name in self:
+                refnodes = [(self[name],)]
+            else:   # A new global ref hides refs of the same name
+                refnodes = list(lexdep.refnodes.get(name, ()))
+            model.clear_lexdescendants(refnodes)
+        else:
+            refs = self.owner._refs.maps + [self]
+            model.clear_objs(
+                node[OBJ]
+                for ref in _iter_refs(refs, name) if lexdep.has_node((ref,))
+                for node in lexdep.predecessors((ref,))
+                if node[OBJ].parent is self.owner
+            )
+
+        if name in self and lexdep.has_node((self[name],)):
+            lexdep.remove_node((self[name],))
+
+    def _invalidate_cache(self, name, old):
+        """Reset fingerprints of objects that may refer to ``name``
+
+        Cells referring to the old ref depend on it. Cells referring to
+        a new name are found by their formulas in the owner.
+        A new global ref may hide refs in any space,
+        so all the fingerprints are reset.
+        """
+        cache = self.owner.model.cache
+        if cache is None:
+            return
+        elif old is not None:
+            cache.invalidate([self.owner, old])
+        elif self.owner is self.owner.model:
+            cache.invalidate()
+        else:
+            cache.invalidate([self.owner] + [
+                cells for cells in self.owner._cells.data.values()
+                if name in (cells.formula.srcnames or ())
+            ])
 
     # TODO: Should remove this to force refs created outside RefDict?
     @staticmethod
@@ -89,6 +149,21 @@ class RefDict(ImplDict):
             return ReferenceImpl(space, name, value)
 
 
+def _iter_refs(maps, name):
+    """Yield refs named ``name`` in nested ``maps`` without updating them"""
+    seen = set()
+    stack = list(reversed(maps))
+    while stack:
+        map_ = stack.pop()
+        if isinstance(map_, ChainMap):
+            stack.extend(reversed(map_.maps))
+            continue
+        ref = getattr(map_, "data", map_).get(name)
+        if isinstance(ref, ReferenceImpl) and id(ref) not in seen:
+            seen.add(id(ref))
+            yield ref
+
+
 def _to_frame_inner(cellsiter, args):
 
     from modelx.io.pandas import cellsiter_to_dataframe
@@ -215,8 +290,9 @@ class BaseSpace(BaseSpaceContainer):
     __slots__ = ()
 
     def __getattr__(self, name):
-        if name in self._impl.namespace:
-            return self._impl.namespace[name]
+        namespace = self._impl.frozen_namespace or self._impl.namespace
+        if name in namespace:
+            return namespace[name]
         else:
             raise AttributeError  # Must return AttributeError for hasattr
 
@@ -612,10 +688,11 @@ class StaticSpace(BaseSpace, EditableSpaceContainer):
 
     @BaseSpace.formula.setter
     def formula(self, formula):
-        self._impl.set_formula(formula)
+        self.set_formula(formula)
 
     def set_formula(self, formula):
         """Set if the parameter function."""
+        self._impl.model.check_editable()
         self._impl.set_formula(formula)
 
 
@@ -629,6 +706,10 @@ class BaseSpaceImpl(Derivable, BaseSpaceContainerImpl):
     * Implement Derivable
     """
 
+    # Set while the model is frozen. Not pickled.
+    frozenfunc = None
+    frozen_namespace = None
+
     # ----------------------------------------------------------------------
     # Serialization by pickle
 
@@ -787,7 +868,7 @@ class BaseSpaceImpl(Derivable, BaseSpaceContainerImpl):
     def parent_bases(self):
         if self.parent.is_model():
             return []
-        elif self in self.parent.dynamic_spaces.values():
+        elif self.parent.dynamic_spaces.get(self.name) is self:
             return []
         else:
             parent_bases = self.parent.bases
@@ -878,7 +959,9 @@ class BaseSpaceImpl(Derivable, BaseSpaceContainerImpl):
                 member = selfmap[name]
                 if member.is_derived:
                     selfmap.del_item(name)
-                    if attr == "static_spaces":
+                    if attr == "cells":
+                        member.del_self()
+                    elif attr == "static_spaces":
                         self.model.spacegraph.remove_node(member)
                 else:
                     member.inherit(**kwargs)
@@ -942,7 +1025,26 @@ class BaseSpaceImpl(Derivable, BaseSpaceContainerImpl):
             raise ValueError("formula already assigned.")
 
     def eval_formula(self, node):
-        return self.altfunc.get_updated().altfunc(*node[KEY])
+        func = self.frozenfunc or self.altfunc.get_updated().altfunc
+        return func(*node[KEY])
+
+    def freeze(self):
+        """Resolve the namespace and formulas of self and its members"""
+        self.frozen_namespace = self.namespace
+        if self.formula is not None:
+            self.frozenfunc = self.altfunc.get_updated().altfunc
+        for cells in self.cells.values():
+            cells.freeze()
+        for space in self.spaces.values():
+            space.freeze()
+
+    def unfreeze(self):
+        self.frozen_namespace = None
+        self.frozenfunc = None
+        for cells in self.cells.values():
+            cells.unfreeze()
+        for space in self.spaces.values():
+            space.unfreeze()
 
     def _get_dynamic_base(self, bases_):
         """Create or get the base space from a list of spaces
@@ -1038,9 +1140,15 @@ class BaseSpaceImpl(Derivable, BaseSpaceContainerImpl):
                     space_args["bases"] = [self]
 
             space_args["arguments"] = node_get_args(node)
-            space = self._new_dynspace(**space_args)
-            self.param_spaces[key] = space
-            space.inherit(clear_value=False)
+            with self.model.lock:
+                if key in self.param_spaces:    # Created by another thread
+                    return self.param_spaces[key]
+                space = self._new_dynspace(**space_args)
+                self.param_spaces[key] = space
+                space.inherit(clear_value=False)
+                if self.model.frozen:
+                    space.freeze()
+                    self.frozen_namespace = self.namespace
             return space
 
     # ----------------------------------------------------------------------
@@ -1140,6 +1248,7 @@ class StaticSpaceImpl(BaseSpaceImpl, EditableSpaceContainerImpl):
 
     def new_cells(self, name=None, formula=None, is_derived=False):
 
+        self.model.check_editable()
         if name in self.namespace:
             raise ValueError("'%s' already exist" % name)
         else:
@@ -1230,11 +1339,34 @@ class StaticSpaceImpl(BaseSpaceImpl, EditableSpaceContainerImpl):
     # --- Reference creation -------------------------------------
 
     def new_ref(self, name, value, is_derived=False):
+        self.model.check_editable(ref=True)
+        if self.model.active_fork is not None:
+            self.model.active_fork.record_ref(self, name)
         ref = self._new_ref(name, value, is_derived)
         ref.inherit()
         self.model.spacegraph.update_subspaces(self)
+        self._update_dynamic_refs(name)
         return ref
 
+    def _update_dynamic_refs(self, name):
+        """Update refs named ``name`` in dynamic spaces based on this space
+
+        Cells referring to the refs are cleared at once.
+        Other members of the dynamic spaces are kept.
+        """
+        refs = []
+        for dynspace in self._dynamic_subs:
+            ref = dynspace.self_refs.get(name)
+            if ref is None:
+                if name not in dynspace.namespace_impl:
+                    refs.append(dynspace._new_ref(name, None, True))
+            elif ref.is_derived:
+                refs.append(ref)
+
+        self.model.clear_lexdescendants((ref,) for ref in refs)
+        for ref in refs:
+            ref.inherit(clear_value=False)
+
     # ----------------------------------------------------------------------
     # Attribute access
 
@@ -1296,6 +1428,10 @@ class StaticSpaceImpl(BaseSpaceImpl, EditableSpaceContainerImpl):
         return self.mro[1:]
 
     def add_bases(self, bases):
+        self.model.check_editable()
+        self._add_bases(bases)
+
+    def _add_bases(self, bases):
         self.model.spacegraph.check_mro(bases)
         for other in bases:
             self.model.spacegraph.add_edge(other, self)
@@ -1303,6 +1439,7 @@ class StaticSpaceImpl(BaseSpaceImpl, EditableSpaceContainerImpl):
         self.model.spacegraph.update_subspaces(self)
 
     def remove_base(self, other):  # TODO: Replace this with remove bases
+        self.model.check_editable()
         self.model.spacegraph.remove_edge(other, self)
         self.inherit()
         self.model.spacegraph.update_subspaces(self)
@@ -1315,6 +1452,7 @@ class StaticSpaceImpl(BaseSpaceImpl, EditableSpaceContainerImpl):
 
     def del_space(self, name):
         """Delete a space."""
+        self.model.check_editable()
         if name not in self.spaces:
             raise ValueError("Space '%s' does not exist" % name)
 
@@ -1344,6 +1482,7 @@ class StaticSpaceImpl(BaseSpaceImpl, EditableSpaceContainerImpl):
         ``del space.name`` where name is a cells, or
         ``del space.cells['name']``
         """
+        self.model.check_editable()
         if name in self.cells:
             cells = self.cells[name]
             self.cells.del_item(name)
@@ -1361,9 +1500,13 @@ class StaticSpaceImpl(BaseSpaceImpl, EditableSpaceContainerImpl):
 
     def del_ref(self, name):
 
+        self.model.check_editable(ref=True)
         if name in self.self_refs:
-            del self.self_refs[name]
-            self.self_refs.set_update()
+            if self.model.active_fork is not None:
+                self.model.active_fork.record_ref(self, name)
+            self.self_refs.del_item(name)
+            self.inherit()
+            self.model.spacegraph.update_subspaces(self)
         elif name in self.is_derived:
             raise KeyError("Derived ref '%s' cannot be deleted" % name)
         elif name in self.arguments:
@@ -1384,6 +1527,7 @@ class StaticSpaceImpl(BaseSpaceImpl, EditableSpaceContainerImpl):
         if self.source is None:
             return
 
+        self.model.check_editable()
         module = importlib.reload(get_module(self.source))
         modsrc = ModuleSource(module)
         funcs = modsrc.funcs
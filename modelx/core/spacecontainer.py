@@ -330,6 +330,8 @@ class EditableSpaceContainerImpl(BaseSpaceContainerImpl):
         """
         from modelx.core.space import StaticSpaceImpl
 
+        self.model.check_editable()
+
         if name is None:
             name = self.spacenamer.get_next(self.namespace, prefix)
 
@@ -17,6 +17,7 @@ import math
 import warnings
 import pickle
 import threading
+import zipfile
 from collections import deque
 from modelx.core.node import get_node_repr
 from modelx.core.model import ModelImpl
@@ -28,24 +29,34 @@ from modelx.core.errors import RewindStackError
 
 class Execution:
 
-    def __init__(self, system, maxdepth=None):
+    def __init__(self, system):
 
         # Use thread to increase stack size and deepen callstack
         # Ref: https://bugs.python.org/issue32570
 
         self.system = system
-        self.callstack = CallStack(maxdepth)
+        self.callstack = CallStack(system)
         self.thread = None
         self.initnode = None
+        self.initfunc = None
+        self.assigned = set()   # Nodes assigned values in their formulas
+        self.job = None     # Set while evaluated for an awaiting task
 
     def eval_cell(self, node):
 
         if not self.thread:
             # (self.thread is None) == not self.callstack must be always True
-            return self._start_thread(node)
+            return self._start_thread(node, self._eval_formula)
         else:
             return self._eval_formula(node)
 
+    def eval_array(self, node):
+
+        if not self.thread:
+            return self._start_thread(node, self._eval_array)
+        else:
+            return self._eval_array(node)
+
     class ExecThread(threading.Thread):
 
         def __init__(self, execution):
@@ -54,14 +65,17 @@ class Execution:
             super().__init__()
 
         def run(self):
+            # The thread shares the execution of the thread that started it
+            self.execution.system._local.execution = self.execution
             try:
-                self.buffer = self.execution._eval_formula(
+                self.buffer = self.execution.initfunc(
                     self.execution.initnode)
             except:
                 self.execution.exception = sys.exc_info()
 
-    def _start_thread(self, node):
+    def _start_thread(self, node, func):
         self.initnode = node
+        self.initfunc = func
         self.exception = None
         self.thread = Execution.ExecThread(self)
         try:
@@ -78,10 +92,14 @@ class Execution:
 
         finally:
             self.initnode = None
+            self.initfunc = None
             self.thread = None
 
     def _eval_formula(self, node):
 
+        if self.job is not None:
+            self.job.check()
+
         self.callstack.append(node)
         cells, key = node[OBJ], node[KEY]
 
@@ -93,22 +111,42 @@ class Execution:
             raise RewindStackError(node, tracemsg)
 
         finally:
+            self.assigned.discard(node)
             self.callstack.pop()
 
+    def _eval_array(self, node):
 
-class CallStack(deque):
+        if self.job is not None:
+            self.job.check()
 
-    default_maxdepth = 65000
+        self.callstack.append(node)
+        cells = node[OBJ]
+
+        try:
+            return cells.on_eval_array(node)
 
-    def __init__(self, maxdepth=None):
+        except ZeroDivisionError:
+            tracemsg = self.callstack.tracemessage()
+            raise RewindStackError(node, tracemsg)
 
-        if maxdepth:
-            self.maxdepth = maxdepth
-        else:
-            self.maxdepth = self.default_maxdepth
+        finally:
+            self.callstack.pop()
+
+
+class CallStack(deque):
+
+    default_maxdepth = 65000
 
+    def __init__(self, system):
+        self.system = system
         deque.__init__(self)
 
+    @property
+    def maxdepth(self):
+        # Read at check time so that the limit set by any thread
+        # applies to the call stacks of all the threads.
+        return self.system.maxdepth or self.default_maxdepth
+
     def last(self):
         return self[-1]
 
@@ -186,13 +224,14 @@ class System:
     def __init__(self, maxdepth=None, setup_shell=False):
 
         self.configure_python()
-        self.execution = Execution(self, maxdepth)
-        self.callstack = self.execution.callstack
+        self.maxdepth = maxdepth
+        self._local = threading.local()
         self._modelnamer = AutoNamer("Model")
         self._backupnamer = AutoNamer("_BAK")
         self._currentmodel = None
         self._models = {}
-        self.self = None
+        self._executor = None
+        self.tracer = None
 
         if setup_shell:
             if is_ipython():
@@ -204,6 +243,40 @@ class System:
         else:
             self.is_ipysetup = False
 
+    # ----------------------------------------------------------------------
+    # Per-thread states
+    #
+    # Formulas can be evaluated from multiple threads at the same time,
+    # so each thread has its own execution and call stack.
+
+    @property
+    def execution(self):
+        try:
+            return self._local.execution
+        except AttributeError:
+            self._local.execution = Execution(self)
+            return self._local.execution
+
+    @property
+    def callstack(self):
+        return self.execution.callstack
+
+    @property
+    def executor(self):
+        """Executor evaluating cells in worker threads for awaiting tasks"""
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(thread_name_prefix="modelx")
+        return self._executor
+
+    @property
+    def self(self):
+        return getattr(self._local, "self", None)
+
+    @self.setter
+    def self(self, value):
+        self._local.self = value
+
     def setup_ipython(self):
         """Monkey patch shell's error handler.
 
@@ -310,11 +383,18 @@ class System:
     def currentspace(self):
         return self.currentmodel.currentspace
 
-    def open_model(self, path, name):
-        with open(path, "rb") as file:
-            model = pickle.load(file)
+    def open_model(self, path, name, spaces=None):
+        from modelx.core.serializer import read_model
+
+        if zipfile.is_zipfile(path):
+            model = read_model(self, path, spaces)
+        elif spaces is not None:
+            raise ValueError("spaces not supported for %s" % path)
+        else:   # Saved by old versions
+            with open(path, "rb") as file:
+                model = pickle.load(file)
 
-        model._impl.restore_state(self)
+            model._impl.restore_state(self)
 
         if name is not None:
             if not is_valid_name(name):
@@ -0,0 +1,218 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tracing events of evaluation
+
+While tracing, the methods below are replaced with wrappers
+that send begin and end events to the tracer of the system.
+The methods are put back when tracing stops,
+so tracing costs nothing while it is not active.
+
+==================  ===========================================
+Category            Method
+==================  ===========================================
+``"get_value"``     :meth:`CellsImpl.get_value`
+``"formula"``       :meth:`Execution._eval_formula`
+``"clear"``         :meth:`ModelImpl.clear_many`
+``"dynspace"``      :meth:`BaseSpaceImpl.get_dynspace`
+==================  ===========================================
+
+End events of ``"get_value"`` and ``"dynspace"`` have the ``hit`` flag,
+which is True if the value or the space existed before the call.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+
+from modelx.core.cells import CellsImpl, convert_args
+from modelx.core.model import ModelImpl
+from modelx.core.node import OBJ, KEY, get_node
+from modelx.core.space import BaseSpaceImpl
+from modelx.core.system import Execution
+
+
+class Tracer:
+    """Base class of tracers receiving events of evaluation
+
+    Subclasses override :meth:`begin` and :meth:`end`.
+    The methods can be called from multiple threads at the same time.
+    """
+
+    def begin(self, category, node):
+        """Called when an event of `category` for `node` begins"""
+
+    def end(self, category, node, **args):
+        """Called when the event ends. `args` has its properties."""
+
+
+class ChromeTracer(Tracer):
+    """Tracer collecting events in the Chrome trace format
+
+    The saved file can be opened in ``chrome://tracing`` or Perfetto UI.
+    Events are shown for each thread. Names of the events are
+    the names of the nodes, such as ``Model1.Space1.foo(1)``.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.pid = os.getpid()
+
+    def begin(self, category, node):
+        self.events.append((
+            "B", category, node,
+            time.perf_counter(), threading.get_ident(), None))
+
+    def end(self, category, node, **args):
+        self.events.append((
+            "E", category, node,
+            time.perf_counter(), threading.get_ident(), args))
+
+    def get_events(self):
+        """Return the events as a list of dicts in the Chrome trace format"""
+        result = []
+        for phase, category, node, ts, tid, args in self.events:
+            event = {
+                "name": get_name(node) if node is not None else category,
+                "cat": category,
+                "ph": phase,
+                "ts": ts * 1e6,
+                "pid": self.pid,
+                "tid": tid
+            }
+            if args:
+                event["args"] = args
+            result.append(event)
+        return result
+
+    def save(self, path):
+        """Write the events to a JSON file at `path`"""
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.get_events(),
+                       "displayTimeUnit": "ms"}, file)
+
+
+def get_name(node):
+    name = node[OBJ].get_repr(fullname=True, add_params=False)
+    return "%s(%s)" % (name, ", ".join(repr(arg) for arg in node[KEY]))
+
+
+def _get_node_hit(obj, args, kwargs, data):
+    try:
+        node = get_node(obj, *convert_args(args, kwargs))
+        return node, node[KEY] in data
+    except TypeError:   # Unhashable arguments such as arrays
+        return None, False
+
+
+def _trace_get_value(method):
+
+    @functools.wraps(method)
+    def get_value(self, args, kwargs=None):
+        tracer = self.system.tracer
+        if tracer is None:  # Stopped in another thread
+            return method(self, args, kwargs)
+        node, hit = _get_node_hit(self, args, kwargs, self.data)
+        tracer.begin("get_value", node)
+        try:
+            return method(self, args, kwargs)
+        finally:
+            tracer.end("get_value", node, hit=hit)
+
+    return get_value
+
+
+def _trace_eval_formula(method):
+
+    @functools.wraps(method)
+    def _eval_formula(self, node):
+        tracer = self.system.tracer
+        if tracer is None:
+            return method(self, node)
+        tracer.begin("formula", node)
+        try:
+            return method(self, node)
+        finally:
+            tracer.end("formula", node)
+
+    return _eval_formula
+
+
+def _trace_clear_many(method):
+
+    @functools.wraps(method)
+    def clear_many(self, sources, clear_source=True):
+        tracer = self.system.tracer
+        if tracer is None:
+            return method(self, sources, clear_source)
+        sources = list(sources)
+        tracer.begin("clear", None)
+        try:
+            return method(self, sources, clear_source)
+        finally:
+            tracer.end("clear", None, sources=len(sources))
+
+    return clear_many
+
+
+def _trace_get_dynspace(method):
+
+    @functools.wraps(method)
+    def get_dynspace(self, args, kwargs=None):
+        tracer = self.system.tracer
+        if tracer is None:
+            return method(self, args, kwargs)
+        node, hit = _get_node_hit(self, args, kwargs, self.param_spaces)
+        tracer.begin("dynspace", node)
+        try:
+            return method(self, args, kwargs)
+        finally:
+            tracer.end("dynspace", node, hit=hit)
+
+    return get_dynspace
+
+
+_hooks = [
+    (CellsImpl, "get_value", _trace_get_value),
+    (Execution, "_eval_formula", _trace_eval_formula),
+    (ModelImpl, "clear_many", _trace_clear_many),
+    (BaseSpaceImpl, "get_dynspace", _trace_get_dynspace),
+]
+
+_originals = []
+
+
+def start_trace(system, tracer):
+    if system.tracer is not None:
+        raise RuntimeError("Tracing already started")
+
+    system.tracer = tracer
+    for cls, name, wrap in _hooks:
+        method = cls.__dict__[name]
+        _originals.append((cls, name, method))
+        setattr(cls, name, wrap(method))
+
+
+def stop_trace(system):
+    if system.tracer is None:
+        raise RuntimeError("Tracing not started")
+
+    while _originals:
+        cls, name, method = _originals.pop()
+        setattr(cls, name, method)
+
+    tracer, system.tracer = system.tracer, None
+    return tracer
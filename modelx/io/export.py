@@ -0,0 +1,520 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Export models as standalone Python packages
+
+An exported package has no dependency on modelx.
+Each space becomes a sub-package, whose module defines
+each cells of the space as a plain function memoizing its values
+in a dict, and each reference of the space as a module global.
+Names in formulas are resolved by Python's module globals,
+so no modelx objects are involved in calling the functions.
+"""
+
+import ast
+import os
+import os.path
+import pickle
+import shutil
+from types import ModuleType
+
+import asttokens
+
+from modelx.core.base import Interface
+from modelx.core.cells import Cells
+from modelx.core.space import BaseSpace
+
+RUNTIME_MODULE = "_mxrt"
+GLOBALS_MODULE = "_model"
+
+_literal_types = (int, float, complex, str, bytes, bool, type(None))
+
+
+def export_model(model, path):
+    """Write ``model`` as a Python package in the directory ``path``
+
+    The name of the directory is the name of the package.
+    The directory must not exist.
+    The exported package does not use modelx, and the spaces in
+    the model are available as sub-packages of the package.
+    Cells become plain functions, so
+    subscriptions of cells in formulas, such as ``fibo[n-1]``,
+    are converted to calls, and scalar cells used as values,
+    such as ``rate + 1``, are converted to calls with no arguments.
+
+    Input values of cells are exported, including values assigned to
+    cells having formulas, which the exported functions return
+    without calling the formulas.
+
+    Limitations:
+        * Spaces with parameters must not have child spaces.
+          Their formulas must return None or their own bases.
+        * References must be literals, modules, picklable objects,
+          or static spaces or cells in the model.
+        * Cells attributes other than ``value`` are not supported
+          in formulas.
+
+    Args:
+        model: ModelImpl object
+        path(str): Path to the package directory
+    """
+    _ModelExporter(model, path).export()
+
+
+def _is_literal(value):
+    if isinstance(value, _literal_types):
+        try:
+            return ast.literal_eval(repr(value)) == value
+        except (ValueError, SyntaxError):
+            return False
+    elif isinstance(value, (tuple, list, frozenset, set)):
+        return type(value) in (tuple, list, set) and all(
+            _is_literal(elm) for elm in value
+        )
+    elif type(value) is dict:
+        return all(
+            _is_literal(key) and _is_literal(elm)
+            for key, elm in value.items()
+        )
+    else:
+        return False
+
+
+def _get_path(impl):
+    """Return dotted name of an object relative to its model"""
+    return impl.get_fullname(omit_model=True)
+
+
+_SCOPES = (ast.FunctionDef, ast.Lambda, ast.ClassDef,
+           ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+def _iter_scope(scope):
+    """Yield nodes in ``scope`` except those in nested scopes"""
+    stack = list(ast.iter_child_nodes(scope))
+    while stack:
+        node = stack.pop()
+        yield node
+        if not isinstance(node, _SCOPES):
+            stack.extend(ast.iter_child_nodes(node))
+
+
+def _get_local_names(funcdef):
+    """Return a dict of names in a function to the names local to them
+
+    Names bound in a function or in a comprehension, such as
+    parameters, assigned variables and loop variables,
+    are local in the function or the comprehension,
+    and do not refer to cells.
+    """
+    result = {}
+
+    def visit(scope, outer):
+        nodes = list(_iter_scope(scope))
+        names, globalnames = set(), set()
+        for node in nodes:
+            if isinstance(node, ast.Name):
+                if not isinstance(node.ctx, ast.Load):
+                    names.add(node.id)
+            elif isinstance(node, ast.arg):
+                names.add(node.arg)
+            elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                names.add(node.name)
+            elif isinstance(node, ast.alias):
+                names.add((node.asname or node.name).split(".")[0])
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                names.add(node.name)
+            elif isinstance(node, ast.Global):
+                globalnames.update(node.names)
+
+        names = (outer | names) - globalnames
+        for node in nodes:
+            if isinstance(node, ast.Name):
+                result[node] = names
+            elif isinstance(node, _SCOPES):
+                visit(node, names)
+
+    visit(funcdef, frozenset())
+    return result
+
+
+def _get_datakey(key):
+    if len(key) == 1:
+        return key[0]
+    else:
+        return key
+
+
+class _ModelExporter:
+
+    def __init__(self, model, path):
+        self.model = model
+        self.path = os.path.abspath(path)
+        self.pkgname = os.path.basename(self.path)
+        self.refs = {}  # Pickled references by module path
+        self.data = {}  # Input values by (space path, space args)
+        self.links = []  # Interface references set after import
+
+    def export(self):
+
+        if os.path.exists(self.path):
+            raise ValueError("%s already exists" % self.path)
+
+        if not self.pkgname.isidentifier():
+            raise ValueError(
+                "Invalid package name '%s'" % self.pkgname)
+
+        self.model.update_lazyevals()
+        os.mkdir(self.path)
+        try:
+            shutil.copyfile(
+                os.path.join(os.path.dirname(__file__), "export_runtime.py"),
+                os.path.join(self.path, RUNTIME_MODULE + ".py")
+            )
+            self.write_globals()
+            for space in self.model.spaces.values():
+                self.write_space(space, self.path, 1)
+            self.write_package()
+            self.write_pickle("_refs.pickle", self.refs)
+            self.write_pickle("_data.pickle", self.data)
+        except BaseException:
+            shutil.rmtree(self.path)
+            raise
+
+    # ----------------------------------------------------------------------
+    # Writers
+
+    def write_pickle(self, filename, obj):
+        if obj:
+            with open(os.path.join(self.path, filename), "wb") as file:
+                pickle.dump(obj, file, protocol=4)
+
+    def write_package(self):
+
+        lines = [
+            '"""Package exported from modelx model %s"""' % self.model.name,
+            "",
+            "from . import %s" % RUNTIME_MODULE,
+            "from .%s import *" % GLOBALS_MODULE,
+        ]
+        for name in self.model.spaces:
+            lines.append("from . import %s" % name)
+
+        if self.links:
+            lines.append("")
+            lines.append("# References to spaces and cells")
+            lines.append("from . import %s as _globals" % GLOBALS_MODULE)
+
+        for path, name, target in self.links:
+            if path:
+                owners = [path]
+            else:
+                # Global references are copied in all space modules
+                owners = ["_globals"] + [
+                    _get_path(space) for space in self._iter_spaces()
+                ]
+            for owner in owners:
+                lines.append("%s.%s = %s" % (owner, name, target))
+
+        self._write_module(os.path.join(self.path, "__init__.py"), lines)
+
+    def write_globals(self):
+
+        lines = [
+            '"""Global references of model %s"""' % self.model.name,
+            "",
+            "from . import %s" % RUNTIME_MODULE,
+            "",
+        ]
+        names = []
+        for name, ref in self.model.global_refs.items():
+            if name.startswith("_"):
+                continue
+            line = self.get_refdef("", name, ref.interface)
+            if line:
+                names.append(name)
+                lines.append(line)
+
+        lines.append("")
+        lines.append("__all__ = %r" % names)
+        self._write_module(
+            os.path.join(self.path, GLOBALS_MODULE + ".py"), lines)
+
+    def write_space(self, space, parentdir, depth):
+
+        spacedir = os.path.join(parentdir, space.name)
+        path = _get_path(space)
+        dots = "." * (depth + 1)
+        has_params = bool(space.formula)
+
+        if has_params and space.static_spaces:
+            raise ValueError(
+                "Space %s has parameters and child spaces" % path)
+
+        os.mkdir(spacedir)
+        lines = [
+            '"""Space %s of model %s"""' % (path, self.model.name),
+            "",
+            "from %s import %s" % (dots, RUNTIME_MODULE),
+            "from %s%s import *" % (dots, GLOBALS_MODULE),
+        ]
+        for name in space.static_spaces:
+            lines.append("from . import %s" % name)
+
+        lines.extend([
+            "",
+            "_mx_path = %r" % path,
+            "_mx_key = None",
+            "_self = _space = %s.this(__name__)" % RUNTIME_MODULE,
+            ""
+        ])
+
+        for name, ref in space.self_refs.items():
+            line = self.get_refdef(path, name, ref.interface)
+            if line:
+                lines.append(line)
+
+        cellsdefs = []
+        members = []
+        for name, cells in space.cells.items():
+            cellsdefs.extend(self.get_cellsdef(space, cells))
+            members.extend(
+                [name, "_%s_formula" % name, "_%s_data" % name])
+
+        if has_params:
+            lines.append("")
+            lines.append(self.rewrite_formula(
+                space, space.formula.source, "_formula"))
+            lines.append("_mx_source = %r" % "\n".join(cellsdefs))
+            lines.append(
+                "%s.define_space(__name__, _formula, _mx_source, %r)"
+                % (RUNTIME_MODULE, members)
+            )
+            for key, dynspace in space.param_spaces.items():
+                self.add_data(path, key, dynspace)
+        else:
+            lines.extend(cellsdefs)
+
+        self.add_data(path, None, space)
+        self._write_module(os.path.join(spacedir, "__init__.py"), lines)
+
+        for child in space.static_spaces.values():
+            self.write_space(child, spacedir, depth + 1)
+
+    def add_data(self, path, key, space):
+        data = {}
+        for name, cells in space.cells.items():
+            values = self.get_inputs(cells)
+            if values:
+                data[name] = {_get_datakey(k): v for k, v in values.items()}
+        if data:
+            self.data[(path, key)] = data
+
+    def get_inputs(self, cells):
+        """Return values of ``cells`` not calculated from other values
+
+        Values of cells with formulas are regarded as inputs if they
+        have no precedents in the cell graph, as values assigned to cells
+        do not. Values calculated without precedents are exported too,
+        which does not change the results of the exported package.
+        """
+        if cells.formula.is_null():
+            return cells.data
+
+        graph = self.model.cellgraph
+        return {
+            k: v for k, v in cells.data.items()
+            if not graph.has_node((cells, k))
+            or not graph.in_degree((cells, k))
+        }
+
+    @staticmethod
+    def _write_module(filepath, lines):
+        with open(filepath, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    def _iter_spaces(self, spaces=None):
+        if spaces is None:
+            spaces = self.model.spaces
+        for space in spaces.values():
+            yield space
+            yield from self._iter_spaces(space.static_spaces)
+
+    # ----------------------------------------------------------------------
+    # Definitions of references and cells
+
+    def get_refdef(self, path, name, value):
+
+        if isinstance(value, ModuleType):
+            return "import %s as %s" % (value.__name__, name)
+
+        elif isinstance(value, Interface):
+            impl = value._impl
+            if (isinstance(value, (Cells, BaseSpace))
+                    and impl.model is self.model
+                    and not impl.is_dynamic()):
+                self.links.append((path, name, _get_path(impl)))
+                return None
+            else:
+                raise ValueError(
+                    "Cannot export reference %s to %s" % (name, repr(value))
+                )
+
+        elif _is_literal(value):
+            return "%s = %r" % (name, value)
+
+        else:
+            try:
+                pickle.dumps(value, protocol=4)
+            except Exception as err:
+                raise ValueError(
+                    "Cannot export reference %s: %s" % (name, err)
+                ) from err
+            self.refs.setdefault(path, {})[name] = value
+            return "%s = %s.get_ref(%r, %r)" % (
+                name, RUNTIME_MODULE, path, name)
+
+    def get_cellsdef(self, space, cells):
+
+        name = cells.name
+        formula = cells.formula
+        if formula.source is None:
+            raise ValueError("Source of %s not found" % name)
+
+        params = []
+        for param in formula.signature.parameters.values():
+            if param.kind not in (
+                    param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+                raise ValueError(
+                    "Parameter %s of %s not supported" % (param.name, name)
+                )
+            elif param.default is param.empty:
+                params.append(param.name)
+            elif _is_literal(param.default):
+                params.append("%s=%r" % (param.name, param.default))
+            else:
+                raise ValueError(
+                    "Default value of %s in %s not supported"
+                    % (param.name, name)
+                )
+
+        args = ", ".join(formula.parameters)
+        if len(formula.parameters) == 1:
+            key = args
+        else:
+            key = "(%s)" % args
+
+        return [
+            "",
+            self.rewrite_formula(space, formula.source, "_%s_formula" % name),
+            "_%s_data = %s.get_data(_self, %r)" % (
+                name, RUNTIME_MODULE, name),
+            "",
+            "",
+            "def %s(%s):" % (name, ", ".join(params)),
+            "    try:",
+            "        return _%s_data[%s]" % (name, key),
+            "    except KeyError:",
+            "        pass",
+            "    value = _%s_data[%s] = _%s_formula(%s)" % (
+                name, key, name, args),
+            "    return value",
+            "",
+        ]
+
+    # ----------------------------------------------------------------------
+    # Formula conversion
+
+    def rewrite_formula(self, space, source, funcname):
+        """Rename the formula and convert cells expressions to calls"""
+
+        atok = asttokens.ASTTokens(source, parse=True)
+        for funcdef in ast.walk(atok.tree):
+            if isinstance(funcdef, (ast.FunctionDef, ast.Lambda)):
+                break
+        else:
+            raise ValueError("function definition not found")
+
+        localnames = _get_local_names(funcdef)
+        parents = {}
+        for node in ast.walk(funcdef):
+            for child in ast.iter_child_nodes(node):
+                parents[child] = node
+
+        edits = []
+        for node in ast.walk(funcdef):
+            if not isinstance(node, (ast.Name, ast.Attribute)):
+                continue
+            if not isinstance(node.ctx, ast.Load):
+                continue
+            cells = self._resolve(space, node, localnames)
+            if not isinstance(cells, Cells):
+                continue
+
+            parent = parents[node]
+            if isinstance(parent, ast.Call) and parent.func is node:
+                pass
+            elif isinstance(parent, ast.Subscript) and parent.value is node:
+                opening = atok.next_token(node.last_token)
+                closing = parent.last_token
+                edits.append((opening.startpos, opening.endpos, "("))
+                edits.append((closing.startpos, closing.endpos, ")"))
+            elif isinstance(parent, ast.Attribute):
+                if parent.attr == "value" and not cells.parameters:
+                    edits.append((node.last_token.endpos,
+                                  parent.last_token.endpos, "()"))
+                else:
+                    raise ValueError(
+                        "Attribute '%s' of cells %s not supported"
+                        % (parent.attr, cells.name)
+                    )
+            elif not cells.parameters:
+                edits.append(
+                    (node.last_token.endpos, node.last_token.endpos, "()"))
+
+        if isinstance(funcdef, ast.FunctionDef):
+            deftoken = funcdef.first_token
+            while deftoken.string != "def":
+                deftoken = atok.next_token(deftoken)
+            nametoken = atok.next_token(deftoken)
+            edits.append((nametoken.startpos, nametoken.endpos, funcname))
+        else:
+            source = source[funcdef.first_token.startpos:
+                            funcdef.last_token.endpos]
+            edits = [(begin - funcdef.first_token.startpos,
+                      end - funcdef.first_token.startpos,
+                      text) for begin, end, text in edits]
+
+        for begin, end, text in sorted(edits, reverse=True):
+            source = source[:begin] + text + source[end:]
+
+        if isinstance(funcdef, ast.Lambda):
+            source = "%s = %s\n" % (funcname, source)
+
+        return source.rstrip() + "\n"
+
+    def _resolve(self, space, node, localnames):
+        """Return the interface an expression refers to if any"""
+
+        if isinstance(node, ast.Name):
+            if node.id in localnames[node]:
+                return None
+            return space.namespace.get(node.id)
+
+        elif isinstance(node, ast.Attribute):
+            parent = self._resolve(space, node.value, localnames)
+            if isinstance(parent, BaseSpace):
+                return parent._impl.namespace.get(node.attr)
+
+        return None
@@ -0,0 +1,182 @@
+# Copyright (c) 2017-2019 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Runtime support for packages exported from modelx models.
+
+This module is copied as ``_mxrt.py`` into every package written by
+:func:`modelx.io.export.export_model`. It must only depend on
+the standard library, so that exported packages run without modelx.
+"""
+
+import os
+import sys
+import pickle
+import threading
+import types
+from collections.abc import Sequence
+from inspect import signature
+
+_pkgdir = os.path.dirname(os.path.abspath(__file__))
+_loaded = {}
+
+REFS_FILE = "_refs.pickle"
+DATA_FILE = "_data.pickle"
+
+
+def _load(filename):
+    if filename not in _loaded:
+        path = os.path.join(_pkgdir, filename)
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                _loaded[filename] = pickle.load(file)
+        else:
+            _loaded[filename] = {}
+
+    return _loaded[filename]
+
+
+def get_ref(path, name):
+    """Return the value of a pickled reference"""
+    return _load(REFS_FILE)[path][name]
+
+
+def get_data(space, name):
+    """Return the initial memo dict of a cells in a space
+
+    Input values of cells without formulas are stored in the data file.
+    The returned dict is owned by the caller.
+    """
+    spacedata = _load(DATA_FILE).get((space._mx_path, space._mx_key))
+    if spacedata is None:
+        return {}
+    else:
+        return spacedata.pop(name, {})
+
+
+def this(name):
+    """Return the module object of the space module ``name``"""
+    return sys.modules[name]
+
+
+def define_space(name, formula, source, members):
+    """Make the space module ``name`` callable with the space parameters
+
+    ``source`` is the code defining the cells of the space.
+    It is executed once in the module namespace for the space itself,
+    and once in a copy of the namespace for each set of arguments.
+    ``members`` are the names defined by ``source``.
+    """
+    module = sys.modules[name]
+    code = compile(source, module.__file__, "exec")
+    exec(code, vars(module))
+    module._mx_code = code
+    module._mx_formula = formula
+    module._mx_signature = signature(formula)
+    module._mx_members = frozenset(members)
+    module._mx_dynspaces = {}
+    module.__class__ = SpaceModule
+
+
+class SpaceModule(types.ModuleType):
+    """Module type for spaces with parameters"""
+
+    def __getitem__(self, key):
+        if isinstance(key, str) or not isinstance(key, Sequence):
+            key = (key,)
+        return self(*key)
+
+    def __call__(self, *args, **kwargs):
+        bound = self._mx_signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(bound.arguments.values())
+
+        try:
+            return self._mx_dynspaces[key]
+        except KeyError:
+            pass
+
+        result = self._mx_formula(*key)
+        if result is not None:
+            bases = result.get("bases", self)
+            if isinstance(bases, Sequence) and len(bases) == 1:
+                bases = bases[0]
+            if bases is not self or set(result) - {"bases"}:
+                raise NotImplementedError(
+                    "Space formula of %s must return None or its own bases"
+                    % self.__name__
+                )
+
+        space = self._mx_dynspaces[key] = DynamicSpace(
+            self, key, bound.arguments
+        )
+        return space
+
+
+class DynamicSpace:
+    """Space created by calling a space module with arguments"""
+
+    def __init__(self, module, key, arguments):
+
+        self._mx_path = module._mx_path
+        self._mx_key = key
+        self._mx_namespace = namespace = {
+            name: value
+            for name, value in vars(module).items()
+            if name not in module._mx_members
+        }
+        namespace.update(arguments)
+        namespace["_self"] = namespace["_space"] = self
+        exec(module._mx_code, namespace)
+
+    def __getattr__(self, name):
+        try:
+            return self._mx_namespace[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __repr__(self):
+        return "<%s%s>" % (self._mx_path, list(self._mx_key))
+
+
+def call(func, *args, **kwargs):
+    """Call ``func`` in a thread with a large stack
+
+    Use this function to evaluate cells with long recursive chains,
+    which may exceed the default stack size of the main thread.
+    """
+    result = []
+
+    def target():
+        try:
+            result.append((True, func(*args, **kwargs)))
+        except BaseException as err:
+            result.append((False, err))
+
+    limit = sys.getrecursionlimit()
+    size = threading.stack_size()
+    sys.setrecursionlimit(max(limit, 10 ** 6))
+    threading.stack_size(0xFFFFFFF)
+    try:
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+    finally:
+        threading.stack_size(size)
+        sys.setrecursionlimit(limit)
+
+    success, value = result[0]
+    if success:
+        return value
+    else:
+        raise value
@@ -1,13 +1,13 @@
-try:
-    import sys, warnings
+# Qt modules are imported on the first use of the GUI functions,
+# so that importing modelx does not require QtPy.
+
+
+def get_app():
+    """Return QApplication, starting it if not running yet."""
+    import sys
     from qtpy.QtWidgets import QApplication
 
-    # Start QApplication if not running yet.
     app = QApplication.instance()
     if not app:
         app = QApplication(sys.argv)
-
-except ImportError:
-    warnings.warn(
-        "QtPy package not found." "GUI will not be available.", ImportWarning
-    )
+    return app
@@ -24,24 +24,20 @@ or by::
     from modelx import *
 
 """
-import sys, warnings
 import modelx as mx
+from modelx.qtgui import get_app
 
 __all__ = ["get_modeltree", "get_tree", "show_tree"]
 
-try:
-    from qtpy.QtWidgets import QApplication, QTreeView
-    from modelx.qtgui.modeltree import ModelTreeModel
-except ImportError:
-    warnings.warn(
-        "QtPy package not found." "GUI will not be available.", ImportWarning
-    )
-
 
 def get_modeltree(model=None):
     """Alias to :func:`get_tree`."""
+    from qtpy.QtWidgets import QTreeView
+    from modelx.qtgui.modeltree import ModelTreeModel
+
     if model is None:
         model = mx.cur_model()
+    get_app()
     treemodel = ModelTreeModel(model._baseattrs)
     view = QTreeView()
     view.setModel(treemodel)
@@ -57,8 +53,12 @@ def get_tree(model=None):
         model: :class:`Model <modelx.core.model.Model>` object.
             Defaults to the current model.
     """
+    from qtpy.QtWidgets import QTreeView
+    from modelx.qtgui.modeltree import ModelTreeModel
+
     if model is None:
         model = mx.cur_model()
+    get_app()
     treemodel = ModelTreeModel(model._baseattrs)
     view = QTreeView()
     view.setModel(treemodel)
@@ -81,9 +81,7 @@ def show_tree(model=None):
     if model is None:
         model = mx.cur_model()
     view = get_modeltree(model)
-    app = QApplication.instance()
-    if not app:
-        raise RuntimeError("QApplication does not exist.")
+    app = get_app()
     view.show()
     app.exec_()
 
@@ -99,8 +97,4 @@ if __name__ == "__main__":
         else:
             return fibo[x - 1] + fibo[x - 2]
 
-    app = QApplication.instance()
-    if not app:
-        app = QApplication(sys.argv)
-
     show_tree()
@@ -0,0 +1,55 @@
+import pytest
+from modelx.core.base import ImplDict, ImplChainMap
+
+
+class Item:
+    def __init__(self, name):
+        self.interface = name.upper()
+
+
+@pytest.fixture
+def chainmap():
+    first = ImplDict(None, None)
+    second = ImplDict(None, None)
+    chmap = ImplChainMap(None, None, [first, second])
+    return first, second, chmap
+
+
+def test_incremental_update(chainmap):
+
+    first, second, chmap = chainmap
+    for name in ("c", "a", "b"):
+        second.set_item(name, Item(name))
+    assert chmap.get_updated().order == ["a", "b", "c"]
+
+    first.set_item("b", Item("x"))
+    second.del_item("a")
+    second.set_item("d", Item("d"))
+    chmap.get_updated()
+    assert chmap.order == ["b", "c", "d"]
+    assert chmap.interfaces == {"b": "X", "c": "C", "d": "D"}
+    assert list(chmap.interfaces) == chmap.order
+
+    first.del_item("b")
+    assert chmap.get_updated().interfaces["b"] == "B"
+
+
+def test_full_update(chainmap):
+
+    first, second, chmap = chainmap
+    second.set_item("a", Item("a"))
+    chmap.get_updated()
+
+    second["a"].interface = "Y"
+    second.set_update()
+    assert chmap.get_updated().interfaces == {"a": "Y"}
+
+
+def test_many_items():
+
+    impls = ImplDict(None, None)
+    for i in range(10000):
+        impls.set_item("x%05d" % i, Item(str(i)))
+        impls.get_updated()
+    assert impls.order == sorted(impls)
+    assert len(impls.interfaces) == 10000
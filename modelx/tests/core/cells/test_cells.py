@@ -109,6 +109,101 @@ def test_match(sample_space, args, masked, value):
     assert retargs == masked and retvalue == value
 
 
+def test_match_index(sample_space):
+
+    cells = sample_space.matchtest
+    size = len(cells)
+    assert cells.match(2, 3, 4) == ((None, None, None), 0)
+    assert len(cells) == size   # No values calculated by probing
+
+    cells[2, None, 4] = 204
+    assert cells.match(2, 3, 4) == ((2, None, 4), 204)
+
+    cells.clear(2, None, 4)
+    assert cells.match(2, 3, 4) == ((None, None, None), 0)
+
+
+def test_match_referrers_cleared():
+
+    space = new_model().new_space()
+
+    @defcells
+    def table(x, y):
+        return None
+
+    @defcells
+    def user(x, y):
+        return table.match(x, y).value
+
+    table.allow_none = True
+    table[1, None] = 10
+    assert user(1, 2) == 10
+
+    table[1, 2] = 99    # Probed but not stored
+    assert user(1, 2) == 99
+
+    table[1, 2] = 98    # Overwrite the matched value
+    assert user(1, 2) == 98
+
+    table.clear(1, 2)
+    assert user(1, 2) == 10
+
+    table[1, None] = 20
+    assert user(1, 2) == 20
+
+    table[None, 2] = 2     # New pattern
+    table.clear(1, None)
+    assert user(1, 2) == 2
+
+
+def test_match_referrers_cleared_after_save(tmp_path):
+
+    model = new_model()
+    space = model.new_space()
+    space.new_cells("table", formula=lambda x, y: None)
+    space.new_cells("user", formula=lambda x, y: table.match(x, y).value)
+    space.table.allow_none = True
+    space.table[1, None] = 10
+    assert space.user(1, 2) == 10
+
+    model.save(str(tmp_path / "model.mx"))
+    model2 = open_model(str(tmp_path / "model.mx"), name="MatchModel")
+    try:
+        space2 = model2.spaces[space.name]
+        space2.table[1, 2] = 99
+        assert space2.user(1, 2) == 99
+    finally:
+        model2.close()
+        model.close()
+
+
+def test_match_patterns_removed(sample_space):
+
+    cells = sample_space.matchtest
+    cells.match(2, 3, 4)
+    impl = cells._impl
+    assert frozenset([0, 2]) in impl.match_patterns
+
+    cells.clear(1, None, 3)
+    assert frozenset([0, 2]) not in impl.match_patterns
+    assert cells.match(1, 3, 3) == ((1, None, None), 100)
+
+    cells[5, None, 6] = 56
+    assert frozenset([0, 2]) in impl.match_patterns
+    assert impl.match_counts[frozenset([0, 2])] == 1
+
+
+def test_match_formula(sample_space):
+
+    @defcells(space=sample_space)
+    def matchformula(x, y):
+        return 1 if y is None else None
+
+    cells = matchformula
+    cells.allow_none = True
+    assert cells.match(1, 2) == ((1, None), 1)
+
+
 def test_setitem(sample_space):
     sample_space.fibo[0] = 1
     assert sample_space.fibo[2] == 2
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from modelx import *
+from modelx.core.node import get_node, ArrayNode
+
+
+@pytest.fixture
+def arraymodel():
+
+    model, space = new_model(), new_space()
+
+    @defcells
+    def rate():
+        return 0.01
+
+    @defcells
+    def qx(x):
+        return 0.001 * x
+
+    @defcells
+    def px(x):
+        return (1 - qx(x)) * (1 + rate())
+
+    yield space
+    assert not any(isinstance(node, ArrayNode) for node in model.cellgraph)
+    model.close()
+
+
+def test_array_values(arraymodel):
+
+    space = arraymodel
+    x = np.arange(10)
+    result = space.px(x)
+
+    assert isinstance(result, np.ndarray)
+    assert result.tolist() == [space.px(i) for i in range(10)]
+
+
+def test_array_formula_evaluated_once(arraymodel):
+
+    space = arraymodel
+    space.calls = []
+
+    @defcells(space)
+    def counted(x):
+        calls.append(x)
+        return 2 * x
+
+    result = space.counted(np.arange(100))
+    assert len(space.calls) == 1
+    assert result.tolist() == [2 * i for i in range(100)]
+
+    space.counted(np.arange(100))
+    assert len(space.calls) == 1
+
+    space.px(np.arange(100))
+    assert len(space.qx) == 100
+    assert space.px(50) == pytest.approx((1 - 0.05) * 1.01)
+
+
+def test_array_partially_calculated(arraymodel):
+
+    space = arraymodel
+    space.px(3)
+    result = space.px(np.arange(5))
+
+    assert result.tolist() == [(1 - 0.001 * i) * 1.01 for i in range(5)]
+
+
+def test_array_graph(arraymodel):
+
+    space = arraymodel
+    space.px(np.arange(3))
+    graph = space.model.cellgraph
+
+    for i in range(3):
+        px = get_node(space.px._impl, (i,), {})
+        qx = get_node(space.qx._impl, (i,), {})
+        rate = get_node(space.rate._impl, (), {})
+        assert set(graph.predecessors(px)) == {qx, rate}
+
+    space.qx[1] = 0
+    assert 1 not in space.px
+    assert 0 in space.px and 2 in space.px
+    assert space.px(1) == pytest.approx(1.01)
+
+
+def test_array_length_mismatch(arraymodel):
+
+    space = arraymodel
+
+    @defcells(space)
+    def shifted(x):
+        return qx(x[1:])
+
+    with pytest.raises(ValueError):
+        space.shifted(np.arange(5))
+
+
+def test_array_incremental(arraymodel):
+
+    space = arraymodel
+    space.model.enable_incremental()
+    space.qx[2] = 0
+    space.px(np.arange(3))
+
+    space.qx[2] = 0.5
+    assert space.px(np.arange(3)).tolist() == pytest.approx(
+        [1.01, (1 - 0.001) * 1.01, 0.5 * 1.01])
+    assert space.px(2) == pytest.approx(0.5 * 1.01)
+    assert not space.model._impl.dirty
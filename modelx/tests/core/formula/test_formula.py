@@ -68,3 +68,46 @@ def test_lambda_as_param():
     f = Formula(lambdadef2)
     assert f.func(1) == 3
     assert f.source == lambdadef2_extracted
+
+
+def test_source_deferred():
+
+    def foo(x):
+        return 2 * x
+
+    f = Formula(foo)
+    assert f.func is foo
+    assert f._source is None
+    assert f.source == "def foo(x):\n    return 2 * x\n"
+    assert f.srcnames == []
+
+
+def test_closure_compiled_from_source():
+
+    rate = 3
+    f = Formula(lambda x: rate * x, name="bar")
+    assert f.name == "bar"
+    assert not f.func.__code__.co_freevars
+    assert f.srcnames == ["rate"]
+
+
+def test_analysis_cached():
+
+    from modelx.core.formula import get_srcnames
+
+    src = "def qux(y):\n    return y + spam\n"
+    f1 = Formula(src)
+    f2 = Formula(src)
+    assert f1.srcnames == f2.srcnames == ["spam"]
+    assert f1.srcnames is not f2.srcnames
+    assert get_srcnames.cache_info().hits >= 1
+
+
+def test_pickle_lazy():
+
+    import pickle
+
+    f = pickle.loads(pickle.dumps(Formula(funcdef1, name="bar")))
+    assert f._func is None
+    assert f.name == "bar"
+    assert f.func(1) == 2
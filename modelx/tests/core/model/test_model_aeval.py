@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+
+from modelx import *
+
+
+@pytest.fixture
+def aevalmodel():
+
+    model = new_model("AevalModel")
+    space = model.new_space("Space1")
+
+    @defcells
+    def foo(x):
+        return 2 * x
+
+    @defcells
+    def slow(x):
+        import time
+        time.sleep(0.01)
+        return slow(x - 1) + 1 if x > 0 else 0
+
+    yield model
+    model.close()
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def test_aeval(aevalmodel):
+
+    space = aevalmodel.Space1
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0.005)
+
+    async def main():
+        ticker = asyncio.ensure_future(tick())
+        value = await space.slow.aeval(20)
+        ticker.cancel()
+        return value
+
+    assert run(main()) == 20
+    assert len(ticks) > 5   # The loop was not blocked
+
+
+def test_aevaluate(aevalmodel):
+
+    space = aevalmodel.Space1
+    values = run(aevalmodel.aevaluate(
+        [(space.foo, (x,)) for x in range(20)] + [(space.slow, 3)]))
+
+    assert values == [2 * x for x in range(20)] + [3]
+
+
+def test_cancel(aevalmodel):
+
+    space = aevalmodel.Space1
+
+    async def main():
+        task = asyncio.ensure_future(space.slow.aeval(1000))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    run(main())
+    time.sleep(0.1)     # Let the worker stop
+    count = len(space.slow)
+    time.sleep(0.1)
+    assert count == len(space.slow) < 1000
+    assert space.slow(3) == 3
@@ -0,0 +1,150 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import modelx
+from modelx.core.api import *
+
+
+def build_model(rate=2, formula=None):
+
+    model = new_model()
+    space = model.new_space("Space1")
+
+    @defcells
+    def fibo(x):
+        if x == 0 or x == 1:
+            return x
+        else:
+            return fibo(x - 1) + fibo(x - 2)
+
+    space.new_cells("bar", formula=formula or (lambda x: rate * fibo(x)))
+    space.new_cells("data", formula=lambda x: None)
+    space.new_cells("baz", formula=lambda x: data(1) + bar(x))
+    space.rate = rate
+    space.data[1] = 10
+
+    return model
+
+
+@pytest.fixture
+def cachepath(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    model = build_model()
+    model.enable_cache(path)
+    model.Space1.baz(20)
+    model.close()
+    return path
+
+
+def loaded_names(model):
+    return {cells.name for cells, keys in model._impl.cache.loaded.items()
+            if keys}
+
+
+def test_load_values(cachepath):
+
+    model = build_model()
+    model.enable_cache(cachepath)
+    assert model.Space1.baz(20) == 10 + 2 * 6765
+    assert loaded_names(model) == {"baz"}
+    assert model.Space1.bar(20) == 2 * 6765
+    assert model.Space1.fibo(19) == 4181
+    model.close()
+
+
+def test_changed_ref(cachepath):
+
+    model = build_model(rate=3)
+    model.enable_cache(cachepath)
+    assert model.Space1.baz(20) == 10 + 3 * 6765
+    assert "baz" not in loaded_names(model)
+    model.close()
+
+
+def test_changed_formula(cachepath):
+
+    model = build_model(formula=lambda x: rate * fibo(x) + 1)
+    model.enable_cache(cachepath)
+    assert model.Space1.baz(20) == 10 + 2 * 6765 + 1
+    assert loaded_names(model) == {"fibo"}
+    model.close()
+
+
+def test_changed_input(cachepath):
+
+    model = build_model()
+    model.Space1.data[1] = 20
+    model.enable_cache(cachepath)
+    assert model.Space1.baz(20) == 20 + 2 * 6765
+    assert "baz" not in loaded_names(model)
+    model.close()
+
+
+def test_input_set_after_loading(cachepath):
+
+    model = build_model()
+    model.enable_cache(cachepath)
+    assert model.Space1.baz(20) == 10 + 2 * 6765
+    model.Space1.fibo[20] = 0
+    assert model.Space1.baz(20) == 10
+    model.close()
+
+
+def test_fingerprints_reset_downstream(cachepath):
+
+    model = build_model()
+    model.enable_cache(cachepath)
+    space = model.Space1
+    fingerprints = model._impl.cache.fingerprints
+    assert space.baz(20) == 10 + 2 * 6765
+    assert loaded_names(model) == {"baz"}
+
+    space.data[1] = 20
+    assert space.fibo._impl in fingerprints
+    assert space.bar._impl in fingerprints
+    assert space.baz._impl not in fingerprints
+    assert not loaded_names(model)
+
+    space.rate = 3
+    assert space.fibo._impl in fingerprints
+    assert space.bar._impl not in fingerprints
+    assert space.baz(20) == 20 + 3 * 6765
+    model.close()
+
+
+def test_fingerprints_kept_in_formula(tmp_path):
+
+    model = build_model()
+    model.enable_cache(str(tmp_path / "cache.sqlite"))
+    space = model.Space1
+    dyn = model.new_space("Dyn", formula=lambda i: None)
+    dyn.x = 1
+    space.Dyn = dyn
+    space.new_cells("make", formula=lambda i: Dyn[i].x)
+
+    space.bar(5)
+    cache = model._impl.cache
+    assert space.bar._impl in cache.fingerprints
+
+    # Refs of Dyn[1] set while make(1) is evaluated do not affect bar
+    assert space.make(1) == 1
+    assert space.bar._impl in cache.fingerprints
+    model.close()
+
+
+def test_digest_set_independent_of_hash_seed():
+
+    code = (
+        "from modelx.core.cache import _digest_value;"
+        "print(_digest_value(({'a', 'b', 'c', 'd'}, [frozenset('xyz')])))"
+    )
+    root = os.path.dirname(os.path.dirname(modelx.__file__))
+    digests = set()
+    for seed in ("1", "2", "3"):
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=root)
+        digests.add(subprocess.check_output(
+            [sys.executable, "-c", code], env=env))
+    assert len(digests) == 1
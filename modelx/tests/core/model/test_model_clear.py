@@ -0,0 +1,65 @@
+import pytest
+
+from modelx.core.api import *
+
+
+@pytest.fixture
+def clearmodel():
+
+    model = new_model()
+    space = model.new_space()
+
+    @defcells
+    def inputs(i):
+        return i
+
+    @defcells
+    def total(n):
+        return sum(inputs(i) for i in range(n))
+
+    @defcells
+    def other(i):
+        return 2 * i
+
+    for i in range(5):
+        inputs[i] = 10 * i
+
+    total(5)
+    other(1)
+
+    yield model
+    model.close()
+
+
+def test_clear_many(clearmodel):
+
+    space = clearmodel.spaces["Space1"]
+    clearmodel.clear_many(space.inputs.node(i) for i in (1, 3))
+
+    assert set(space.inputs) == {0, 2, 4}
+    assert not space.total._impl.data
+    assert 1 in space.other
+    assert space.total(5) == 0 + 1 + 20 + 3 + 40
+
+
+def test_clear_all_values(clearmodel):
+
+    space = clearmodel.spaces["Space1"]
+    space.inputs.clear()
+
+    assert not space.inputs._impl.data
+    assert not space.total._impl.data
+    assert not clearmodel._impl.cellgraph.has_node(
+        space.total.node(5)._impl)
+    assert space.total(5) == 10
+
+
+def test_clear_many_keeps_only_upstream_sources(clearmodel):
+
+    space = clearmodel.spaces["Space1"]
+    total, inputs = space.total.node(5)._impl, space.inputs.node(1)._impl
+    clearmodel._impl.clear_many([total, inputs], clear_source=False)
+
+    assert set(space.inputs) == set(range(5))
+    assert not space.total._impl.data
+    assert space.total(5) == 100
@@ -0,0 +1,94 @@
+import pytest
+
+from modelx.core.api import *
+
+
+@pytest.fixture
+def forkmodel():
+
+    model = new_model()
+    space = model.new_space("Space1")
+    space.calls = []
+
+    @defcells
+    def rate(t):
+        return 0.01 * t
+
+    @defcells
+    def pv(t):
+        calls.append(t)
+        return amount(t) / (1 + rate(t))
+
+    @defcells
+    def amount(t):
+        return 100 * factor
+
+    @defcells
+    def other(t):
+        return 2 * t
+
+    space.factor = 1
+    for t in range(3):
+        pv(t)
+        other(t)
+
+    del space.calls[:]
+    yield model
+    model.close()
+
+
+def values(model):
+    space = model.Space1
+    return {name: dict(space.cells[name]._impl.data)
+            for name in ("rate", "pv", "amount", "other")}
+
+
+def test_fork_input(forkmodel):
+
+    m = forkmodel
+    space = m.Space1
+    base = values(m)
+
+    with m.fork():
+        space.rate[1] = 0.25
+        assert space.pv(1) == 80
+        assert space.pv(2) == 100 / 1.02
+        assert space.calls == [1]
+        space.other(5)
+
+    base["other"][(5,)] = 10
+    assert values(m) == base
+    assert space.pv(1) == 100 / 1.01
+    assert space.calls == [1]
+    assert m._impl.cellgraph.has_edge(
+        space.rate.node(1)._impl, space.pv.node(1)._impl)
+
+    space.rate[1] = 0.25
+    assert space.pv(1) == 80
+
+
+def test_fork_ref(forkmodel):
+
+    m = forkmodel
+    space = m.Space1
+    base = values(m)
+
+    fork = m.fork()
+    space.factor = 2
+    m.newref = 1
+    assert space.pv(0) == 200
+    fork.discard()
+
+    assert values(m) == base
+    assert space.factor == 1
+    assert "newref" not in m.refs
+    assert not fork.is_active
+
+
+def test_fork_structure_error(forkmodel):
+
+    with forkmodel.fork():
+        with pytest.raises(RuntimeError):
+            forkmodel.Space1.new_cells()
+        with pytest.raises(RuntimeError):
+            forkmodel.fork()
@@ -0,0 +1,85 @@
+import pytest
+
+from modelx.core.api import *
+
+
+@pytest.fixture
+def frozenmodel():
+
+    model = new_model()
+    space = model.new_space("Space1")
+
+    @defcells
+    def fibo(x):
+        if x == 0 or x == 1:
+            return x
+        else:
+            return fibo(x - 1) + fibo(x - 2)
+
+    @defcells
+    def bar(x):
+        return rate * fibo(x)
+
+    space.rate = 2
+
+    params = model.new_space("Params", formula=lambda t: None)
+
+    @defcells(space=params)
+    def baz(x):
+        return t * x + s1.bar(x)
+
+    params.s1 = space
+
+    model.freeze()
+    yield model
+    model.close()
+
+
+def test_frozen_values(frozenmodel):
+
+    m = frozenmodel
+    assert m.frozen
+    assert m.Space1.bar(10) == 2 * 55
+    assert m.Params[2].baz(3) == 2 * 3 + 2 * 2
+    assert m.Params[2].t == 2
+
+
+def test_frozen_set_value(frozenmodel):
+
+    m = frozenmodel
+    assert m.Space1.bar(10) == 110
+    m.Space1.fibo[10] = 0
+    assert m.Space1.bar(10) == 0
+    m.Space1.fibo.clear()
+    assert m.Space1.bar(10) == 110
+
+
+@pytest.mark.parametrize(
+    "edit",
+    [
+        lambda m: m.new_space(),
+        lambda m: m.Space1.new_cells(),
+        lambda m: setattr(m.Space1, "rate", 3),
+        lambda m: setattr(m, "foo", 1),
+        lambda m: delattr(m.Space1, "fibo"),
+        lambda m: m.Space1.fibo.set_formula(lambda x: x),
+        lambda m: m.Space1.set_formula(lambda y: None),
+        lambda m: m.new_space(bases=m.Space1),
+    ],
+)
+def test_frozen_edit_error(frozenmodel, edit):
+
+    with pytest.raises(RuntimeError):
+        edit(frozenmodel)
+
+
+def test_unfreeze(frozenmodel):
+
+    m = frozenmodel
+    assert m.Space1.bar(10) == 110
+    m.unfreeze()
+    assert not m.frozen
+    m.Space1.bar.set_formula(lambda x: 3 * fibo(x))
+    assert m.Space1.bar(10) == 165
+    m.freeze()
+    assert m.Space1.bar(10) == 165
@@ -0,0 +1,84 @@
+import pytest
+
+from modelx.core.api import *
+
+
+@pytest.fixture
+def incmodel():
+
+    model = new_model()
+    space = model.new_space("Space1")
+    space.calls = []
+
+    @defcells
+    def rate(t):
+        return None
+
+    @defcells
+    def sign(t):
+        calls.append(("sign", t))
+        return 1 if rate(t) >= 0 else -1
+
+    @defcells
+    def scaled(t):
+        calls.append(("scaled", t))
+        return 10 * sign(t)
+
+    @defcells
+    def amount(t):
+        calls.append(("amount", t))
+        return rate(t) * 100
+
+    for t in range(3):
+        rate[t] = 0.01 * (t + 1)
+        scaled(t)
+        amount(t)
+
+    model.enable_incremental()
+    del space.calls[:]
+    yield model
+    model.close()
+
+
+def test_early_cutoff(incmodel):
+
+    space = incmodel.Space1
+    space.rate[1] = 0.05
+
+    assert space.sign._impl.has_cell((1,))
+    assert space.scaled(1) == 10
+    assert space.calls == [("sign", 1)]
+    assert space.amount(1) == 5
+    assert space.calls == [("sign", 1), ("amount", 1)]
+    assert not incmodel._impl.dirty
+
+
+def test_changed_value_propagates(incmodel):
+
+    space = incmodel.Space1
+    space.rate[2] = -0.01
+
+    assert space.scaled(2) == -10
+    assert space.calls == [("sign", 2), ("scaled", 2)]
+    assert space.scaled(0) == 10
+    assert len(space.calls) == 2
+
+
+def test_same_value(incmodel):
+
+    space = incmodel.Space1
+    space.rate[0] = 0.01
+    assert not incmodel._impl.dirty
+    assert space.amount(0) == 1
+    assert not space.calls
+
+
+def test_disable_incremental(incmodel):
+
+    space = incmodel.Space1
+    space.rate[0] = 0.02
+    incmodel.disable_incremental()
+
+    assert not space.amount._impl.has_cell((0,))
+    assert space.amount(0) == 2
+    assert space.amount._impl.has_cell((1,))
@@ -0,0 +1,70 @@
+import sys
+
+import pytest
+
+from modelx import *
+
+pytest.importorskip("pandas")
+
+
+@pytest.fixture
+def memmodel():
+
+    model = new_model("MemModel")
+    space = model.new_space("Space1", formula=lambda i: None)
+    space.x = list(range(1000))
+
+    @defcells
+    def foo(i):
+        return bar(i) if i > 0 else 0
+
+    @defcells
+    def bar(i):
+        return foo(i - 1) + i
+
+    space.new_cells("data", formula=lambda i: None)
+
+    yield model
+    model.close()
+
+
+def test_memory_report(memmodel):
+
+    space = memmodel.Space1
+    space.foo(100)
+    space[1].foo(3)
+    report = memmodel.memory_report()
+
+    assert dict(report["type"]) == {
+        "MemModel": "Model",
+        "MemModel.Space1": "StaticSpace",
+        "MemModel.Space1.foo": "Cells",
+        "MemModel.Space1.bar": "Cells",
+        "MemModel.Space1.data": "Cells",
+        "MemModel.Space1.Space1": "DynamicSpace",
+        "MemModel.Space1.Space1.foo": "Cells",
+        "MemModel.Space1.Space1.bar": "Cells",
+        "MemModel.Space1.Space1.data": "Cells"
+    }
+    assert (report.drop(columns="type").sum(axis=1) == 2 * report.total).all()
+
+    foo = report.loc["MemModel.Space1.foo"]
+    assert foo.data >= sys.getsizeof(space.foo._impl.data)
+    assert foo.nodes > 0 and foo.edges > 0
+    data = report.loc["MemModel.Space1.data"]
+    assert data.data == sys.getsizeof(space.data._impl.data)
+    assert data.nodes == data.edges == 0
+    assert report.loc["MemModel.Space1"].refs > sys.getsizeof(space.x)
+
+
+def test_memory_report_grows(memmodel):
+
+    before = memmodel.memory_report()
+    memmodel.Space1.data[1] = list(range(10000))
+    memmodel.Space1.foo(100)
+    after = memmodel.memory_report()
+
+    diff = after.total - before.total
+    assert diff["MemModel.Space1.data"] > sys.getsizeof(list(range(10000)))
+    assert diff["MemModel.Space1.foo"] > 0
+    assert diff["MemModel.Space1"] == 0
@@ -0,0 +1,232 @@
+import pickle
+import zipfile
+
+import pytest
+
+from modelx import *
+
+
+@pytest.fixture
+def savedpath(tmp_path):
+
+    model = new_model("SavedModel")
+    base = model.new_space("Base")
+    report = model.new_space("Report")
+
+    @defcells(base)
+    def foo(x):
+        return 2 * x
+
+    base.new_cells("data", formula=lambda x: None)
+    base.data[1] = 10
+
+    @defcells(report)
+    def bar(x):
+        return 3 * x
+
+    @defcells(report)
+    def baz(x):
+        return bar(x) + Base.foo(x)
+
+    report.Base = base
+    for x in range(3):
+        report.baz(x)
+
+    path = str(tmp_path / "model.mx")
+    model.save(path)
+    model.close()
+    return path
+
+
+def test_open_all(savedpath):
+
+    m = open_model(savedpath, name="Opened")
+    try:
+        assert dict(m.Base.foo) == {0: 0, 1: 2, 2: 4}
+        assert dict(m.Report.baz) == {0: 0, 1: 5, 2: 10}
+        assert m.Base.data[1] == 10
+        assert m._impl.cellgraph.has_edge(
+            m.Report.bar.node(1)._impl, m.Report.baz.node(1)._impl)
+
+        m.Base.foo[1] = 0
+        assert 1 not in m.Report.baz
+        assert m.Report.baz(1) == 3
+    finally:
+        m.close()
+
+
+def test_open_spaces(savedpath):
+
+    m = open_model(savedpath, name="Opened", spaces=["Report"])
+    try:
+        assert not m.Base.foo._impl.data
+        assert not m.Base.data._impl.data
+        assert dict(m.Report.bar) == {0: 0, 1: 3, 2: 6}
+        assert not m.Report.baz._impl.data   # Calculated from Base
+        assert m.Report.baz(2) == 10
+    finally:
+        m.close()
+
+
+def test_open_spaces_error(savedpath):
+
+    with pytest.raises(ValueError):
+        open_model(savedpath, name="Opened", spaces=["Foo"])
+
+
+def test_open_pickled(tmp_path):
+    """Models pickled in a single file can still be opened"""
+
+    model = new_model("PickledModel")
+    space = model.new_space("Space1")
+    space.new_cells("foo", formula=lambda x: 2 * x)
+    space.foo(3)
+
+    path = str(tmp_path / "model.mx")
+    model._impl.update_lazyevals()
+    with open(path, "wb") as file:
+        pickle.dump(model, file, protocol=4)
+    model.close()
+
+    assert not zipfile.is_zipfile(path)
+    m = open_model(path, name="Opened")
+    try:
+        assert m.Space1.foo._impl.data == {(3,): 6}
+        assert m._impl.cellgraph.has_node(m.Space1.foo.node(3)._impl)
+    finally:
+        m.close()
+
+
+def test_graphs_restored(savedpath):
+
+    def named(graph):
+        return {
+            tuple((node[0].get_fullname(omit_model=True),) + node[1:]
+                  for node in edge)
+            for edge in graph.edges
+        }
+
+    m = open_model(savedpath, name="Opened")
+    try:
+        cellgraph = named(m._impl.cellgraph)
+        lexdep = named(m._impl.lexdep)
+        m.Report.baz.clear()
+        m.Base.foo.clear()
+        for x in range(3):
+            m.Report.baz(x)
+        assert named(m._impl.cellgraph) == cellgraph
+        assert named(m._impl.lexdep) == lexdep
+        assert ("Report.baz", ) in {edge[0] for edge in lexdep}
+
+        m.Report.Base = m.Report   # Clears baz through the lexdep graph
+        assert not m.Report.baz._impl.data
+    finally:
+        m.close()
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "bz2", "lzma"])
+def test_compression(tmp_path, compression):
+
+    model = new_model("CompressedModel")
+    space = model.new_space("Space1")
+    space.new_cells("foo", formula=lambda x: [float(x)] * 1000)
+    for x in range(10):
+        space.foo(x)
+
+    path = str(tmp_path / "model.mx")
+    model.save(path, compression=compression)
+    model.close()
+
+    with zipfile.ZipFile(path) as zf:
+        assert {info.compress_type for info in zf.infolist()} == {
+            {None: zipfile.ZIP_STORED,
+             "zlib": zipfile.ZIP_DEFLATED,
+             "bz2": zipfile.ZIP_BZIP2,
+             "lzma": zipfile.ZIP_LZMA}[compression]}
+
+    m = open_model(path, name="Opened")
+    try:
+        assert m.Space1.foo._impl.data[(9,)] == [9.0] * 1000
+    finally:
+        m.close()
+
+
+def test_compression_error(tmp_path):
+
+    model = new_model("CompressedModel")
+    try:
+        with pytest.raises(ValueError):
+            model.save(str(tmp_path / "model.mx"), compression="zip")
+    finally:
+        model.close()
+
+
+def test_array_values(tmp_path):
+
+    np = pytest.importorskip("numpy")
+
+    model = new_model("ArrayModel")
+    space = model.new_space("Space1")
+
+    @defcells
+    def large(x):
+        import numpy
+        return numpy.arange(100000, dtype=float) * x
+
+    @defcells
+    def small(x):
+        import numpy
+        return numpy.arange(3) * x
+
+    large(2)
+    small(2)
+    path = str(tmp_path / "model.mx")
+    model.save(path, compression="zlib")
+    model.close()
+
+    with zipfile.ZipFile(path) as zf:
+        buffers = [name for name in zf.namelist()
+                   if name.startswith("values/Space1/")]
+    assert len(buffers) == (1 if pickle.HIGHEST_PROTOCOL >= 5 else 0)
+
+    m = open_model(path, name="Opened")
+    try:
+        value = m.Space1.large._impl.data[(2,)]
+        assert np.array_equal(value, np.arange(100000, dtype=float) * 2)
+        assert value.flags.writeable
+        assert np.array_equal(m.Space1.small._impl.data[(2,)], [0, 2, 4])
+    finally:
+        m.close()
+
+
+def test_save_after_delete(tmp_path):
+
+    model = new_model("DeletedModel")
+    base = model.new_space("Base")
+    sub = model.new_space("Sub", bases=base)
+    other = model.new_space("Other")
+    base.new_cells("foo", formula=lambda x: x)
+    sub.new_cells("bar", formula=lambda x: foo(x) + 1)
+    other.new_cells("baz", formula=lambda x: Base.foo(x) + 2)
+    other.Base = base
+    temp = model.new_space("Temp")
+    temp.new_cells("qux", formula=lambda x: 3 * x)
+
+    assert sub.bar(1) == 2
+    assert other.baz(1) == 3
+    assert temp.qux(1) == 3
+    del base.foo    # Also deletes the derived Sub.foo
+    del model.Temp
+    assert not sub.bar._impl.data
+    assert not other.baz._impl.data
+
+    path = str(tmp_path / "model.mx")
+    model.save(path)
+    model.close()
+
+    m = open_model(path, name="Opened")
+    try:
+        assert "foo" not in m.Sub.cells
+        assert not m._impl.cellgraph.number_of_nodes()
+    finally:
+        m.close()
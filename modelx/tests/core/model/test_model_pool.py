@@ -0,0 +1,65 @@
+import multiprocessing
+import os
+
+import pytest
+
+from modelx import *
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="fork not available")
+
+
+@pytest.fixture
+def poolmodel():
+
+    model = new_model("PoolModel")
+    space = model.new_space("Space1")
+
+    @defcells
+    def foo(x):
+        return 2 * x + bar(x)
+
+    @defcells
+    def bar(x):
+        return data(0)
+
+    @defcells
+    def pid():
+        import os
+        return os.getpid()
+
+    space.new_cells("data", formula=lambda x: None)
+    space.data[0] = 10
+
+    yield model
+    model.close()
+
+
+def test_evaluate(poolmodel):
+
+    space = poolmodel.Space1
+    with poolmodel.new_pool(2) as pool:
+        values = pool.evaluate(
+            [(space.foo, x) for x in range(10)]
+            + [("PoolModel.Space1.bar", (1,))])
+
+    assert values == [2 * x + 10 for x in range(10)] + [10]
+    assert not space.foo._impl.data
+
+
+def test_evaluate_in_workers(poolmodel):
+
+    with poolmodel.new_pool(2) as pool:
+        pids = pool.evaluate([(poolmodel.Space1.pid, ())] * 4, chunksize=1)
+
+    assert os.getpid() not in pids
+
+
+def test_inputs_at_creation(poolmodel):
+
+    space = poolmodel.Space1
+    space.data[0] = 20
+    with poolmodel.new_pool(2) as pool:
+        space.data[0] = 30  # Not seen by the workers
+        assert pool.evaluate([(space.foo, 1)]) == [22]
@@ -0,0 +1,80 @@
+import pytest
+
+from modelx.core.api import *
+
+
+@pytest.fixture
+def sensmodel():
+
+    model = new_model()
+    space = model.new_space("Space1")
+
+    @defcells
+    def rate(t):
+        return 0.01
+
+    @defcells
+    def disc(t):
+        return 1 if t == 0 else disc(t - 1) / (1 + rate(t))
+
+    @defcells
+    def pv(n):
+        return sum(amount * disc(t) for t in range(n))
+
+    @defcells
+    def other(t):
+        return 2 * t
+
+    space.amount = 100
+    model.scale = 1
+    for t in range(5):
+        rate[t] = 0.01 * t
+    pv(5)
+    other(1)
+
+    yield model
+    model.close()
+
+
+def expected(model, input_, bump, target):
+    with model.fork():
+        input_()
+        bumped = target()
+    return (bumped - target()) / bump
+
+
+def test_sensitivities(sensmodel):
+
+    space = sensmodel.Space1
+    pv5 = space.pv(5)
+    result = sensmodel.sensitivities(
+        [space.rate.node(2), (space, "amount")],
+        [space.pv.node(5), space.other.node(1)],
+        [0.01, 1],
+    )
+
+    assert result[0][0] == pytest.approx(
+        expected(sensmodel, lambda: space.rate.__setitem__(2, 0.03),
+                 0.01, lambda: space.pv(5)))
+    assert result[0][1] == 0
+    assert result[1][0] == pytest.approx(pv5 / 100)
+    assert space.pv(5) == pv5
+    assert space.rate(2) == 0.02
+    assert space.amount == 100
+
+
+def test_sensitivities_processes(sensmodel):
+
+    space = sensmodel.Space1
+    args = ([space.rate.node(t) for t in range(1, 5)] + [(space, "amount")],
+            [space.pv.node(5)], 0.001)
+    result = sensmodel.sensitivities(*args, processes=2)
+    assert [row[0] for row in result] == pytest.approx(
+        [row[0] for row in sensmodel.sensitivities(*args)])
+
+
+def test_invalid_target(sensmodel):
+
+    with pytest.raises(ValueError):
+        sensmodel.sensitivities(
+            [sensmodel.Space1.rate.node(1)], [(sensmodel, "scale")], 1)
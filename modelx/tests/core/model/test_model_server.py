@@ -0,0 +1,114 @@
+import marshal
+import pickle
+import socket
+import threading
+
+import pytest
+
+from modelx import *
+from modelx.core.server import ModelServer, ModelClient, _send, _recv
+
+
+@pytest.fixture
+def servermodel():
+
+    model = new_model("ServerModel")
+    space = model.new_space("Space1")
+
+    @defcells
+    def foo(x, y=1):
+        return x * y + bar(x)
+
+    @defcells
+    def bar(x):
+        return 10 * x
+
+    @defcells
+    def baz(x):
+        return None
+
+    yield model
+    model.close()
+
+
+def unix_address(tmp_path):
+    if not hasattr(socket, "AF_UNIX"):
+        pytest.skip("Unix domain sockets not available")
+    return str(tmp_path / "model.sock")
+
+
+@pytest.mark.parametrize("kind", ["unix", "tcp"])
+def test_evaluate(servermodel, tmp_path, kind):
+
+    if kind == "unix":
+        address = unix_address(tmp_path)
+    else:
+        address = ("localhost", 0)
+
+    with ModelServer(servermodel, address).start() as server:
+        with ModelClient(server.address) as client:
+            assert client.evaluate([
+                ("ServerModel.Space1.foo", (2, 3)),
+                ("ServerModel.Space1.foo", (2,)),
+                ("ServerModel.Space1.bar", (4,))]) == [26, 22, 40]
+
+            # Errors are raised in the client
+            with pytest.raises(Exception):
+                client.evaluate([("ServerModel.Space1.baz", (1,))])
+            with pytest.raises(TypeError):
+                client.evaluate([("ServerModel.Space1", (1,))])
+
+            # Connection is reused after errors
+            assert client.evaluate([("ServerModel.Space1.bar", (5,))]) == [50]
+            assert client._idle.qsize() == 1
+
+
+def test_concurrent_clients(servermodel, tmp_path):
+
+    address = unix_address(tmp_path)
+    results = {}
+
+    with ModelServer(servermodel, address).start():
+        client = ModelClient(address, maxconn=2)
+
+        def run(i):
+            results[i] = client.evaluate(
+                [("ServerModel.Space1.foo", (x, i)) for x in range(50)])
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        client.close()
+
+    for i in range(4):
+        assert results[i] == [x * i + 10 * x for x in range(50)]
+    assert len(servermodel.Space1.bar) == 50
+
+
+def test_malformed_requests(servermodel, tmp_path):
+
+    address = unix_address(tmp_path)
+
+    with ModelServer(servermodel, address).start():
+        client = ModelClient(address)
+
+        # Requests not decoded by marshal close the connection
+        sock = client._connect()
+        _send(sock, b"\xff")
+        is_ok, result = pickle.loads(_recv(sock))
+        assert not is_ok and isinstance(result, ValueError)
+        assert sock.recv(1) == b""
+        sock.close()
+
+        # Requests of wrong types keep the connection
+        sock = client._connect()
+        for request in [{}, [("ServerModel.Space1.bar", 1)], [(1, (1,))]]:
+            _send(sock, marshal.dumps(request))
+            is_ok, result = pickle.loads(_recv(sock))
+            assert not is_ok and isinstance(result, TypeError)
+        sock.close()
+
+        assert client.evaluate([("ServerModel.Space1.bar", (5,))]) == [50]
+        client.close()
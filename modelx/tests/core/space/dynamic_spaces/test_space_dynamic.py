@@ -1,4 +1,5 @@
 from modelx import *
+from modelx.core.graph import DependencyGraph
 import pytest
 
 
@@ -15,3 +16,61 @@ def test_dynamic_spaces():
     space[3, 4].distance()
 
     assert space.dynamic_spaces == {"Space1": space[3, 4]}
+
+
+def test_dynamic_spaces_share_code():
+
+    space = new_model().new_space(name="base", formula=lambda t: None)
+
+    @defcells
+    def foo(x):
+        return t * x + rate
+
+    space.rate = 1
+
+    funcs = [space[t].foo._impl.altfunc.get_updated().altfunc
+             for t in range(3)]
+    assert len(set(f.__code__ for f in funcs)) == 1
+    assert [space[t].foo(2) for t in range(3)] == [1, 3, 5]
+
+
+def test_namespace_update_keeps_function():
+
+    space = new_model().new_space()
+
+    @defcells
+    def foo(x):
+        return rate * x
+
+    space.rate = 1
+    assert foo(2) == 2
+    func = foo._impl.altfunc.get_updated().altfunc
+
+    space.rate = 2
+    assert foo._impl.altfunc.get_updated().altfunc is func
+    assert foo(2) == 4
+
+
+def test_create_dynamic_spaces_scales_linearly(monkeypatch):
+    """Creating a dynamic space does not scan the refs of the others"""
+
+    space = new_model().new_space(formula=lambda i: None)
+    space.rate = 2
+    space.new_cells("foo", formula=lambda: rate * i)
+    lexdep = space.model._impl.lexdep
+
+    scanned = []
+    iter_graph = DependencyGraph.__iter__
+
+    def counted_iter(graph):
+        for node in iter_graph(graph):
+            if graph is lexdep:
+                scanned.append(node)
+            yield node
+
+    monkeypatch.setattr(DependencyGraph, "__iter__", counted_iter)
+    for i in range(100):
+        space[i].foo()
+
+    assert len(lexdep) > 100
+    assert not scanned
@@ -0,0 +1,132 @@
+import pickle
+
+import pytest
+
+from modelx import *
+
+
+@pytest.fixture
+def refmodel():
+
+    model = new_model()
+    base = model.new_space("Base")
+    derived = model.new_space("Derived", bases=base)
+
+    @defcells(base)
+    def foo(t):
+        return rate * t
+
+    @defcells(base)
+    def bar(t):
+        return foo(t) + 1
+
+    @defcells(base)
+    def baz(t):
+        return 2 * t
+
+    base.rate = 2
+    model.glob = 10
+    base.new_cells("qux", formula=lambda t: glob * t)
+
+    yield model
+    model.close()
+
+
+def calc_all(model):
+    for space in (model.Base, model.Derived):
+        for name in ("bar", "baz", "qux"):
+            space.cells[name](3)
+
+
+def test_setref_clears_referrers(refmodel):
+
+    m = refmodel
+    calc_all(m)
+    m.Base.rate = 3
+
+    assert not m.Base.foo._impl.data
+    assert not m.Base.bar._impl.data
+    assert m.Base.baz._impl.data
+    assert m.Base.qux._impl.data
+    assert m.Base.bar(3) == 10
+    assert m.Derived.bar(3) == 10
+
+
+def test_setref_derived_only(refmodel):
+
+    m = refmodel
+    calc_all(m)
+    m.Derived.rate = 4
+
+    assert m.Base.bar._impl.data
+    assert not m.Derived.bar._impl.data
+    assert m.Derived.bar(3) == 13
+    assert m.Base.bar(3) == 7
+
+
+def test_delref(refmodel):
+
+    m = refmodel
+    m.Derived.rate = 4
+    assert m.Derived.foo(3) == 12
+    del m.Derived.rate
+    assert m.Derived.foo(3) == 6
+
+
+def test_set_global_ref(refmodel):
+
+    m = refmodel
+    calc_all(m)
+    m.glob = 20
+
+    assert m.Base.bar._impl.data
+    assert not m.Base.qux._impl.data
+    assert m.Base.qux(3) == 60
+    assert m.Derived.qux(3) == 60
+
+
+def test_lexdep_pickle(refmodel, tmp_path):
+
+    m = refmodel
+    calc_all(m)
+    m.save(str(tmp_path / "refmodel.mx"))
+    m2 = open_model(str(tmp_path / "refmodel.mx"), name="refmodel2")
+    try:
+        assert m2.Base.bar._impl.data
+        m2.Base.rate = 3
+        assert not m2.Base.bar._impl.data
+        assert m2.Base.bar(3) == 10
+    finally:
+        m2.close()
+
+
+def test_setref_updates_dynamic_spaces():
+
+    m = new_model()
+    s = m.new_space("Dyn", formula=lambda i: None)
+    s.rate = 2
+    s.new_cells("foo", formula=lambda x: rate * x * i)
+    s.new_cells("bar", formula=lambda x: x * i)
+
+    assert s[1].foo(3) == 6
+    assert s[1].bar(3) == 3
+    s.rate = 5
+    assert not s[1].foo._impl.data
+    assert s[1].bar._impl.data
+    assert s[1].foo(3) == 15
+    assert s[2].foo(3) == 30
+    m.close()
+
+
+def test_new_global_ref_hides_space_ref(refmodel):
+
+    m = refmodel
+    calc_all(m)
+    m.rate = 5
+
+    assert not m.Base.bar._impl.data
+    assert not m.Derived.bar._impl.data
+    assert m.Base.baz._impl.data
+    assert m.Base.bar(3) == 16
+    assert m.Derived.bar(3) == 16
+    assert (m._impl.global_refs["rate"],) in m._impl.lexdep.refnodes["rate"]
@@ -45,3 +45,56 @@ def test_space_reload(reloadtest):
     assert space.foo(3) == 1
     assert space.bar(3) == 1
     assert len(space.baz) == 0
+
+
+def test_space_reload_keeps_unchanged(tmp_path, monkeypatch):
+    import importlib
+
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    modfile = tmp_path / "reloadkeep.py"
+
+    modfile.write_text(dedent("""\
+        def base(n):
+            return n
+
+        def fixed(n):
+            return 2 * n
+
+        def changed(n):
+            return base(n) + 1
+
+        def user(n):
+            return changed(n) + fixed(n)
+        """))
+
+    model = mx.new_model()
+    try:
+        src = importlib.import_module("reloadkeep")
+        space = model.import_module(module=src)
+        assert space.user(3) == 10
+
+        modfile.write_text(dedent("""\
+            def base(n):
+                # Comment lines do not change formulas.
+                return n
+
+            def fixed(n):
+                return 2 * n
+
+            def changed(n):
+                return base(n) + 2
+
+            def user(n):
+                return changed(n) + fixed(n)
+            """))
+        space.reload()
+
+        assert set(space.base) == {3}
+        assert set(space.fixed) == {3}
+        assert len(space.changed) == 0
+        assert len(space.user) == 0
+        assert space.user(3) == 11
+    finally:
+        model.close()
+        sys.modules.pop("reloadkeep", None)
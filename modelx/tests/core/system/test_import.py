@@ -0,0 +1,15 @@
+import subprocess
+import sys
+
+
+def test_lazy_imports():
+    """Heavy or optional packages are not imported by importing modelx"""
+
+    code = (
+        "import sys, modelx;"
+        "print(sorted(m for m in ('networkx', 'pandas', 'qtpy')"
+        " if m in sys.modules))"
+    )
+    out = subprocess.check_output(
+        [sys.executable, "-W", "error::ImportWarning", "-c", code])
+    assert out.decode().strip() == "[]"
@@ -31,3 +31,94 @@ def test_maxout_recursion():
 
     with pytest.raises(DeepReferenceError):
         foo(maxdepth)
+
+
+def test_concurrent_evaluation():
+
+    import threading
+
+    m, s = mx.new_model(), mx.new_space()
+
+    @mx.defcells
+    def foo(x):
+        if x == 0:
+            return 0
+        else:
+            return foo(x-1) + x
+
+    @mx.defcells
+    def bar(x):
+        bar[x] = 2 * foo(x)
+
+    results = {}
+
+    def run(i):
+        results[i] = [(foo(x), bar(x)) for x in range(i, 300, 3)]
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for i in range(3):
+        assert results[i] == [
+            (x * (x + 1) // 2, x * (x + 1)) for x in range(i, 300, 3)]
+
+    assert not mx.core.mxsys.callstack
+    assert len(foo) == 300
+    assert len(bar) == 300
+
+    s.foo[0] = 1
+    assert bar(299) == 2 * (foo(299))
+    assert foo(299) == 299 * 300 // 2 + 1
+
+    m.close()
+
+
+def test_concurrent_dynamic_spaces():
+
+    import threading
+
+    m, s = mx.new_model(), mx.new_space(formula=lambda i: None)
+    spaces = []
+
+    def run():
+        spaces.append(s[1])
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(space is spaces[0] for space in spaces)
+    m.close()
+
+
+def test_set_recursion_in_other_threads():
+
+    from concurrent.futures import ThreadPoolExecutor
+    from modelx.core import mxsys
+
+    m, s = mx.new_model(), mx.new_space()
+
+    @mx.defcells
+    def foo(x):
+        if x == 0:
+            return 0
+        else:
+            return foo(x-1) + 1
+
+    last_maxdepth = mxsys.maxdepth
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Create the execution of the worker thread before the change
+        assert executor.submit(foo, 3).result() == 3
+        mx.set_recursion(5)
+        try:
+            with pytest.raises(DeepReferenceError):
+                executor.submit(foo, 10).result()
+        finally:
+            mx.set_recursion(last_maxdepth)
+
+    m.close()
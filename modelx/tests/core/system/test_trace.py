@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+import modelx as mx
+from modelx.core.cells import CellsImpl
+from modelx.core.trace import Tracer
+
+
+@pytest.fixture
+def tracemodel():
+
+    m, s = mx.new_model("TraceModel"), mx.new_space("Space1")
+
+    @mx.defcells
+    def foo(x):
+        return bar(x) + bar(x)
+
+    @mx.defcells
+    def bar(x):
+        return x
+
+    s.new_space("Child", formula=lambda i: None)
+
+    yield m
+    m.close()
+
+
+def test_chrome_trace(tracemodel, tmp_path):
+
+    s = tracemodel.Space1
+    get_value = CellsImpl.get_value
+
+    tracer = mx.start_trace()
+    assert CellsImpl.get_value is not get_value
+    try:
+        s.foo(1)
+        s.Child[1]
+        s.Child[1]
+        s.bar[1] = 2
+    finally:
+        assert mx.stop_trace() is tracer
+    assert CellsImpl.get_value is get_value
+
+    s.foo(2)    # Not traced
+    path = str(tmp_path / "trace.json")
+    tracer.save(path)
+    with open(path) as file:
+        events = json.load(file)["traceEvents"]
+
+    assert [(e["ph"], e["cat"], e["name"]) for e in events[:6]] == [
+        ("B", "get_value", "TraceModel.Space1.foo(1)"),
+        ("B", "formula", "TraceModel.Space1.foo(1)"),
+        ("B", "get_value", "TraceModel.Space1.bar(1)"),
+        ("B", "formula", "TraceModel.Space1.bar(1)"),
+        ("E", "formula", "TraceModel.Space1.bar(1)"),
+        ("E", "get_value", "TraceModel.Space1.bar(1)"),
+    ]
+    hits = [(e["name"], e["args"]["hit"]) for e in events
+            if e["ph"] == "E" and e["cat"] in ("get_value", "dynspace")]
+    assert hits == [
+        ("TraceModel.Space1.bar(1)", False),
+        ("TraceModel.Space1.bar(1)", True),
+        ("TraceModel.Space1.foo(1)", False),
+        ("TraceModel.Space1.Child(1)", False),
+        ("TraceModel.Space1.Child(1)", True),
+    ]
+    assert [e["args"] for e in events
+            if e["ph"] == "E" and e["cat"] == "clear"] == [
+        {"sources": 1}]
+    assert all(e["ts"] <= f["ts"] for e, f in zip(events, events[1:]))
+
+
+def test_tracer_errors():
+
+    class Collector(Tracer):
+        pass
+
+    tracer = Collector()
+    assert mx.start_trace(tracer) is tracer
+    with pytest.raises(RuntimeError):
+        mx.start_trace()
+    assert mx.stop_trace() is tracer
+    with pytest.raises(RuntimeError):
+        mx.stop_trace()
@@ -0,0 +1,129 @@
+import importlib
+import sys
+from collections import OrderedDict
+
+import modelx as mx
+from modelx import defcells
+import pytest
+
+
+@pytest.fixture
+def exportmodel():
+
+    model = mx.new_model("ExportModel")
+    base = model.new_space("Base")
+
+    @defcells
+    def fibo(n):
+        if n < 2:
+            return n
+        else:
+            return fibo[n - 1] + fibo(n - 2)
+
+    @defcells
+    def scaled(n, factor=2):
+        return factor * fibo(n) + offset
+
+    base.offset = 1
+    base.table = OrderedDict([(1, "a"), (2, "b")])
+
+    child = base.new_space("Child")
+    child.new_cells("total", formula=lambda: Base.fibo(10) + rate.value)
+    child.new_cells("rate", formula=lambda: 0.5)
+    child.Base = base
+
+    sub = model.new_space("Sub", bases=base)
+    sub.offset = 100
+
+    params = model.new_space("Params", formula=lambda t: None)
+    params.new_cells("pv", formula=lambda x: x * t + disc[x])
+    params.new_cells("disc", formula=lambda x: None)
+    params[1].disc[3] = 10
+    params[2].disc[3] = 20
+
+    model.factor = 3
+    model.math = sys.modules["math"]
+
+    yield model
+    model.close()
+
+
+def import_exported(tmp_path, name):
+    sys.path.insert(0, str(tmp_path))
+    try:
+        return importlib.import_module(name)
+    finally:
+        sys.path.remove(str(tmp_path))
+
+
+def test_export_values(exportmodel, tmp_path):
+
+    m = exportmodel
+    m.export(str(tmp_path / "exported_values"))
+    pkg = import_exported(tmp_path, "exported_values")
+
+    assert pkg.Base.fibo(30) == m.Base.fibo(30)
+    assert pkg.Base.scaled(10) == m.Base.scaled(10)
+    assert pkg.Base.scaled(10, 3) == m.Base.scaled(10, 3)
+    assert pkg.Sub.scaled(10) == m.Sub.scaled(10)
+    assert pkg.Base.Child.total() == m.Base.Child.total()
+    assert pkg.Base.table == m.Base.table
+    assert pkg.factor == 3
+    assert pkg.Base.math is sys.modules["math"]
+
+
+def test_export_params(exportmodel, tmp_path):
+
+    m = exportmodel
+    m.export(str(tmp_path / "exported_params"))
+    pkg = import_exported(tmp_path, "exported_params")
+
+    for t in (1, 2):
+        assert pkg.Params[t].pv(3) == m.Params[t].pv(3)
+        assert pkg.Params(t) is pkg.Params[t]
+
+
+def test_export_no_modelx_objects(exportmodel, tmp_path):
+
+    exportmodel.export(str(tmp_path / "exported_plain"))
+    pkg = import_exported(tmp_path, "exported_plain")
+
+    for value in vars(pkg.Base).values():
+        assert not isinstance(value, mx.core.base.Interface)
+
+
+def test_export_existing_path(exportmodel, tmp_path):
+
+    with pytest.raises(ValueError):
+        exportmodel.export(str(tmp_path))
+
+
+def test_export_assigned_values(exportmodel, tmp_path):
+
+    m = exportmodel
+    m.Base.fibo[10] = 1000
+    m.Base.Child.rate[()] = 0.25
+    m.export(str(tmp_path / "exported_assigned"))
+    pkg = import_exported(tmp_path, "exported_assigned")
+
+    assert pkg.Base.fibo(10) == 1000
+    assert pkg.Base.fibo(12) == m.Base.fibo(12)
+    assert pkg.Base.Child.total() == m.Base.Child.total()
+
+
+def test_export_local_names(exportmodel, tmp_path):
+
+    m = exportmodel
+
+    m.Base.new_cells("unit", formula=lambda: 1)
+
+    @defcells(m.Base)
+    def shadowed(n):
+        unit = 2 * n
+        total = [fibo for fibo in range(n)]
+        return unit + sum(total) + fibo[n]
+
+    m.export(str(tmp_path / "exported_locals"))
+    pkg = import_exported(tmp_path, "exported_locals")
+
+    assert pkg.Base.shadowed(5) == m.Base.shadowed(5) == 10 + 10 + 5